@@ -1,5 +1,9 @@
-from importlib.metadata import version as pkg_version
-
 from branchctx.constants import DIST_NAME
 
-__version__ = pkg_version(DIST_NAME)
+
+def __getattr__(name: str):
+    if name == "__version__":
+        from importlib.metadata import version as pkg_version
+
+        return pkg_version(DIST_NAME)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -8,5 +8,27 @@ CHECKOUT_TYPE="$3"
 if [ "$CHECKOUT_TYPE" == "1" ]; then
     OLD_BRANCH=$(git rev-parse --abbrev-ref @{{-1}} 2>/dev/null || echo "unknown")
     NEW_BRANCH=$(git rev-parse --abbrev-ref HEAD)
-    {callback} "$OLD_BRANCH" "$NEW_BRANCH" "$PREV_HEAD" "$NEW_HEAD"
+    BCTX_KEY="${{NEW_BRANCH//[][\/\\:*?\"<>|~^@[:space:]]/-}}"
+    BCTX_DIR=".bctx/branches/$BCTX_KEY"
+    BCTX_MARKER=".bctx/branches/.heads/$BCTX_KEY"
+    BCTX_SOUND=".bctx/branches/.heads/.sound"
+    BCTX_HEAD=""
+    BCTX_BASE=""
+    BCTX_BASE_HEAD=""
+    {{ read -r BCTX_HEAD BCTX_BASE BCTX_BASE_HEAD < "$BCTX_MARKER"; }} 2>/dev/null
+    if [ -d "$BCTX_DIR" ] && [ "$BCTX_HEAD" == "$NEW_HEAD" ] && [ -n "$BCTX_BASE" ] && [ -f "$BCTX_SOUND" ] \
+        && [ ! .bctx/config.json -nt "$BCTX_SOUND" ] && [ ! "$BCTX_DIR/base_branch" -nt "$BCTX_MARKER" ] \
+        && {{ [ -L _branch ] || [ ! -e _branch ]; }} \
+        && [ "$(git rev-parse -q --verify "$BCTX_BASE^{{commit}}")" == "$BCTX_BASE_HEAD" ]; then
+        ln -s "$BCTX_DIR" "_branch.$$.tmp" && {{ mv -fT "_branch.$$.tmp" _branch 2>/dev/null \
+            || mv -fh "_branch.$$.tmp" _branch 2>/dev/null || rm -f "_branch.$$.tmp"; }}
+        BCTX_PLAYER=""
+        {{ {{ read -r BCTX_PLAYER; read -r BCTX_SOUND; }} < "$BCTX_SOUND"; }} 2>/dev/null
+        case "$BCTX_PLAYER" in
+            afplay|paplay) "$BCTX_PLAYER" "$BCTX_SOUND" >/dev/null 2>&1 & ;;
+        esac
+        echo "Branch: $OLD_BRANCH -> $NEW_BRANCH (synced)"
+    else
+        {callback} "$OLD_BRANCH" "$NEW_BRANCH" "$PREV_HEAD" "$NEW_HEAD"
+    fi
 fi
@@ -1,5 +1,4 @@
 import sys
-from importlib.metadata import version as pkg_version
 
 from branchctx.cmd_registry import COMMANDS, get_all_command_names, get_command_handler
 from branchctx.constants import CLI_NAME, DIST_NAME
@@ -10,7 +9,7 @@ def print_help():
     for name, info in COMMANDS.items():
         args = f" {info['args']}" if info["args"] else ""
         label = f"{name}{args}"
-        cmd_lines.append(f"  {label:<20} {info['desc']}")
+        cmd_lines.append(f"  {label:<24} {info['desc']}")
 
     commands_str = "\n".join(cmd_lines)
 
@@ -20,15 +19,24 @@ Commands:
 {commands_str}
 
 Options:
-  --help, -h           Show this help
-  --version, -v        Show version
+  --help, -h               Show this help
+  --version, -v            Show version
+  --profile                Print per-phase timings as JSON lines to stderr
+  --trace                  Write a Chrome/Perfetto trace to .bctx/traces/
 
 Examples:
   {CLI_NAME} init                             # initialize + install hook
+  {CLI_NAME} init --fast-launcher             # hooks run a precompiled launcher
+  {CLI_NAME} sync --all --pattern 'feature/*' # build contexts for all matching branches
   {CLI_NAME} status                           # show status, health, and branches
+  {CLI_NAME} status --recursive ~/code        # aggregated status for every repo under a dir
+  {CLI_NAME} status --only orphans            # list only contexts without a local branch
+  {CLI_NAME} prompt --json                    # cached status for shell prompts
   {CLI_NAME} prune                            # archive orphan contexts + delete branches
+  {CLI_NAME} prune --policy --dry-run         # print the config-driven prune plan as JSON
   {CLI_NAME} template                         # select template interactively
   {CLI_NAME} template feature                 # apply feature template
+  {CLI_NAME} doctor --perf                    # measure hook overhead in this repo
   {CLI_NAME} completion zsh                   # generate zsh completion
 
 Exit codes:
@@ -36,6 +44,21 @@ Exit codes:
   1 - error""")
 
 
+def _run_command(cmd: str, cmd_args: list[str], profile_flag: bool, trace_flag: bool) -> int:
+    from branchctx.utils.profile import finish_profile, resolve_sink, span, start_profile
+
+    start_profile(cmd, resolve_sink(profile_flag, trace_flag))
+    exit_code = None
+    try:
+        with span("import"):
+            handler = get_command_handler(cmd)
+        with span(cmd, kind="command"):
+            exit_code = handler(cmd_args)
+        return exit_code
+    finally:
+        finish_profile(exit_code)
+
+
 def main():
     args = sys.argv[1:]
 
@@ -44,15 +67,24 @@ def main():
         sys.exit(0)
 
     if "--version" in args or "-v" in args:
+        from importlib.metadata import version as pkg_version
+
         print(pkg_version(DIST_NAME))
         sys.exit(0)
 
+    profile_flag = "--profile" in args
+    trace_flag = "--trace" in args
+    if profile_flag or trace_flag:
+        args = [arg for arg in args if arg not in ("--profile", "--trace")]
+        if not args:
+            print_help()
+            sys.exit(0)
+
     cmd = args[0]
     cmd_args = args[1:]
 
     if cmd in get_all_command_names():
-        handler = get_command_handler(cmd)
-        sys.exit(handler(cmd_args))
+        sys.exit(_run_command(cmd, cmd_args, profile_flag, trace_flag))
     else:
         print(f"error: unknown command '{cmd}'")
         print(f"Run '{CLI_NAME} --help' for usage")
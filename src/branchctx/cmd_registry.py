@@ -10,53 +10,55 @@ class CommandInfo(TypedDict):
 
 COMMANDS: dict[str, CommandInfo] = {
     "base": {"desc": "Show or set base branch", "args": "[branch]"},
-    "init": {"desc": "Initialize and install hook", "args": ""},
+    "init": {"desc": "Initialize and install hook", "args": "[--fast-launcher]"},
     "uninstall": {"desc": "Remove hook from current repo", "args": ""},
-    "sync": {"desc": "Sync context and update meta/tags", "args": ""},
-    "status": {"desc": "Show status, health, and branches", "args": ""},
-    "prune": {"desc": "Archive orphan contexts and delete branches", "args": ""},
+    "sync": {"desc": "Sync context and update meta/tags", "args": "[--all [--pattern GLOB] | --recursive [DIR]]"},
+    "status": {
+        "desc": "Show status, health, and branches",
+        "args": "[--filter GLOB] [--only KIND] | --recursive [DIR]",
+    },
+    "prompt": {"desc": "Print cached branch status for shell prompts", "args": "[--json] [--sync]"},
+    "prune": {
+        "desc": "Archive orphan contexts and delete branches",
+        "args": "[--filter GLOB] [--only KIND] | --policy [--dry-run]",
+    },
     "template": {"desc": "Apply template to current branch", "args": "[name]"},
+    "doctor": {"desc": "Measure hook overhead and suggest fixes", "args": "--perf [--runs N]"},
     "completion": {"desc": "Generate shell completion", "args": "<shell>"},
 }
 
-INTERNAL_COMMANDS: set[str] = {"on-checkout", "on-commit"}
+INTERNAL_COMMANDS: set[str] = {"on-checkout", "on-commit", "refresh"}
 
 _ALL_COMMANDS: set[str] = set(COMMANDS.keys()) | INTERNAL_COMMANDS
 
 
+_HANDLERS: dict[str, str] = {
+    "base": "branchctx.commands.base:cmd_base",
+    "init": "branchctx.commands.init:cmd_init",
+    "uninstall": "branchctx.commands.uninstall:cmd_uninstall",
+    "sync": "branchctx.commands.sync:cmd_sync",
+    "status": "branchctx.commands.status:cmd_status",
+    "prompt": "branchctx.commands.prompt:cmd_prompt",
+    "prune": "branchctx.commands.prune:cmd_prune",
+    "on-checkout": "branchctx.commands.on_checkout:cmd_on_checkout",
+    "on-commit": "branchctx.commands.on_commit:cmd_on_commit",
+    "refresh": "branchctx.commands.refresh:cmd_refresh",
+    "template": "branchctx.commands.template:cmd_template",
+    "completion": "branchctx.commands.completion:cmd_completion",
+    "doctor": "branchctx.commands.doctor:cmd_doctor",
+}
+
+assert set(_HANDLERS.keys()) == _ALL_COMMANDS, "COMMANDS and handlers are out of sync"
+
+
 def get_command_handler(name: str) -> Callable[[list[str]], int]:
-    from branchctx.commands import (
-        cmd_base,
-        cmd_completion,
-        cmd_init,
-        cmd_on_checkout,
-        cmd_on_commit,
-        cmd_prune,
-        cmd_status,
-        cmd_sync,
-        cmd_template,
-        cmd_uninstall,
-    )
-
-    handlers: dict[str, Callable[[list[str]], int]] = {
-        "base": cmd_base,
-        "init": cmd_init,
-        "uninstall": cmd_uninstall,
-        "sync": cmd_sync,
-        "status": cmd_status,
-        "prune": cmd_prune,
-        "on-checkout": cmd_on_checkout,
-        "on-commit": cmd_on_commit,
-        "template": cmd_template,
-        "completion": cmd_completion,
-    }
-
-    assert set(handlers.keys()) == _ALL_COMMANDS, "COMMANDS and handlers are out of sync"
-
-    if name not in handlers:
+    if name not in _HANDLERS:
         raise ValueError(f"Unknown command: {name}")
 
-    return handlers[name]
+    from importlib import import_module
+
+    module_name, attr = _HANDLERS[name].split(":")
+    return getattr(import_module(module_name), attr)
 
 
 def get_all_command_names() -> set[str]:
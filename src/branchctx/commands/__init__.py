@@ -1,23 +1,28 @@
-from branchctx.commands.base import cmd_base
-from branchctx.commands.completion import cmd_completion
-from branchctx.commands.init import cmd_init
-from branchctx.commands.on_checkout import cmd_on_checkout
-from branchctx.commands.on_commit import cmd_on_commit
-from branchctx.commands.prune import cmd_prune
-from branchctx.commands.status import cmd_status
-from branchctx.commands.sync import cmd_sync
-from branchctx.commands.template import cmd_template
-from branchctx.commands.uninstall import cmd_uninstall
+from __future__ import annotations
 
-__all__ = [
-    "cmd_base",
-    "cmd_init",
-    "cmd_uninstall",
-    "cmd_sync",
-    "cmd_status",
-    "cmd_prune",
-    "cmd_on_checkout",
-    "cmd_on_commit",
-    "cmd_template",
-    "cmd_completion",
-]
+_EXPORTS: dict[str, str] = {
+    "cmd_base": "branchctx.commands.base",
+    "cmd_init": "branchctx.commands.init",
+    "cmd_uninstall": "branchctx.commands.uninstall",
+    "cmd_sync": "branchctx.commands.sync",
+    "cmd_status": "branchctx.commands.status",
+    "cmd_prompt": "branchctx.commands.prompt",
+    "cmd_prune": "branchctx.commands.prune",
+    "cmd_on_checkout": "branchctx.commands.on_checkout",
+    "cmd_on_commit": "branchctx.commands.on_commit",
+    "cmd_refresh": "branchctx.commands.refresh",
+    "cmd_template": "branchctx.commands.template",
+    "cmd_completion": "branchctx.commands.completion",
+    "cmd_doctor": "branchctx.commands.doctor",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+
+    return getattr(import_module(_EXPORTS[name]), name)
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-from typing import NamedTuple
+import fnmatch
+import sys
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, NamedTuple
 
 from branchctx.core.sync import (
     list_branches,
     sanitize_branch_name,
 )
 from branchctx.utils.color import green, red
-from branchctx.utils.git import git_list_branches, git_list_remote_branches
+from branchctx.utils.git import RefSnapshot, git_ref_snapshot
+from branchctx.utils.pager import write_lines
 
 
 class BranchInfo(NamedTuple):
@@ -17,79 +21,195 @@ class BranchInfo(NamedTuple):
     sanitized: str
 
 
-def collect_branch_info(git_root: str) -> dict[str, BranchInfo]:
+def iter_branch_info(git_root: str, refs: RefSnapshot | None = None) -> Iterator[tuple[str, BranchInfo]]:
+    refs = refs or git_ref_snapshot(git_root)
     context_dirs = set(list_branches(git_root))
-    local_branches = git_list_branches(git_root)
-    remote_branches = set(git_list_remote_branches(git_root))
+    local_branches = refs.local
+    remote_branches = set(refs.remote)
 
     local_to_sanitized = {b: sanitize_branch_name(b) for b in local_branches}
     sanitized_to_local = {v: k for k, v in local_to_sanitized.items()}
     sanitized_to_remote = {sanitize_branch_name(b): b for b in remote_branches}
 
-    all_names: dict[str, BranchInfo] = {}
+    seen: set[str] = set()
 
     for ctx in context_dirs:
         original = sanitized_to_local.get(ctx) or sanitized_to_remote.get(ctx) or ctx
-        has_remote = original in remote_branches
-        all_names[original] = BranchInfo(
-            context=True,
-            local=ctx in sanitized_to_local,
-            remote=has_remote,
-            sanitized=ctx,
+        seen.add(original)
+        yield (
+            original,
+            BranchInfo(
+                context=True,
+                local=ctx in sanitized_to_local,
+                remote=original in remote_branches,
+                sanitized=ctx,
+            ),
         )
 
     for branch in local_branches:
-        if branch not in all_names:
-            sanitized = local_to_sanitized[branch]
-            if sanitized not in context_dirs:
-                all_names[branch] = BranchInfo(
+        sanitized = local_to_sanitized[branch]
+        if branch not in seen and sanitized not in context_dirs:
+            yield (
+                branch,
+                BranchInfo(
                     context=False,
                     local=True,
                     remote=branch in remote_branches,
                     sanitized=sanitized,
-                )
+                ),
+            )
 
-    return all_names
 
+def collect_branch_info(git_root: str, refs: RefSnapshot | None = None) -> dict[str, BranchInfo]:
+    return dict(iter_branch_info(git_root, refs))
 
-def print_table(all_names: dict[str, BranchInfo], current: str | None) -> None:
-    if not all_names:
-        return
 
-    group_all = []
-    group_ctx_local = []
-    group_ctx_only = []
+ONLY_FILTERS: dict[str, Callable[[BranchInfo], bool]] = {
+    "orphans": lambda info: info.context and not info.local,
+    "contexts": lambda info: info.context,
+    "no-context": lambda info: not info.context,
+}
+
+STREAM_NAME_WIDTH = 40
+STREAM_CHUNK_ROWS = 200
+
+
+class TableOptions(NamedTuple):
+    pattern: str | None = None
+    only: str | None = None
+    stream: bool = False
+    pager: bool = True
+
+    @property
+    def filtered(self) -> bool:
+        return self.pattern is not None or self.only is not None
+
+
+def _option_value(args: list[str], flag: str) -> tuple[str | None, bool]:
+    if flag not in args:
+        return None, True
+    index = args.index(flag)
+    if index + 1 >= len(args) or args[index + 1].startswith("--"):
+        return None, False
+    return args[index + 1], True
+
+
+def parse_table_options(args: list[str]) -> tuple[TableOptions, str | None]:
+    pattern, valid = _option_value(args, "--filter")
+    if not valid:
+        return TableOptions(), "--filter expects a pattern, e.g. --filter 'feature/*'"
+
+    only, valid = _option_value(args, "--only")
+    if not valid or (only is not None and only not in ONLY_FILTERS):
+        return TableOptions(), f"--only expects one of: {', '.join(ONLY_FILTERS)}"
+
+    return TableOptions(pattern, only, "--stream" in args, "--no-pager" not in args), None
+
+
+def _matches(name: str, pattern: str) -> bool:
+    if any(c in pattern for c in "*?["):
+        return fnmatch.fnmatchcase(name, pattern)
+    return pattern in name
+
 
-    for name, info in all_names.items():
-        if info.context and info.local and info.remote:
-            group_all.append(name)
-        elif info.context and info.local:
-            group_ctx_local.append(name)
-        else:
-            group_ctx_only.append(name)
+def iter_filter_branch_info(
+    items: Iterable[tuple[str, BranchInfo]], options: TableOptions
+) -> Iterator[tuple[str, BranchInfo]]:
+    keep = ONLY_FILTERS.get(options.only or "", lambda _info: True)
+    for name, info in items:
+        if keep(info) and (options.pattern is None or _matches(name, options.pattern)):
+            yield name, info
 
-    group_all.sort()
-    group_ctx_local.sort()
-    group_ctx_only.sort()
 
-    groups = [g for g in [group_all, group_ctx_local, group_ctx_only] if g]
+def filter_branch_info(all_names: dict[str, BranchInfo], options: TableOptions) -> dict[str, BranchInfo]:
+    if not options.filtered:
+        return all_names
+    return dict(iter_filter_branch_info(all_names.items(), options))
 
-    max_len = max(len(n) for n in all_names)
-    col_w = max(max_len, 6)
 
+@dataclass
+class BranchCounts:
+    contexts: int = 0
+    orphans: int = 0
+
+    def count(self, items: Iterable[tuple[str, BranchInfo]]) -> Iterator[tuple[str, BranchInfo]]:
+        for name, info in items:
+            if info.context:
+                self.contexts += 1
+                if not info.local:
+                    self.orphans += 1
+            yield name, info
+
+
+def _group(info: BranchInfo) -> int:
+    if info.context and info.local and info.remote:
+        return 0
+    if info.context and info.local:
+        return 1
+    return 2
+
+
+def _header(col_w: int) -> list[str]:
+    return [f"    {'Branch':<{col_w}}  Context  Local  Remote", _separator(col_w)]
+
+
+def _separator(col_w: int) -> str:
+    return f"    {'─' * col_w}  ───────  ─────  ──────"
+
+
+def _row_renderer(current: str | None, col_w: int) -> Callable[[str, BranchInfo], str]:
     yes = green("✓")
     no = red("✗")
 
-    print(f"    {'Branch':<{col_w}}  Context  Local  Remote")
-    print(f"    {'─' * col_w}  ───────  ─────  ──────")
-
-    for i, group in enumerate(groups):
-        if i > 0:
-            print(f"    {'─' * col_w}  ───────  ─────  ──────")
-        for name in group:
-            info = all_names[name]
-            marker = "*" if current and name == current else " "
-            ctx = yes if info.context else no
-            local = yes if info.local else no
-            remote = yes if info.remote else no
-            print(f"  {marker} {name:<{col_w}}     {ctx}       {local}      {remote}")
+    def render(name: str, info: BranchInfo) -> str:
+        marker = "*" if current and name == current else " "
+        ctx = yes if info.context else no
+        local = yes if info.local else no
+        remote = yes if info.remote else no
+        return f"  {marker} {name:<{col_w}}     {ctx}       {local}      {remote}"
+
+    return render
+
+
+def render_table(all_names: dict[str, BranchInfo], current: str | None) -> list[str]:
+    if not all_names:
+        return []
+
+    col_w = max(max(len(n) for n in all_names), 6)
+    render = _row_renderer(current, col_w)
+
+    lines = _header(col_w)
+    previous_group = None
+    for name in sorted(all_names, key=lambda n: (_group(all_names[n]), n)):
+        group = _group(all_names[name])
+        if previous_group is not None and group != previous_group:
+            lines.append(_separator(col_w))
+        previous_group = group
+        lines.append(render(name, all_names[name]))
+    return lines
+
+
+def print_table(all_names: dict[str, BranchInfo], current: str | None, pager: bool = True) -> None:
+    lines = render_table(all_names, current)
+    if lines:
+        write_lines(lines, pager=pager)
+
+
+def stream_table(items: Iterable[tuple[str, BranchInfo]], current: str | None) -> int:
+    render = _row_renderer(current, STREAM_NAME_WIDTH)
+    out = sys.stdout
+    out.write("\n".join(_header(STREAM_NAME_WIDTH)) + "\n")
+
+    count = 0
+    chunk: list[str] = []
+    for name, info in items:
+        chunk.append(render(name, info))
+        count += 1
+        if len(chunk) >= STREAM_CHUNK_ROWS:
+            out.write("\n".join(chunk) + "\n")
+            out.flush()
+            chunk = []
+    if chunk:
+        out.write("\n".join(chunk) + "\n")
+    out.flush()
+    return count
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Callable
+
+from branchctx.utils.color import red
+
+Column = tuple[str, Callable[[dict], str]]
+
+
+def parse_recursive_root(args: list[str]) -> str | None:
+    if "--recursive" not in args:
+        return None
+    index = args.index("--recursive")
+    if index + 1 < len(args) and not args[index + 1].startswith("--"):
+        return os.path.abspath(os.path.expanduser(args[index + 1]))
+    return os.getcwd()
+
+
+def repo_label(root: str, repo: str) -> str:
+    return os.path.relpath(repo, root)
+
+
+def print_repo_rows(root: str, rows: list[dict], columns: list[Column], result: Callable[[dict], str]):
+    headers = ["Repo", *(header for header, _ in columns)]
+    table = [
+        [repo_label(root, row["repo"]), *("" if "error" in row else get(row) for _, get in columns)] for row in rows
+    ]
+    widths = [max(len(header), *(len(line[i]) for line in table)) for i, header in enumerate(headers)]
+
+    print("  ".join(header.ljust(width) for header, width in zip(headers, widths)) + "  Result")
+    print("  ".join("─" * width for width in widths) + "  ──────")
+    for row, line in zip(rows, table):
+        outcome = red(f"error: {row['error']}") if "error" in row else result(row)
+        print("  ".join(cell.ljust(width) for cell, width in zip(line, widths)) + f"  {outcome}")
+
+
+def print_repo_json(root: str, rows: list[dict]):
+    print(json.dumps([{**row, "repo": repo_label(root, row["repo"])} for row in rows], indent=2))
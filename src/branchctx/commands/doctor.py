@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from branchctx.constants import CLI_NAME
+from branchctx.core.doctor import format_bytes, run_perf_diagnostics
+from branchctx.core.hooks import get_current_branch, get_git_root
+from branchctx.data.config import config_exists
+from branchctx.utils.color import green, yellow
+
+DEFAULT_RUNS = 5
+MAX_PHASES = 10
+
+
+def _parse_runs(args: list[str]) -> int | None:
+    if "--runs" not in args:
+        return DEFAULT_RUNS
+    index = args.index("--runs")
+    try:
+        runs = int(args[index + 1])
+    except (IndexError, ValueError):
+        return None
+    return runs if runs > 0 else None
+
+
+def cmd_doctor(args: list[str]) -> int:
+    if "--perf" not in args:
+        print(f"usage: {CLI_NAME} doctor --perf [--runs N]")
+        return 1
+
+    runs = _parse_runs(args)
+    if runs is None:
+        print("error: --runs expects a positive integer")
+        return 1
+
+    git_root = get_git_root()
+    if not git_root:
+        print("error: not a git repository")
+        return 1
+
+    if not config_exists(git_root):
+        print(f"error: not initialized. Run '{CLI_NAME} init' first")
+        return 1
+
+    branch = get_current_branch(git_root)
+    if not branch:
+        print("error: could not determine current branch")
+        return 1
+
+    report = run_perf_diagnostics(git_root, branch, runs)
+
+    print(f"Branch:      {report.branch}")
+    print(f"Runs:        {report.runs}")
+
+    print()
+    print("Startup:")
+    print(f"  interpreter   {report.interpreter_ms:>8.1f}ms")
+    print(f"  imports       {report.import_ms:>8.1f}ms")
+    print(f"  launcher      {'yes' if report.launcher else 'no'}")
+    print(f"  fast path     {'yes' if report.shell_fast_path else 'no'}")
+
+    print()
+    print(f"{'Hook paths:':<24}{'p50':>10}{'p95':>10}{'git':>6}")
+    for path in report.paths:
+        print(f"  {path.name:<22}{path.p50_ms:>8.1f}ms{path.p95_ms:>8.1f}ms{path.git_calls:>6}")
+
+    print()
+    print(f"{'Phases:':<24}{'p50':>10}{'p95':>10}")
+    for phase in report.phases[:MAX_PHASES]:
+        print(f"  {phase.name:<22}{phase.p50_ms:>8.1f}ms{phase.p95_ms:>8.1f}ms")
+
+    print()
+    print("Storage:")
+    print(f"  meta.json     {format_bytes(report.meta_bytes)} ({report.meta_contexts} contexts)")
+    print(f"  context       {report.context_files} files, {report.tag_files} with tags")
+
+    print()
+    print("Recommendations:")
+    if not report.recommendations:
+        print(f"  {green('none')}")
+    for recommendation in report.recommendations:
+        print(f"  {yellow('-')} {recommendation}")
+
+    return 0
@@ -6,6 +6,7 @@ from pathlib import Path
 from branchctx.assets import copy_init_templates
 from branchctx.constants import CLI_NAME, CONFIG_FILE, DEFAULT_SYMLINK, HOOK_POST_CHECKOUT, HOOK_POST_COMMIT
 from branchctx.core.hooks import get_current_branch, get_git_root, install_hook
+from branchctx.core.launcher import build_launcher
 from branchctx.core.sync import sync_branch
 from branchctx.data.config import (
     Config,
@@ -16,12 +17,14 @@ from branchctx.data.config import (
 )
 
 
-def cmd_init(_args: list[str]) -> int:
+def cmd_init(args: list[str]) -> int:
     git_root = get_git_root()
     if not git_root:
         print("error: not a git repository")
         return 1
 
+    fast_launcher = "--fast-launcher" in args
+
     config_dir = get_config_dir(git_root)
     templates_dir = get_templates_dir(git_root)
     branches_dir = get_branches_dir(git_root)
@@ -42,9 +45,16 @@ def cmd_init(_args: list[str]) -> int:
         print(f"  templates: {templates_dir}/")
         print(f"  branches:  {branches_dir}/ (gitignored)")
 
-    checkout_result = install_hook(git_root, HOOK_POST_CHECKOUT)
+    launcher = None
+    if fast_launcher:
+        launcher = build_launcher(git_root)
+        print(f"Launcher built: {os.path.relpath(launcher, git_root)}")
+
+    checkout_result = install_hook(git_root, HOOK_POST_CHECKOUT, launcher)
     if checkout_result == "installed":
         print(f"Hook installed: {HOOK_POST_CHECKOUT}")
+    elif checkout_result == "updated":
+        print(f"Hook updated: {HOOK_POST_CHECKOUT}")
     elif checkout_result == "appended":
         print(f"Hook appended: {HOOK_POST_CHECKOUT}")
     elif checkout_result == "already_installed":
@@ -53,9 +63,11 @@ def cmd_init(_args: list[str]) -> int:
     elif checkout_result == "hook_exists":
         print(f"warning: {HOOK_POST_CHECKOUT} hook exists but not managed by {CLI_NAME}")
 
-    commit_result = install_hook(git_root, HOOK_POST_COMMIT)
+    commit_result = install_hook(git_root, HOOK_POST_COMMIT, launcher)
     if commit_result == "installed":
         print(f"Hook installed: {HOOK_POST_COMMIT}")
+    elif commit_result == "updated":
+        print(f"Hook updated: {HOOK_POST_COMMIT}")
     elif commit_result == "appended":
         print(f"Hook appended: {HOOK_POST_COMMIT}")
     elif commit_result == "hook_exists":
@@ -63,6 +75,8 @@ def cmd_init(_args: list[str]) -> int:
 
     _add_to_gitignore(git_root, DEFAULT_SYMLINK)
     _add_to_gitignore(git_root, ".bctx/branches/")
+    _add_to_gitignore(git_root, ".bctx/profile.log")
+    _add_to_gitignore(git_root, ".bctx/traces/")
 
     branch = get_current_branch(git_root)
     if branch:
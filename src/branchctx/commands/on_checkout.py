@@ -1,15 +1,15 @@
 from __future__ import annotations
 
+import time
+
 from branchctx.constants import CLI_NAME
-from branchctx.core.context_tags import update_context_tags
 from branchctx.core.hooks import get_git_root
-from branchctx.core.sync import sanitize_branch_name, sync_branch
-from branchctx.data.branch_base import get_base_branch
-from branchctx.data.config import config_exists
-from branchctx.data.meta import update_branch_meta
+from branchctx.data.paths import config_exists
 
 
 def cmd_on_checkout(args: list[str]) -> int:
+    started_at = time.monotonic()
+
     if len(args) < 2:
         print(f"usage: {CLI_NAME} on-checkout <old_branch> <new_branch>")
         return 1
@@ -25,18 +25,26 @@ def cmd_on_checkout(args: list[str]) -> int:
         print(f"Branch: {old_branch} -> {new_branch}")
         return 0
 
+    from branchctx.core.refresh import HookBudget, record_branch_head, refresh_branch_context
+    from branchctx.core.sync import sanitize_branch_name, sync_branch
+    from branchctx.data.branch_base import get_base_branch
+    from branchctx.data.config import Config
+
     result = sync_branch(git_root, new_branch)
 
     branch_key = sanitize_branch_name(new_branch)
     context_dir = result["branch_dir"]
     base_branch = get_base_branch(git_root, context_dir)
 
-    update_branch_meta(git_root, branch_key, base_branch)
-
-    update_context_tags(git_root, context_dir, branch_key, base_branch)
+    config = Config.load(git_root)
+    budget = HookBudget.from_config(config, started_at=started_at)
+    refresh = refresh_branch_context(git_root, context_dir, branch_key, base_branch, budget)
+    record_branch_head(git_root, branch_key, config, refresh, base_branch)
 
     cr = result["create_result"]
     status = "restored" if cr == "restored_from_archive" else "new" if cr != "exists" else "synced"
+    if refresh.stale:
+        status += ", stale"
     print(f"Branch: {old_branch} -> {new_branch} ({status})")
 
     return 0
@@ -1,17 +1,16 @@
 from __future__ import annotations
 
 import os
+import time
 
-from branchctx.constants import DEFAULT_SYMLINK
-from branchctx.core.context_tags import update_context_tags
+from branchctx.constants import CLI_NAME, DEFAULT_SYMLINK
 from branchctx.core.hooks import get_current_branch, get_git_root
-from branchctx.core.sync import sanitize_branch_name
-from branchctx.data.branch_base import get_base_branch
-from branchctx.data.config import config_exists
-from branchctx.data.meta import update_branch_meta
+from branchctx.data.paths import config_exists
 
 
 def cmd_on_commit(_args: list[str]) -> int:
+    started_at = time.monotonic()
+
     git_root = get_git_root()
     if not git_root:
         return 1
@@ -23,24 +22,29 @@ def cmd_on_commit(_args: list[str]) -> int:
     if not branch:
         return 0
 
-    branch_key = sanitize_branch_name(branch)
     context_dir = os.path.join(git_root, DEFAULT_SYMLINK)
     if not os.path.exists(context_dir):
         return 0
 
+    from branchctx.core.refresh import HookBudget, record_branch_head, refresh_branch_context
+    from branchctx.core.sync import sanitize_branch_name
+    from branchctx.data.branch_base import get_base_branch
+    from branchctx.data.config import Config
+
+    branch_key = sanitize_branch_name(branch)
     base_branch = get_base_branch(git_root, context_dir)
-    update_branch_meta(git_root, branch_key, base_branch)
-
-    updates = update_context_tags(
-        workspace=git_root,
-        context_dir=context_dir,
-        branch_key=branch_key,
-        base_branch=base_branch,
-    )
-
-    if updates:
-        print(f"Updated {len(updates)} tag(s) in context files:")
-        for update in updates:
+
+    config = Config.load(git_root)
+    budget = HookBudget.from_config(config, started_at=started_at)
+    refresh = refresh_branch_context(git_root, context_dir, branch_key, base_branch, budget)
+    record_branch_head(git_root, branch_key, config, refresh, base_branch)
+
+    if refresh.stale:
+        print(f"Context refresh deferred (over {budget.budget_ms}ms budget, run '{CLI_NAME} sync' to finish)")
+
+    if refresh.updates:
+        print(f"Updated {len(refresh.updates)} tag(s) in context files:")
+        for update in refresh.updates:
             rel_path = os.path.relpath(update.file, git_root)
             print(f"  {rel_path}: <{update.tag}>")
 
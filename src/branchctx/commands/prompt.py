@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import json
+import os
+
+from branchctx.core.prompt import find_repo, format_prompt, get_prompt_status, refresh_prompt_cache
+from branchctx.data.paths import config_exists
+
+
+def cmd_prompt(args: list[str]) -> int:
+    repo = find_repo(os.getcwd())
+    if not repo:
+        return 1
+
+    workspace, git_dir = repo
+    if not config_exists(workspace):
+        return 1
+
+    if "--refresh" in args:
+        refresh_prompt_cache(workspace, git_dir)
+        return 0
+
+    status = get_prompt_status(workspace, git_dir, background="--sync" not in args)
+
+    if "--json" in args:
+        print(json.dumps(status))
+    else:
+        print(format_prompt(status))
+
+    return 0
@@ -1,20 +1,79 @@
 from __future__ import annotations
 
-from branchctx.commands._branches import collect_branch_info, print_table
+from typing import Iterable, Iterator
+
+from branchctx.commands._branches import (
+    BranchInfo,
+    iter_branch_info,
+    iter_filter_branch_info,
+    parse_table_options,
+    print_table,
+    stream_table,
+)
 from branchctx.constants import CLI_NAME
 from branchctx.core.hooks import get_current_branch, get_git_root
 from branchctx.core.sync import (
-    archive_branch,
+    archive_branches,
     list_archived_branches,
     sanitize_branch_name,
 )
-from branchctx.data.config import config_exists
+from branchctx.data.config import Config, config_exists
 from branchctx.utils.color import green, red, yellow
-from branchctx.utils.git import git_delete_branch
+from branchctx.utils.git import git_delete_branches, git_ref_snapshot
 from branchctx.utils.prompt import multi_select
 
 
-def cmd_prune(_args: list[str]) -> int:
+def _prune_by_policy(git_root: str, dry_run: bool) -> int:
+    from branchctx.core.prune import apply_prune_plan, build_prune_plan
+
+    plan = build_prune_plan(git_root, Config.load(git_root).prune_policy)
+
+    if dry_run:
+        import json
+
+        print(json.dumps(plan.to_dict(), indent=2))
+        return 0
+
+    if plan.empty:
+        print("Nothing to prune")
+        return 0
+
+    result = apply_prune_plan(git_root, plan)
+
+    if plan.delete_branches:
+        print(f"Deleted {len(result.deleted)} local branch(es):\n")
+        for action in plan.delete_branches:
+            status = action.reason if action.branch in result.deleted else red("failed")
+            print(f"  {action.branch}  ({status})")
+
+    archived = set(result.archived)
+    if archived:
+        print(f"\nArchived {len(archived)} context(s):\n")
+        for action in plan.archive_contexts:
+            if action.context in archived:
+                print(f"  {action.branch}  ({action.reason})")
+
+    return 0 if len(result.deleted) == len(plan.delete_branches) else 1
+
+
+def _is_prune_candidate(name: str, info: BranchInfo, current_sanitized: str | None) -> bool:
+    if info.sanitized == current_sanitized:
+        return False
+    if info.context and not info.local:
+        return True
+    return info.local and not info.remote and name not in ("main", "master")
+
+
+def _collect_candidates(
+    items: Iterable[tuple[str, BranchInfo]], current_sanitized: str | None, candidates: dict[str, BranchInfo]
+) -> Iterator[tuple[str, BranchInfo]]:
+    for name, info in items:
+        if _is_prune_candidate(name, info, current_sanitized):
+            candidates[name] = info
+        yield name, info
+
+
+def cmd_prune(args: list[str]) -> int:
     git_root = get_git_root()
     if not git_root:
         print("error: not a git repository")
@@ -24,24 +83,44 @@ def cmd_prune(_args: list[str]) -> int:
         print(f"error: not initialized. Run '{CLI_NAME} init' first")
         return 1
 
-    all_names = collect_branch_info(git_root)
-    current = get_current_branch(git_root)
-    current_sanitized = sanitize_branch_name(current) if current else None
+    if "--policy" in args:
+        return _prune_by_policy(git_root, "--dry-run" in args)
 
-    no_local = [n for n, i in all_names.items() if i.context and not i.local and i.sanitized != current_sanitized]
+    if "--dry-run" in args:
+        print("error: --dry-run requires --policy")
+        return 1
 
-    deletable = [
-        n
-        for n, i in all_names.items()
-        if i.local and not i.remote and i.sanitized != current_sanitized and n not in ("main", "master")
-    ]
+    options, error = parse_table_options(args)
+    if error:
+        print(f"error: {error}")
+        return 1
 
-    if not no_local and not deletable:
-        print("Nothing to prune")
-        return 0
+    refs = git_ref_snapshot(git_root)
+    current = refs.current or get_current_branch(git_root)
+    current_sanitized = sanitize_branch_name(current) if current else None
 
-    print(f"Branch contexts ({len(all_names)}):\n")
-    print_table(all_names, current)
+    candidates: dict[str, BranchInfo] = {}
+    rows = _collect_candidates(
+        iter_filter_branch_info(iter_branch_info(git_root, refs), options), current_sanitized, candidates
+    )
+
+    if options.stream:
+        print("Branch contexts:\n")
+        shown = stream_table(rows, current)
+        print(f"\n{shown} shown")
+        if not candidates:
+            print("\nNothing to prune")
+            return 0
+    else:
+        all_names = dict(rows)
+        if not candidates:
+            print("Nothing to prune")
+            return 0
+        print(f"Branch contexts ({len(all_names)}):\n")
+        print_table(all_names, current, pager=options.pager)
+
+    no_local = [n for n, i in candidates.items() if i.context and not i.local]
+    deletable = [n for n, i in candidates.items() if not (i.context and not i.local)]
 
     archived = list_archived_branches(git_root)
     if archived:
@@ -53,7 +132,7 @@ def cmd_prune(_args: list[str]) -> int:
         print(f"\nSelect {yellow('local branches')} to delete:")
         labels = []
         for n in deletable_sorted:
-            remote_status = green("remote: ✓") if all_names[n].remote else red("remote: ✗")
+            remote_status = green("remote: ✓") if candidates[n].remote else red("remote: ✗")
             labels.append(f"{n}  {remote_status}")
         selected = multi_select(deletable_sorted, labels)
         to_delete = [deletable_sorted[i] for i in selected]
@@ -61,15 +140,12 @@ def cmd_prune(_args: list[str]) -> int:
     deleted: list[str] = []
     if to_delete:
         print(f"\nDeleting {len(to_delete)} local branch(es):\n")
+        deleted = git_delete_branches(git_root, sorted(to_delete), force=True)
         for name in sorted(to_delete):
-            if git_delete_branch(git_root, name, force=True):
-                print(f"  {name}")
-                deleted.append(name)
-            else:
-                print(f"  {name} ({red('failed')})")
+            print(f"  {name}" if name in deleted else f"  {name} ({red('failed')})")
 
     for name in deleted:
-        info = all_names[name]
+        info = candidates[name]
         if info.context and name not in no_local:
             no_local.append(name)
 
@@ -86,9 +162,9 @@ def cmd_prune(_args: list[str]) -> int:
 
     if to_archive:
         print(f"\nArchiving {len(to_archive)} context(s):\n")
+        archived = set(archive_branches(git_root, [candidates[name].sanitized for name in sorted(to_archive)]))
         for name in sorted(to_archive):
-            sanitized = all_names[name].sanitized
-            if archive_branch(git_root, sanitized):
+            if candidates[name].sanitized in archived:
                 print(f"  {name}")
 
     print(f"\nDone. Use '{CLI_NAME} status' to see current contexts.")
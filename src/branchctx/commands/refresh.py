@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from branchctx.core.hooks import get_current_branch, get_git_root
+from branchctx.core.refresh import HookBudget, record_branch_head, refresh_branch_context
+from branchctx.core.sync import get_branch_dir, sanitize_branch_name
+from branchctx.data.branch_base import get_base_branch
+from branchctx.data.config import Config, config_exists
+from branchctx.data.meta import get_branch_meta
+
+
+def cmd_refresh(_args: list[str]) -> int:
+    git_root = get_git_root()
+    if not git_root:
+        return 1
+
+    if not config_exists(git_root):
+        return 0
+
+    branch = get_current_branch(git_root)
+    if not branch:
+        return 0
+
+    branch_key = sanitize_branch_name(branch)
+    meta = get_branch_meta(git_root, branch_key)
+    if not meta or not meta.get("stale"):
+        return 0
+
+    context_dir = get_branch_dir(git_root, branch)
+    base_branch = get_base_branch(git_root, context_dir)
+
+    config = Config.load(git_root)
+    budget = HookBudget.from_config(config, enforce=False)
+    refresh = refresh_branch_context(git_root, context_dir, branch_key, base_branch, budget)
+    record_branch_head(git_root, branch_key, config, refresh, base_branch)
+
+    return 0
@@ -1,106 +1,247 @@
 from __future__ import annotations
 
 import os
-
-from branchctx.commands._branches import collect_branch_info, print_table
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import NamedTuple
+
+from branchctx.commands._branches import (
+    BranchCounts,
+    BranchInfo,
+    TableOptions,
+    collect_branch_info,
+    filter_branch_info,
+    iter_branch_info,
+    iter_filter_branch_info,
+    parse_table_options,
+    print_table,
+    stream_table,
+)
+from branchctx.commands._workspaces import parse_recursive_root, print_repo_json, print_repo_rows
 from branchctx.constants import CLI_NAME, DEFAULT_SYMLINK, DEFAULT_TEMPLATE, HOOK_POST_CHECKOUT, HOOK_POST_COMMIT
-from branchctx.core.hooks import get_current_branch, get_git_root, is_hook_installed
+from branchctx.core.hooks import get_current_branch, get_git_root, get_installed_hooks
 from branchctx.core.sync import get_branch_dir, list_archived_branches
 from branchctx.data.branch_base import get_base_branch
 from branchctx.data.config import config_exists, get_templates_dir, list_templates
 from branchctx.utils.color import green, red, yellow
+from branchctx.utils.git import RefSnapshot, git_ref_snapshot
+from branchctx.utils.profile import profiled
 
 STATUS_OK = green("[ok]")
 STATUS_ERROR = red("[!!]")
 STATUS_WARN = yellow("[--]")
 
 
-def cmd_status(_args: list[str]) -> int:
-    git_root = get_git_root()
-    if not git_root:
-        print("error: not a git repository")
-        return 1
+class HealthCheck(NamedTuple):
+    marker: str
+    message: str
+    issue: str | None = None
 
-    initialized = config_exists(git_root)
-    if not initialized:
-        print(f"error: {CLI_NAME} not initialized")
-        print(f"run: {CLI_NAME} init")
-        return 1
 
-    branch = get_current_branch(git_root)
+@profiled("status.gather")
+def _gather(git_root: str) -> dict:
+    tasks = {
+        "refs": partial(git_ref_snapshot, git_root),
+        "hooks": partial(get_installed_hooks, git_root, (HOOK_POST_CHECKOUT, HOOK_POST_COMMIT)),
+        "templates": partial(list_templates, git_root),
+        "archived": partial(list_archived_branches, git_root),
+    }
+    with ThreadPoolExecutor(max_workers=len(tasks)) as pool:
+        futures = {name: pool.submit(task) for name, task in tasks.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def _check_hooks(hooks: dict[str, bool]) -> list[HealthCheck]:
+    checks = []
+    for hook_type, installed in hooks.items():
+        if installed:
+            checks.append(HealthCheck(STATUS_OK, f"{hook_type} hook installed"))
+        else:
+            issue = f"{hook_type} hook not installed"
+            checks.append(HealthCheck(STATUS_ERROR, issue, issue))
+    return checks
+
+
+def _check_templates(git_root: str, templates: list[str]) -> list[HealthCheck]:
+    checks = []
+    if os.path.exists(get_templates_dir(git_root)):
+        checks.append(HealthCheck(STATUS_OK, "templates/ exists"))
+    else:
+        checks.append(HealthCheck(STATUS_ERROR, "templates/ missing", "templates/ missing"))
+
+    if DEFAULT_TEMPLATE in templates:
+        checks.append(HealthCheck(STATUS_OK, f"{DEFAULT_TEMPLATE} template exists"))
+    else:
+        issue = f"{DEFAULT_TEMPLATE} template missing"
+        checks.append(HealthCheck(STATUS_ERROR, issue, issue))
+    return checks
+
+
+def _check_symlink(git_root: str) -> HealthCheck:
     symlink_path = os.path.join(git_root, DEFAULT_SYMLINK)
-    symlink_target = None
     if os.path.islink(symlink_path):
         symlink_target = os.readlink(symlink_path)
+        if os.path.exists(os.path.join(git_root, symlink_target)):
+            return HealthCheck(STATUS_OK, "symlink valid")
+        return HealthCheck(STATUS_ERROR, f"symlink broken -> {symlink_target}", "symlink points to non-existent target")
+    if os.path.exists(symlink_path):
+        issue = "symlink path exists but is not a symlink"
+        return HealthCheck(STATUS_ERROR, f"{DEFAULT_SYMLINK} is not a symlink", issue)
+    return HealthCheck(STATUS_WARN, "symlink not set")
+
+
+def _count_orphans(all_names: dict[str, BranchInfo]) -> int:
+    return sum(1 for i in all_names.values() if i.context and not i.local)
+
+
+def _check_orphans(orphan_count: int) -> HealthCheck:
+    if orphan_count:
+        return HealthCheck(STATUS_WARN, f"{orphan_count} orphan contexts")
+    return HealthCheck(STATUS_OK, "no orphan contexts")
+
+
+class StatusReport(NamedTuple):
+    branch: str | None
+    base: str
+    templates: list[str]
+    checks: list[HealthCheck]
+    all_names: dict[str, BranchInfo]
+    archived_count: int
+    refs: RefSnapshot
+
+    @property
+    def issues(self) -> list[str]:
+        return [check.issue for check in self.checks if check.issue]
+
+    @property
+    def context_count(self) -> int:
+        return sum(1 for i in self.all_names.values() if i.context)
+
+
+def collect_status(git_root: str, branches: bool = True) -> StatusReport:
+    results = _gather(git_root)
+    refs = results["refs"]
+    templates = results["templates"]
+    branch = refs.current or get_current_branch(git_root)
+    all_names = collect_branch_info(git_root, refs) if branches else {}
+
+    checks = [
+        *_check_hooks(results["hooks"]),
+        *_check_templates(git_root, templates),
+        _check_symlink(git_root),
+    ]
+    if branches:
+        checks.append(_check_orphans(_count_orphans(all_names)))
+    return StatusReport(
+        branch=branch,
+        base=get_base_branch(git_root, get_branch_dir(git_root, branch)),
+        templates=templates,
+        checks=checks,
+        all_names=all_names,
+        archived_count=len(results["archived"]),
+        refs=refs,
+    )
+
+
+def summarize_repo_status(git_root: str) -> dict:
+    report = collect_status(git_root)
+    return {
+        "branch": report.branch,
+        "base": report.base,
+        "contexts": report.context_count,
+        "orphans": _count_orphans(report.all_names),
+        "archived": report.archived_count,
+        "issues": report.issues,
+    }
+
+
+def _status_recursive(root: str, as_json: bool) -> int:
+    from branchctx.core.workspaces import find_initialized_repos, map_repos
+
+    if not os.path.isdir(root):
+        print(f"error: not a directory: {root}")
+        return 1
 
-    print(f"Branch:      {branch}")
-    branch_dir = get_branch_dir(git_root, branch)
-    print(f"Base:        {get_base_branch(git_root, branch_dir)}")
-
-    templates = list_templates(git_root)
-    print(f"Templates:   {', '.join(sorted(templates)) if templates else 'none'}")
+    repos = find_initialized_repos(root)
+    if not repos and not as_json:
+        print(f"No initialized repos under {root}")
+        return 0
 
-    has_checkout_hook = is_hook_installed(git_root, HOOK_POST_CHECKOUT)
-    has_commit_hook = is_hook_installed(git_root, HOOK_POST_COMMIT)
+    rows = map_repos(summarize_repo_status, repos)
+    if as_json:
+        print_repo_json(root, rows)
+    else:
+        print_repo_rows(
+            root,
+            rows,
+            [
+                ("Branch", lambda row: str(row["branch"])),
+                ("Contexts", lambda row: str(row["contexts"])),
+                ("Orphans", lambda row: str(row["orphans"])),
+            ],
+            lambda row: red(f"{len(row['issues'])} issue(s)") if row["issues"] else green("ok"),
+        )
+        print(f"\n{len(rows)} repo(s)")
+
+    if any("error" in row or row["issues"] for row in rows):
+        return 1
+    return 0
 
-    all_names = collect_branch_info(git_root)
 
-    print()
-    print("Health:")
+def _stream_branches(git_root: str, report: StatusReport, options: TableOptions):
+    counts = BranchCounts()
+    rows = iter_filter_branch_info(counts.count(iter_branch_info(git_root, report.refs)), options)
 
-    issues = []
+    print("\nBranches:\n")
+    shown = stream_table(rows, report.branch)
 
-    if has_checkout_hook:
-        print(f"  {STATUS_OK} {HOOK_POST_CHECKOUT} hook installed")
-    else:
-        issues.append(f"{HOOK_POST_CHECKOUT} hook not installed")
-        print(f"  {STATUS_ERROR} {HOOK_POST_CHECKOUT} hook not installed")
+    print(f"\n{counts.contexts} contexts, {report.archived_count} archived, {shown} shown")
+    check = _check_orphans(counts.orphans)
+    print(f"  {check.marker} {check.message}")
 
-    if has_commit_hook:
-        print(f"  {STATUS_OK} {HOOK_POST_COMMIT} hook installed")
-    else:
-        issues.append(f"{HOOK_POST_COMMIT} hook not installed")
-        print(f"  {STATUS_ERROR} {HOOK_POST_COMMIT} hook not installed")
 
-    templates_dir = get_templates_dir(git_root)
-    if os.path.exists(templates_dir):
-        print(f"  {STATUS_OK} templates/ exists")
-    else:
-        issues.append("templates/ missing")
-        print(f"  {STATUS_ERROR} templates/ missing")
+def cmd_status(args: list[str]) -> int:
+    root = parse_recursive_root(args)
+    if root is not None:
+        return _status_recursive(root, "--json" in args)
 
-    if DEFAULT_TEMPLATE in templates:
-        print(f"  {STATUS_OK} {DEFAULT_TEMPLATE} template exists")
-    else:
-        issues.append(f"{DEFAULT_TEMPLATE} template missing")
-        print(f"  {STATUS_ERROR} {DEFAULT_TEMPLATE} template missing")
+    options, error = parse_table_options(args)
+    if error:
+        print(f"error: {error}")
+        return 1
 
-    if os.path.islink(symlink_path):
-        if os.path.exists(os.path.join(git_root, symlink_target)):
-            print(f"  {STATUS_OK} symlink valid")
-        else:
-            issues.append("symlink points to non-existent target")
-            print(f"  {STATUS_ERROR} symlink broken -> {symlink_target}")
-    elif os.path.exists(symlink_path):
-        issues.append("symlink path exists but is not a symlink")
-        print(f"  {STATUS_ERROR} {DEFAULT_SYMLINK} is not a symlink")
-    else:
-        print(f"  {STATUS_WARN} symlink not set")
+    git_root = get_git_root()
+    if not git_root:
+        print("error: not a git repository")
+        return 1
 
-    orphans = [n for n, i in all_names.items() if i.context and not i.local]
-    if orphans:
-        print(f"  {STATUS_WARN} {len(orphans)} orphan contexts")
-    else:
-        print(f"  {STATUS_OK} no orphan contexts")
+    initialized = config_exists(git_root)
+    if not initialized:
+        print(f"error: {CLI_NAME} not initialized")
+        print(f"run: {CLI_NAME} init")
+        return 1
 
-    if all_names:
-        context_count = sum(1 for i in all_names.values() if i.context)
-        archived = list_archived_branches(git_root)
-        archived_count = len(archived) if archived else 0
+    report = collect_status(git_root, branches=not options.stream)
 
-        print(f"\nBranches ({context_count} contexts, {archived_count} archived):\n")
-        print_table(all_names, branch)
+    print(f"Branch:      {report.branch}")
+    print(f"Base:        {report.base}")
+    print(f"Templates:   {', '.join(sorted(report.templates)) if report.templates else 'none'}")
 
-    if issues:
+    print()
+    print("Health:")
+    for check in report.checks:
+        print(f"  {check.marker} {check.message}")
+
+    if options.stream:
+        _stream_branches(git_root, report, options)
+    elif report.all_names:
+        shown = filter_branch_info(report.all_names, options)
+        summary = f"{report.context_count} contexts, {report.archived_count} archived"
+        if options.filtered:
+            summary += f", {len(shown)} shown"
+        print(f"\nBranches ({summary}):\n")
+        print_table(shown, report.branch, pager=options.pager)
+
+    if report.issues:
         return 1
     return 0
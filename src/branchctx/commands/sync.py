@@ -1,15 +1,118 @@
 from __future__ import annotations
 
+import os
+
+from branchctx.commands._workspaces import parse_recursive_root, print_repo_json, print_repo_rows
 from branchctx.constants import CLI_NAME
-from branchctx.core.context_tags import update_context_tags
 from branchctx.core.hooks import get_current_branch, get_git_root
+from branchctx.core.refresh import HookBudget, RefreshResult, record_branch_head, refresh_branch_context
 from branchctx.core.sync import sanitize_branch_name, sync_branch
 from branchctx.data.branch_base import get_base_branch
-from branchctx.data.config import config_exists
-from branchctx.data.meta import update_branch_meta
+from branchctx.data.config import Config, config_exists
+
+
+def _parse_pattern(args: list[str]) -> tuple[str | None, bool]:
+    if "--pattern" not in args:
+        return None, True
+    index = args.index("--pattern")
+    if index + 1 >= len(args) or args[index + 1].startswith("--"):
+        return None, False
+    return args[index + 1], True
+
+
+def _sync_all(git_root: str, pattern: str | None) -> int:
+    from branchctx.core.bulk import sync_all_branches
+
+    result = sync_all_branches(git_root, pattern)
+    if not result.branches:
+        print(f"No branches match '{pattern}'" if pattern else "No local branches")
+        return 0
+
+    created = set(result.created)
+    updated = [b for b in result.branches if sanitize_branch_name(b) in result.updated and b not in created]
+
+    print(f"Branches: {len(result.branches)}" + (f" (matching '{pattern}')" if pattern else ""))
+    print(f"Created:  {len(result.created)}")
+    print(f"Updated:  {len(updated)}")
+    if result.tag_updates:
+        print(f"Tags:     {result.tag_updates} updated")
+    return 0
+
+
+def _describe_create_result(create_result: str) -> str:
+    if create_result == "created_from_template":
+        return "created from template"
+    if create_result == "created_empty":
+        return "created (no template)"
+    return "synced"
+
+
+def _sync_current(git_root: str, branch: str, notify: bool = True) -> tuple[dict, str, RefreshResult]:
+    result = sync_branch(git_root, branch, notify=notify)
+
+    branch_key = sanitize_branch_name(branch)
+    context_dir = result["branch_dir"]
+    base_branch = get_base_branch(git_root, context_dir)
+
+    config = Config.load(git_root)
+    budget = HookBudget.from_config(config, enforce=False)
+    refresh = refresh_branch_context(git_root, context_dir, branch_key, base_branch, budget)
+    record_branch_head(git_root, branch_key, config, refresh, base_branch)
+    return result, base_branch, refresh
+
+
+def sync_repo(git_root: str) -> dict:
+    branch = get_current_branch(git_root)
+    if not branch:
+        return {"error": "could not determine current branch"}
+
+    result, base_branch, refresh = _sync_current(git_root, branch, notify=False)
+    return {
+        "branch": branch,
+        "base": base_branch,
+        "status": _describe_create_result(result["create_result"]),
+        "tag_updates": len(refresh.updates),
+    }
 
 
-def cmd_sync(_args: list[str]) -> int:
+def _sync_recursive(root: str, as_json: bool) -> int:
+    from branchctx.core.workspaces import find_initialized_repos, map_repos
+
+    if not os.path.isdir(root):
+        print(f"error: not a directory: {root}")
+        return 1
+
+    repos = find_initialized_repos(root)
+    if not repos and not as_json:
+        print(f"No initialized repos under {root}")
+        return 0
+
+    rows = map_repos(sync_repo, repos)
+    if as_json:
+        print_repo_json(root, rows)
+    else:
+        print_repo_rows(
+            root,
+            rows,
+            [
+                ("Branch", lambda row: row["branch"]),
+                ("Tags", lambda row: str(row["tag_updates"])),
+            ],
+            lambda row: row["status"],
+        )
+        print(f"\n{len(rows)} repo(s)")
+
+    return 1 if any("error" in row for row in rows) else 0
+
+
+def cmd_sync(args: list[str]) -> int:
+    root = parse_recursive_root(args)
+    if root is not None:
+        if "--all" in args or "--pattern" in args:
+            print("error: --recursive cannot be combined with --all or --pattern")
+            return 1
+        return _sync_recursive(root, "--json" in args)
+
     git_root = get_git_root()
     if not git_root:
         print("error: not a git repository")
@@ -19,34 +122,32 @@ def cmd_sync(_args: list[str]) -> int:
         print(f"error: not initialized. Run '{CLI_NAME} init' first")
         return 1
 
-    branch = get_current_branch(git_root)
-    if not branch:
-        print("error: could not determine current branch")
+    pattern, valid = _parse_pattern(args)
+    if not valid:
+        print("error: --pattern expects a glob, e.g. --pattern 'feature/*'")
         return 1
 
-    result = sync_branch(git_root, branch)
+    if "--all" in args:
+        return _sync_all(git_root, pattern)
 
-    branch_key = sanitize_branch_name(branch)
-    context_dir = result["branch_dir"]
-    base_branch = get_base_branch(git_root, context_dir)
+    if pattern is not None:
+        print("error: --pattern requires --all")
+        return 1
 
-    update_branch_meta(git_root, branch_key, base_branch)
+    branch = get_current_branch(git_root)
+    if not branch:
+        print("error: could not determine current branch")
+        return 1
 
-    updates = update_context_tags(git_root, context_dir, branch_key, base_branch)
+    result, base_branch, refresh = _sync_current(git_root, branch)
 
     print(f"Branch:  {result['branch']}")
     print(f"Context: {result['branch_dir']}")
     print(f"Symlink: {result['symlink_path']} -> {result['branch_dir']}")
     print(f"Base:    {base_branch}")
+    print(f"Status:  {_describe_create_result(result['create_result'])}")
 
-    if result["create_result"] == "created_from_template":
-        print("Status:  created from template")
-    elif result["create_result"] == "created_empty":
-        print("Status:  created (no template)")
-    else:
-        print("Status:  synced")
-
-    if updates:
-        print(f"Updated: {len(updates)} tag(s)")
+    if refresh.updates:
+        print(f"Updated: {len(refresh.updates)} tag(s)")
 
     return 0
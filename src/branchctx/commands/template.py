@@ -3,11 +3,11 @@ from __future__ import annotations
 import sys
 
 from branchctx.constants import CLI_NAME
-from branchctx.core.context_tags import update_context_tags
 from branchctx.core.hooks import get_current_branch, get_git_root
+from branchctx.core.refresh import HookBudget, refresh_branch_context
 from branchctx.core.sync import get_branch_dir, reset_branch_context, sanitize_branch_name
 from branchctx.data.branch_base import get_base_branch
-from branchctx.data.config import config_exists, list_templates
+from branchctx.data.config import Config, config_exists, list_templates
 
 
 def _select_template(templates: list[str]) -> str | None:
@@ -78,7 +78,10 @@ def cmd_template(args: list[str]) -> int:
 
     branch_key = sanitize_branch_name(branch)
     context_dir = get_branch_dir(git_root, branch)
-    update_context_tags(git_root, context_dir, branch_key, get_base_branch(git_root, context_dir))
+    base_branch = get_base_branch(git_root, context_dir)
+
+    budget = HookBudget.from_config(Config.load(git_root), enforce=False)
+    refresh_branch_context(git_root, context_dir, branch_key, base_branch, budget)
 
     print(f"Applied template '{template}' to '{branch}'")
     return 0
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import os
+
 from branchctx.constants import CLI_NAME, HOOK_POST_CHECKOUT, HOOK_POST_COMMIT
 from branchctx.core.hooks import get_git_root, uninstall_hook
+from branchctx.core.launcher import get_launcher_path, remove_launcher
 from branchctx.utils.git import git_config_unset
 
 
@@ -29,6 +32,9 @@ def cmd_uninstall(args: list[str]) -> int:
     elif commit_result == "not_managed":
         print(f"warning: {HOOK_POST_COMMIT} hook exists but not managed by {CLI_NAME}")
 
+    if remove_launcher(git_root):
+        print(f"Launcher removed: {os.path.relpath(get_launcher_path(git_root), git_root)}")
+
     if checkout_result == "not_installed" and commit_result == "not_installed":
         print("No hooks installed")
 
@@ -6,11 +6,21 @@ GIT_DIR = ".git"
 HOOK_MARKER = "# branch-ctx-managed"
 HOOK_POST_CHECKOUT = "post-checkout"
 HOOK_POST_COMMIT = "post-commit"
+LAUNCHER_FILE = "bctx-launcher.py"
+LAUNCHER_ARCHIVE = "bctx-launcher.pyz"
 DEFAULT_SOUND_FILE = "notification.oga"
 
 CONFIG_DIR = ".bctx"
 CONFIG_FILE = "config.json"
 META_FILE = "meta.json"
+TAG_INDEX_FILE = "tag_index.json"
+STATE_FILE = "state.json"
+PROMPT_CACHE_FILE = "prompt.json"
+HEADS_DIR = ".heads"
+SOUND_MARKER_FILE = ".sound"
+PROFILE_LOG_FILE = "profile.log"
+TRACES_DIR = "traces"
+PROFILE_ENV = "BCTX_PROFILE"
 TEMPLATES_DIR = "templates"
 BRANCHES_DIR = "branches"
 ARCHIVED_DIR = "_archived"
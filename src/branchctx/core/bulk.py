@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import fnmatch
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from branchctx.core.context_tags import (
+    build_tag_content_map,
+    get_index_meta_fields,
+    get_tag_payload_digest,
+    index_context_files,
+    write_context_tags,
+)
+from branchctx.core.refresh import RefreshResult, record_branch_head
+from branchctx.core.sync import create_branch_context, get_branch_dir, sanitize_branch_name
+from branchctx.data.branch_base import get_base_branch
+from branchctx.data.config import Config
+from branchctx.data.meta import compute_meta_entry, load_branch_meta, new_branch_meta_entry, save_branch_meta_entries
+from branchctx.data.tag_index import load_tag_index, save_tag_index_entries
+from branchctx.utils.git import git_list_branch_heads, git_resolve_ref, git_user_name
+from branchctx.utils.profile import profiled, span
+
+
+@dataclass
+class BulkSyncResult:
+    branches: list[str] = field(default_factory=list)
+    created: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    tag_updates: int = 0
+
+
+@dataclass
+class _BranchJob:
+    branch: str
+    key: str
+    head: str
+    context_dir: str
+    base_branch: str
+    index: dict
+    index_changed: bool
+
+
+def select_branches(heads: dict[str, str], pattern: str | None = None) -> dict[str, str]:
+    if pattern is None:
+        return dict(heads)
+    return {name: sha for name, sha in heads.items() if fnmatch.fnmatchcase(name, pattern)}
+
+
+def _compute_entry(args: tuple) -> tuple[str, dict]:
+    workspace, branch_key, current, base_branch, fields, head = args
+    return branch_key, compute_meta_entry(workspace, branch_key, current, base_branch, fields, head)
+
+
+@profiled("bulk.compute_meta")
+def _compute_entries(args: list[tuple], max_workers: int) -> dict[str, dict]:
+    workers = min(max_workers, len(args))
+    if workers <= 1:
+        return dict(map(_compute_entry, args))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(_compute_entry, args, chunksize=max(1, len(args) // (workers * 4))))
+
+
+@profiled("bulk.materialize")
+def _materialize_contexts(workspace: str, branches: list[str]) -> list[str]:
+    return [branch for branch in branches if create_branch_context(workspace, branch, record_meta=False) != "exists"]
+
+
+@profiled("bulk.sync_all_branches")
+def sync_all_branches(workspace: str, pattern: str | None = None, max_workers: int | None = None) -> BulkSyncResult:
+    heads = select_branches(git_list_branch_heads(workspace), pattern)
+    result = BulkSyncResult(branches=sorted(heads))
+    if not heads:
+        return result
+
+    config = Config.load(workspace)
+    result.created = _materialize_contexts(workspace, result.branches)
+
+    meta = load_branch_meta(workspace)
+    tag_index = load_tag_index(workspace)
+    missing = [branch for branch in result.branches if sanitize_branch_name(branch) not in meta]
+    if missing:
+        author = git_user_name(workspace)
+        for branch in missing:
+            meta[sanitize_branch_name(branch)] = new_branch_meta_entry(branch, author)
+
+    jobs = []
+    with span("bulk.index", branches=len(heads)):
+        for branch in result.branches:
+            key = sanitize_branch_name(branch)
+            context_dir = get_branch_dir(workspace, branch)
+            index, index_changed = index_context_files(context_dir, tag_index.get(key))
+            jobs.append(
+                _BranchJob(
+                    branch=branch,
+                    key=key,
+                    head=heads[branch],
+                    context_dir=context_dir,
+                    base_branch=get_base_branch(workspace, context_dir),
+                    index=index,
+                    index_changed=index_changed,
+                )
+            )
+
+    entries = _compute_entries(
+        [
+            (workspace, job.key, meta[job.key], job.base_branch, get_index_meta_fields(job.index), job.head)
+            for job in jobs
+        ],
+        max_workers or os.cpu_count() or 1,
+    )
+
+    index_updates = {}
+    with span("bulk.tags"):
+        for job in jobs:
+            entry = entries[job.key]
+            tag_content_map = build_tag_content_map(entry, job.base_branch)
+            digest = get_tag_payload_digest(tag_content_map)
+            if entry.get("tags_digest") == digest and not job.index_changed:
+                continue
+
+            updates, files_changed = write_context_tags(job.context_dir, job.index, tag_content_map)
+            result.tag_updates += len(updates)
+            if job.index_changed or files_changed:
+                index_updates[job.key] = job.index
+            entry["tags_digest"] = digest
+
+    if index_updates:
+        save_tag_index_entries(workspace, index_updates)
+    result.updated = save_branch_meta_entries(workspace, entries)
+
+    base_heads = {base: git_resolve_ref(workspace, base) for base in {job.base_branch for job in jobs}}
+    for job in jobs:
+        record_branch_head(
+            workspace, job.key, config, RefreshResult(), job.base_branch, job.head, base_heads[job.base_branch]
+        )
+
+    return result
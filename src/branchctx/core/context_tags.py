@@ -1,17 +1,27 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import os
 import re
 from dataclasses import dataclass
 
 from branchctx.constants import CONTEXT_FILE_EXTENSIONS
-from branchctx.data.meta import get_branch_meta
+from branchctx.data.meta import get_branch_meta, set_branch_tags_digest
+from branchctx.data.tag_index import get_branch_tag_index, save_branch_tag_index
+from branchctx.utils.profile import profiled
 
 TAG_COMMITS = "bctx:commits"
 TAG_FILES = "bctx:files"
 TAG_PATTERN = re.compile(r"<(bctx:(?:commits|files))>(.*?)</\1>", re.DOTALL)
+TAG_PATTERN_BYTES = re.compile(rb"<(bctx:(?:commits|files))>(.*?)</\1>", re.DOTALL)
 SYNC_MESSAGE_TEMPLATE = "N/A - in sync with {base_branch}"
 
+TAG_META_FIELDS = {
+    TAG_COMMITS: "commits",
+    TAG_FILES: "changed_files",
+}
+
 
 @dataclass
 class TagUpdate:
@@ -21,6 +31,7 @@ class TagUpdate:
     new_content: str
 
 
+@profiled("tags.find_context_files")
 def find_context_files(context_dir: str) -> list[str]:
     if not os.path.isdir(context_dir):
         return []
@@ -33,6 +44,7 @@ def find_context_files(context_dir: str) -> list[str]:
     return files
 
 
+@profiled("tags.find_tags_in_file")
 def find_tags_in_file(filepath: str) -> list[tuple[str, str]]:
     try:
         with open(filepath, "r") as f:
@@ -48,49 +60,203 @@ def update_tag_content(content: str, tag: str, new_value: str) -> str:
     return pattern.sub(rf"<\1>{new_value}</\1>", content)
 
 
+def _file_signature(st: os.stat_result) -> list[int]:
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+@profiled("tags.walk_context_dir")
+def _walk_context_dir(context_dir: str) -> tuple[list[str], dict[str, int]]:
+    files = []
+    dirs = {}
+    stack = [os.curdir]
+    while stack:
+        rel_dir = stack.pop()
+        path = os.path.join(context_dir, rel_dir)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        dirs[rel_dir] = mtime_ns
+        for entry in entries:
+            rel_path = os.path.normpath(os.path.join(rel_dir, entry.name))
+            if entry.is_dir():
+                if not entry.is_symlink():
+                    stack.append(rel_path)
+            elif entry.name.endswith(CONTEXT_FILE_EXTENSIONS):
+                files.append(rel_path)
+    return files, dirs
+
+
+@profiled("tags.dirs_unchanged")
+def _dirs_unchanged(context_dir: str, dirs: dict[str, int]) -> bool:
+    if not dirs:
+        return False
+    for rel_dir, mtime_ns in dirs.items():
+        try:
+            if os.stat(os.path.join(context_dir, rel_dir)).st_mtime_ns != mtime_ns:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+@profiled("tags.scan_file")
+def find_tag_spans_in_file(filepath: str) -> list[list] | None:
+    try:
+        with open(filepath, "rb") as f:
+            content = f.read()
+    except (OSError, IOError):
+        return None
+
+    return [[match.group(1).decode(), match.start(), match.end()] for match in TAG_PATTERN_BYTES.finditer(content)]
+
+
+@profiled("tags.index")
+def index_context_files(context_dir: str, cached: dict | None = None) -> tuple[dict, bool]:
+    cached = cached or {}
+    cached_files: dict = cached.get("files", {})
+
+    if not os.path.isdir(context_dir):
+        index: dict = {"dirs": {}, "files": {}}
+        return index, index != cached
+
+    if _dirs_unchanged(context_dir, cached.get("dirs", {})):
+        rel_files, dirs = list(cached_files), cached["dirs"]
+    else:
+        rel_files, dirs = _walk_context_dir(context_dir)
+
+    files = {}
+    for rel_path in rel_files:
+        filepath = os.path.join(context_dir, rel_path)
+        try:
+            signature = _file_signature(os.stat(filepath))
+        except OSError:
+            continue
+
+        entry = cached_files.get(rel_path)
+        if entry and entry["sig"] == signature:
+            files[rel_path] = entry
+            continue
+
+        spans = find_tag_spans_in_file(filepath)
+        if spans is None:
+            continue
+        files[rel_path] = {"sig": signature, "tags": spans}
+
+    index = {"dirs": dirs, "files": files}
+    return index, index != cached
+
+
+def load_context_index(workspace: str, context_dir: str, branch_key: str) -> tuple[dict, bool]:
+    return index_context_files(context_dir, get_branch_tag_index(workspace, branch_key))
+
+
+@profiled("tags.required_fields")
+def get_required_meta_fields(workspace: str, context_dir: str, branch_key: str) -> set[str]:
+    index, _ = load_context_index(workspace, context_dir, branch_key)
+    return get_index_meta_fields(index)
+
+
+def get_index_meta_fields(index: dict) -> set[str]:
+    return {TAG_META_FIELDS[tag] for entry in index["files"].values() for tag, _, _ in entry["tags"]}
+
+
+@profiled("tags.check_file")
+def _tags_up_to_date(filepath: str, spans: list[list], tag_content_map: dict[str, str]) -> bool:
+    try:
+        with open(filepath, "rb") as f:
+            for tag, start, end in spans:
+                f.seek(start)
+                match = TAG_PATTERN_BYTES.fullmatch(f.read(end - start))
+                if not match or match.group(1).decode() != tag:
+                    return False
+                if match.group(2) != f"\n{tag_content_map[tag]}\n".encode():
+                    return False
+    except (OSError, IOError, KeyError):
+        return False
+    return True
+
+
+def build_tag_content_map(meta: dict | None, base_branch: str) -> dict[str, str]:
+    sync_message = SYNC_MESSAGE_TEMPLATE.format(base_branch=base_branch)
+    meta = meta or {}
+    return {
+        TAG_COMMITS: meta.get("commits") or sync_message,
+        TAG_FILES: meta.get("changed_files") or sync_message,
+    }
+
+
+@profiled("tags.find_outdated")
+def find_outdated_tag_files(context_dir: str, index: dict, tag_content_map: dict[str, str]) -> list[str]:
+    return [
+        rel_path
+        for rel_path, entry in index["files"].items()
+        if entry["tags"] and not _tags_up_to_date(os.path.join(context_dir, rel_path), entry["tags"], tag_content_map)
+    ]
+
+
+@profiled("tags.payload_digest")
+def get_tag_payload_digest(tag_content_map: dict[str, str]) -> str:
+    payload = json.dumps(tag_content_map, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@profiled("tags.update_context_tags")
 def update_context_tags(
     workspace: str,
     context_dir: str,
     branch_key: str,
     base_branch: str,
+    index: dict | None = None,
+    index_changed: bool = False,
 ) -> list[TagUpdate]:
-    updates: list[TagUpdate] = []
-
     meta = get_branch_meta(workspace, branch_key)
-    sync_message = SYNC_MESSAGE_TEMPLATE.format(base_branch=base_branch)
+    tag_content_map = build_tag_content_map(meta, base_branch)
 
-    if meta:
-        commits_content = meta.get("commits") or sync_message
-        files_content = meta.get("changed_files") or sync_message
-    else:
-        commits_content = sync_message
-        files_content = sync_message
+    if index is None:
+        index, index_changed = load_context_index(workspace, context_dir, branch_key)
+
+    digest = get_tag_payload_digest(tag_content_map)
+    if meta and meta.get("tags_digest") == digest and not index_changed:
+        return []
+
+    updates, files_changed = write_context_tags(context_dir, index, tag_content_map)
 
-    context_files = find_context_files(context_dir)
+    if index_changed or files_changed:
+        save_branch_tag_index(workspace, branch_key, index)
+
+    if meta and meta.get("tags_digest") != digest:
+        set_branch_tags_digest(workspace, branch_key, digest)
+
+    return updates
+
+
+@profiled("tags.write_context_tags")
+def write_context_tags(context_dir: str, index: dict, tag_content_map: dict[str, str]) -> tuple[list[TagUpdate], bool]:
+    updates: list[TagUpdate] = []
+    index_changed = False
+
+    for rel_path, entry in index["files"].items():
+        if not entry["tags"]:
+            continue
+
+        filepath = os.path.join(context_dir, rel_path)
+        if _tags_up_to_date(filepath, entry["tags"], tag_content_map):
+            continue
 
-    for filepath in context_files:
         try:
             with open(filepath, "r") as f:
                 original_content = f.read()
         except (OSError, IOError):
             continue
 
-        tags = find_tags_in_file(filepath)
-        if not tags:
-            continue
-
         new_content = original_content
         file_updates = []
 
-        tag_content_map = {
-            TAG_COMMITS: commits_content,
-            TAG_FILES: files_content,
-        }
-
-        for tag, old_value in tags:
-            if tag not in tag_content_map:
-                continue
-
+        for match in TAG_PATTERN.finditer(original_content):
+            tag, old_value = match.group(1), match.group(2)
             content_value = tag_content_map[tag]
             new_value = f"\n{content_value}\n"
             new_content = update_tag_content(new_content, tag, new_value)
@@ -103,9 +269,16 @@ def update_context_tags(
                 )
             )
 
-        if new_content != original_content:
-            with open(filepath, "w") as f:
-                f.write(new_content)
-            updates.extend(file_updates)
+        if new_content == original_content:
+            continue
 
-    return updates
+        with open(filepath, "w") as f:
+            f.write(new_content)
+        updates.extend(file_updates)
+
+        spans = find_tag_spans_in_file(filepath)
+        if spans is not None:
+            index["files"][rel_path] = {"sig": _file_signature(os.stat(filepath)), "tags": spans}
+            index_changed = True
+
+    return updates, index_changed
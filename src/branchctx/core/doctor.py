@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import math
+import os
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+
+from branchctx.constants import CLI_NAME, HEADS_DIR, HOOK_POST_CHECKOUT, LAUNCHER_FILE, META_FILE
+from branchctx.core.context_tags import (
+    build_tag_content_map,
+    find_outdated_tag_files,
+    get_required_meta_fields,
+    index_context_files,
+)
+from branchctx.core.hooks import get_current_branch, get_git_root, read_installed_hook
+from branchctx.core.sync import SHELL_SOUND_PLAYERS, get_branch_dir, get_sound_command, sanitize_branch_name
+from branchctx.data.branch_base import get_base_branch
+from branchctx.data.config import Config, get_branches_dir
+from branchctx.data.meta import compute_branch_meta, load_branch_meta
+from branchctx.data.state import read_head_marker
+from branchctx.data.tag_index import get_branch_tag_index
+from branchctx.utils.git import git_head, git_resolve_ref
+from branchctx.utils.profile import SINK_STDERR, span, start_profile, stop_profile
+
+PATH_CHECKOUT = "on-checkout"
+PATH_COMMIT = "on-commit"
+
+HOOK_IMPORTS = ("branchctx.commands.on_checkout", "branchctx.commands.on_commit", "branchctx.core.refresh")
+
+META_SIZE_WARN_BYTES = 1_000_000
+STARTUP_WARN_MS = 60.0
+PHASE_WARN_MS = 100.0
+HOOK_WARN_MS = 300.0
+TAG_FILES_WARN = 100
+
+
+@dataclass
+class TimingStats:
+    name: str
+    p50_ms: float
+    p95_ms: float
+    git_calls: int = 0
+
+
+@dataclass
+class PerfReport:
+    branch: str
+    runs: int
+    interpreter_ms: float
+    import_ms: float
+    launcher: bool
+    shell_fast_path: bool
+    paths: list[TimingStats]
+    phases: list[TimingStats]
+    meta_bytes: int
+    meta_contexts: int
+    context_files: int
+    tag_files: int
+    recommendations: list[str] = field(default_factory=list)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _stats(name: str, samples: list[float], git_calls: int = 0) -> TimingStats:
+    return TimingStats(
+        name=name,
+        p50_ms=round(statistics.median(samples), 1) if samples else 0.0,
+        p95_ms=round(percentile(samples, 95), 1),
+        git_calls=git_calls,
+    )
+
+
+def _python_cmd(launcher: bool) -> list[str]:
+    return [sys.executable, "-S", "-E"] if launcher else [sys.executable]
+
+
+def measure_interpreter_startup(runs: int, launcher: bool = False) -> float:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([*_python_cmd(launcher), "-c", "pass"], capture_output=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 1)
+
+
+def _parse_import_time_us(stderr: str) -> int:
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        if not name.startswith("   ") and name.strip().startswith("branchctx"):
+            total_us += int(cumulative_us)
+    return total_us
+
+
+def measure_import_time(runs: int) -> float:
+    code = f"import {', '.join(HOOK_IMPORTS)}"
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+        samples.append(_parse_import_time_us(result.stderr) / 1000)
+    return round(statistics.median(samples), 1)
+
+
+def _refresh_pass(workspace: str, branch: str):
+    branch_key = sanitize_branch_name(branch)
+    context_dir = get_branch_dir(workspace, branch)
+    base_branch = get_base_branch(workspace, context_dir)
+
+    fields = get_required_meta_fields(workspace, context_dir, branch_key)
+    entry = compute_branch_meta(workspace, branch_key, base_branch, fields)
+
+    index, _ = index_context_files(context_dir, get_branch_tag_index(workspace, branch_key))
+    find_outdated_tag_files(context_dir, index, build_tag_content_map(entry, base_branch))
+
+
+def _checkout_pass(workspace: str, branch: str):
+    get_git_root(workspace)
+    Config.load(workspace)
+    with span("sync.check_context"):
+        os.path.isdir(get_branch_dir(workspace, branch))
+    with span("fast_path.check_head"):
+        read_head_marker(workspace, sanitize_branch_name(branch)) == git_head(workspace)
+        git_resolve_ref(workspace, get_base_branch(workspace, get_branch_dir(workspace, branch)))
+    _refresh_pass(workspace, branch)
+
+
+def _commit_pass(workspace: str, branch: str):
+    get_git_root(workspace)
+    get_current_branch(workspace)
+    Config.load(workspace)
+    _refresh_pass(workspace, branch)
+
+
+def measure_hook_paths(workspace: str, branch: str, runs: int) -> tuple[list[TimingStats], list[TimingStats]]:
+    passes = {PATH_CHECKOUT: _checkout_pass, PATH_COMMIT: _commit_pass}
+    path_samples: dict[str, list[float]] = {name: [] for name in passes}
+    git_calls: dict[str, int] = {}
+    phase_samples: dict[str, list[float]] = {}
+
+    for name, run_pass in passes.items():
+        for _ in range(runs):
+            start_profile(name, SINK_STDERR)
+            with span(name, kind="command"):
+                run_pass(workspace, branch)
+            records = stop_profile()
+
+            totals: dict[str, float] = {}
+            for record in records:
+                if record["type"] == "command":
+                    path_samples[name].append(record["ms"])
+                elif record["type"] == "phase":
+                    totals[record["name"]] = totals.get(record["name"], 0.0) + record["ms"]
+            git_calls[name] = sum(1 for record in records if record["type"] == "git")
+            for phase, ms in totals.items():
+                phase_samples.setdefault(phase, []).append(ms)
+
+    paths = [_stats(name, samples, git_calls[name]) for name, samples in path_samples.items()]
+    phases = sorted((_stats(name, samples) for name, samples in phase_samples.items()), key=lambda s: -s.p95_ms)
+    return paths, phases
+
+
+def _count_tag_files(workspace: str, branch: str) -> tuple[int, int]:
+    index, _ = index_context_files(
+        get_branch_dir(workspace, branch), get_branch_tag_index(workspace, sanitize_branch_name(branch))
+    )
+    return len(index["files"]), sum(1 for entry in index["files"].values() if entry["tags"])
+
+
+def format_bytes(size: int) -> str:
+    for threshold, suffix in ((1_000_000, "MB"), (1_000, "KB")):
+        if size >= threshold:
+            return f"{size / threshold:.1f} {suffix}"
+    return f"{size} B"
+
+
+def build_recommendations(report: PerfReport, config: Config) -> list[str]:
+    recommendations = []
+    phases = {phase.name: phase for phase in report.phases}
+
+    if report.meta_bytes > META_SIZE_WARN_BYTES:
+        recommendations.append(
+            f"meta.json is {format_bytes(report.meta_bytes)} ({report.meta_contexts} contexts); "
+            f"archive unused contexts with '{CLI_NAME} prune'"
+        )
+
+    if not report.launcher and report.interpreter_ms + report.import_ms > STARTUP_WARN_MS:
+        recommendations.append(
+            f"hook startup costs {report.interpreter_ms + report.import_ms:.0f}ms; "
+            f"run '{CLI_NAME} init --fast-launcher' to skip site and the console-script wrapper"
+        )
+
+    if not report.shell_fast_path:
+        recommendations.append(
+            f"{HOOK_POST_CHECKOUT} hook has no shell fast path; "
+            f"reinstall with '{CLI_NAME} uninstall && {CLI_NAME} init'"
+        )
+    elif config.sound:
+        sound = get_sound_command(config.sound_file)
+        if sound and sound[0] not in SHELL_SOUND_PLAYERS:
+            recommendations.append(
+                f'"sound": true plays through {sound[0]}, which disables the shell fast path; '
+                'set "sound": false to skip Python'
+            )
+
+    changed_files = phases.get("meta.changed_files")
+    if changed_files and changed_files.p95_ms > PHASE_WARN_MS:
+        if config.rename_detection == "similarity":
+            hint = 'set "rename_detection": "exact"'
+        elif not config.files_max_entries:
+            hint = 'set "files_max_entries" to bound the listing'
+        else:
+            hint = 'narrow "scope" to the paths this branch touches'
+        recommendations.append(f"changed files take {changed_files.p95_ms:.0f}ms (p95); {hint}")
+
+    commits = phases.get("meta.commits")
+    if commits and commits.p95_ms > PHASE_WARN_MS:
+        if not config.commits_max_entries:
+            hint = 'set "commits_max_entries" to bound the listing'
+        else:
+            hint = 'narrow "scope" to the paths this branch touches'
+        recommendations.append(f"commit listing takes {commits.p95_ms:.0f}ms (p95); {hint}")
+
+    slowest = max(report.paths, key=lambda p: p.p95_ms, default=None)
+    if slowest and slowest.p95_ms > HOOK_WARN_MS and not config.hook_budget_ms:
+        recommendations.append(
+            f"{slowest.name} takes {slowest.p95_ms:.0f}ms (p95); "
+            f'set "hook_budget_ms" to defer refreshes to the background'
+        )
+
+    if report.tag_files > TAG_FILES_WARN:
+        recommendations.append(
+            f"{report.tag_files} context files carry bctx tags and are checked on every refresh; "
+            "keep tags in a few summary files"
+        )
+
+    return recommendations
+
+
+def run_perf_diagnostics(workspace: str, branch: str, runs: int) -> PerfReport:
+    config = Config.load(workspace)
+    hook = read_installed_hook(workspace, HOOK_POST_CHECKOUT) or ""
+    launcher = LAUNCHER_FILE in hook
+
+    paths, phases = measure_hook_paths(workspace, branch, runs)
+
+    meta_path = os.path.join(get_branches_dir(workspace), META_FILE)
+    context_files, tag_files = _count_tag_files(workspace, branch)
+
+    report = PerfReport(
+        branch=branch,
+        runs=runs,
+        interpreter_ms=measure_interpreter_startup(runs, launcher),
+        import_ms=measure_import_time(runs),
+        launcher=launcher,
+        shell_fast_path=f"{HEADS_DIR}/" in hook and "BCTX_BASE" in hook,
+        paths=paths,
+        phases=phases,
+        meta_bytes=os.path.getsize(meta_path) if os.path.exists(meta_path) else 0,
+        meta_contexts=len(load_branch_meta(workspace)),
+        context_files=context_files,
+        tag_files=tag_files,
+    )
+    report.recommendations = build_recommendations(report, config)
+    return report
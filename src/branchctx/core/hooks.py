@@ -5,14 +5,14 @@ import re
 import shutil
 import stat
 import sys
-from typing import Literal
+from typing import Iterable, Literal
 
-from branchctx.assets import get_post_checkout_hook_template, get_post_commit_hook_template
 from branchctx.constants import CLI_NAME, GIT_DIR, HOOK_MARKER, HOOK_POST_CHECKOUT
 from branchctx.utils.git import git_current_branch, git_hooks_path, git_info_exclude_add, git_root
+from branchctx.utils.profile import profiled
 
 HookType = Literal["post-checkout", "post-commit"]
-HookInstallResult = Literal["installed", "already_installed", "hook_exists", "appended", "skipped"]
+HookInstallResult = Literal["installed", "already_installed", "updated", "hook_exists", "appended", "skipped"]
 HookUninstallResult = Literal["uninstalled", "not_installed", "not_managed"]
 
 _custom_hooks_confirmed: dict[str, bool] = {}
@@ -44,13 +44,25 @@ def get_branchctx_path() -> str:
     return script_name
 
 
-def get_callback(hook_type: HookType) -> str:
-    branchctx_path = get_branchctx_path()
+def get_callback(hook_type: HookType, launcher: str | None = None) -> str:
+    if launcher:
+        from branchctx.core.launcher import get_launcher_command
+
+        command = get_launcher_command(launcher)
+    else:
+        command = f'"{get_branchctx_path()}"'
     if hook_type == HOOK_POST_CHECKOUT:
-        return f'"{branchctx_path}" on-checkout'
-    return f'"{branchctx_path}" on-commit'
+        return f"{command} on-checkout"
+    return f"{command} on-commit"
+
 
+def _replace_callback(content: str, hook_type: HookType, callback: str) -> str:
+    subcommand = "on-checkout" if hook_type == HOOK_POST_CHECKOUT else "on-commit"
+    pattern = rf'"[^"\n]*"(?: -S -E "[^"\n]*")? {subcommand}'
+    return re.sub(pattern, lambda _m: callback, content)
 
+
+@profiled("git_root")
 def get_git_root(path: str | None = None) -> str | None:
     return git_root(path or os.getcwd())
 
@@ -99,9 +111,8 @@ def _prompt_yes_no(question: str) -> bool:
         print("Please answer 'y' or 'n'.")
 
 
-def _get_all_hook_paths(git_root: str, hook_type: HookType) -> list[str]:
+def _get_all_hook_paths(git_root: str, hook_type: HookType, custom_hooks_dir: str | None) -> list[str]:
     paths = [get_hook_path(git_root, hook_type, use_custom=False)]
-    custom_hooks_dir = get_custom_hooks_dir(git_root)
     if custom_hooks_dir:
         paths.append(os.path.join(custom_hooks_dir, hook_type))
         husky_dir = _get_husky_user_hooks_dir(custom_hooks_dir)
@@ -110,16 +121,32 @@ def _get_all_hook_paths(git_root: str, hook_type: HookType) -> list[str]:
     return paths
 
 
-def is_hook_installed(git_root: str, hook_type: HookType = HOOK_POST_CHECKOUT) -> bool:
-    for hook_path in _get_all_hook_paths(git_root, hook_type):
+def _find_installed_hook(git_root: str, hook_type: HookType, custom_hooks_dir: str | None) -> str | None:
+    for hook_path in _get_all_hook_paths(git_root, hook_type, custom_hooks_dir):
         if os.path.exists(hook_path):
             with open(hook_path) as f:
-                if HOOK_MARKER in f.read():
-                    return True
-    return False
+                content = f.read()
+            if HOOK_MARKER in content:
+                return content
+    return None
+
+
+def is_hook_installed(git_root: str, hook_type: HookType = HOOK_POST_CHECKOUT) -> bool:
+    return read_installed_hook(git_root, hook_type) is not None
+
+
+def get_installed_hooks(git_root: str, hook_types: Iterable[HookType]) -> dict[HookType, bool]:
+    custom_hooks_dir = get_custom_hooks_dir(git_root)
+    return {hook: _find_installed_hook(git_root, hook, custom_hooks_dir) is not None for hook in hook_types}
+
+
+def read_installed_hook(git_root: str, hook_type: HookType = HOOK_POST_CHECKOUT) -> str | None:
+    return _find_installed_hook(git_root, hook_type, get_custom_hooks_dir(git_root))
 
 
 def _get_hook_template(hook_type: HookType) -> str:
+    from branchctx.assets import get_post_checkout_hook_template, get_post_commit_hook_template
+
     if hook_type == HOOK_POST_CHECKOUT:
         return get_post_checkout_hook_template()
     return get_post_commit_hook_template()
@@ -128,14 +155,36 @@ def _get_hook_template(hook_type: HookType) -> str:
 SNIPPET_END_MARKER = "# branch-ctx-end"
 
 
-def _get_append_snippet(hook_type: HookType) -> str:
-    callback = get_callback(hook_type)
+def _get_append_snippet(hook_type: HookType, launcher: str | None = None) -> str:
+    callback = get_callback(hook_type, launcher)
     if hook_type == HOOK_POST_CHECKOUT:
         return f"""
 {HOOK_MARKER}
 OLD_BRANCH=$(git rev-parse --abbrev-ref @{{-1}} 2>/dev/null || echo "unknown")
 NEW_BRANCH=$(git rev-parse --abbrev-ref HEAD)
-{callback} "$OLD_BRANCH" "$NEW_BRANCH"
+BCTX_KEY=$(printf '%s' "$NEW_BRANCH" | sed 's/[][/\\\\:*?"<>|~^@[:space:]]/-/g')
+BCTX_DIR=".bctx/branches/$BCTX_KEY"
+BCTX_MARKER=".bctx/branches/.heads/$BCTX_KEY"
+BCTX_SOUND=".bctx/branches/.heads/.sound"
+BCTX_HEAD=""
+BCTX_BASE=""
+BCTX_BASE_HEAD=""
+{{ read -r BCTX_HEAD BCTX_BASE BCTX_BASE_HEAD < "$BCTX_MARKER"; }} 2>/dev/null
+if [ -d "$BCTX_DIR" ] && [ "$BCTX_HEAD" = "$2" ] && [ -n "$BCTX_BASE" ] && [ -f "$BCTX_SOUND" ] \\
+    && [ ! .bctx/config.json -nt "$BCTX_SOUND" ] && [ ! "$BCTX_DIR/base_branch" -nt "$BCTX_MARKER" ] \\
+    && {{ [ -L _branch ] || [ ! -e _branch ]; }} \\
+    && [ "$(git rev-parse -q --verify "$BCTX_BASE^{{commit}}")" = "$BCTX_BASE_HEAD" ]; then
+    ln -s "$BCTX_DIR" "_branch.$$.tmp" && {{ mv -fT "_branch.$$.tmp" _branch 2>/dev/null \\
+        || mv -fh "_branch.$$.tmp" _branch 2>/dev/null || rm -f "_branch.$$.tmp"; }}
+    BCTX_PLAYER=""
+    {{ {{ read -r BCTX_PLAYER; read -r BCTX_SOUND; }} < "$BCTX_SOUND"; }} 2>/dev/null
+    case "$BCTX_PLAYER" in
+        afplay|paplay) "$BCTX_PLAYER" "$BCTX_SOUND" >/dev/null 2>&1 & ;;
+    esac
+    echo "Branch: $OLD_BRANCH -> $NEW_BRANCH (synced)"
+else
+    {callback} "$OLD_BRANCH" "$NEW_BRANCH"
+fi
 {SNIPPET_END_MARKER}
 """
     return f"""
@@ -145,7 +194,9 @@ NEW_BRANCH=$(git rev-parse --abbrev-ref HEAD)
 """
 
 
-def install_hook(git_root: str, hook_type: HookType = HOOK_POST_CHECKOUT) -> HookInstallResult:
+def install_hook(
+    git_root: str, hook_type: HookType = HOOK_POST_CHECKOUT, launcher: str | None = None
+) -> HookInstallResult:
     global _custom_hooks_confirmed, _exclude_confirmed
 
     custom_hooks_dir = get_custom_hooks_dir(git_root)
@@ -176,7 +227,14 @@ def install_hook(git_root: str, hook_type: HookType = HOOK_POST_CHECKOUT) -> Hoo
         with open(hook_path) as f:
             existing = f.read()
         if HOOK_MARKER in existing:
-            return "already_installed"
+            if not launcher:
+                return "already_installed"
+            updated = _replace_callback(existing, hook_type, get_callback(hook_type, launcher))
+            if updated == existing:
+                return "already_installed"
+            with open(hook_path, "w") as f:
+                f.write(updated)
+            return "updated"
 
         append_key = (git_root, hook_type)
         if append_key not in _append_confirmed:
@@ -187,13 +245,13 @@ def install_hook(git_root: str, hook_type: HookType = HOOK_POST_CHECKOUT) -> Hoo
         if not _append_confirmed[append_key]:
             return "hook_exists"
 
-        snippet = _get_append_snippet(hook_type)
+        snippet = _get_append_snippet(hook_type, launcher)
         with open(hook_path, "a") as f:
             f.write(snippet)
         return "appended"
 
     template = _get_hook_template(hook_type)
-    content = template.format(marker=HOOK_MARKER, callback=get_callback(hook_type))
+    content = template.format(marker=HOOK_MARKER, callback=get_callback(hook_type, launcher))
 
     with open(hook_path, "w") as f:
         f.write(content)
@@ -226,7 +284,7 @@ def _is_standalone_bctx_hook(content: str) -> bool:
 
 
 def uninstall_hook(git_root: str, hook_type: HookType = HOOK_POST_CHECKOUT) -> HookUninstallResult:
-    for hook_path in _get_all_hook_paths(git_root, hook_type):
+    for hook_path in _get_all_hook_paths(git_root, hook_type, get_custom_hooks_dir(git_root)):
         if not os.path.exists(hook_path):
             continue
 
@@ -249,7 +307,7 @@ def uninstall_hook(git_root: str, hook_type: HookType = HOOK_POST_CHECKOUT) -> H
 
         return "uninstalled"
 
-    for hook_path in _get_all_hook_paths(git_root, hook_type):
+    for hook_path in _get_all_hook_paths(git_root, hook_type, get_custom_hooks_dir(git_root)):
         if os.path.exists(hook_path):
             return "not_managed"
 
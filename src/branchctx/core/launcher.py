@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import os
+import py_compile
+import sys
+import tempfile
+import zipfile
+
+from branchctx.constants import GIT_DIR, LAUNCHER_ARCHIVE, LAUNCHER_FILE, PACKAGE_NAME
+from branchctx.utils.git import git_path
+
+_SKIPPED_PACKAGES = ("assets",)
+
+_MAIN_TEMPLATE = """import os
+import sys
+
+if [sys.hexversion, os.stat({stamp_file!r}).st_mtime_ns] == {stamp!r}:
+    sys.path[:] = [{archive!r}, *{stdlib_paths!r}]
+
+    import {package}
+
+    {package}.__path__.append({package_dir!r})
+else:
+    sys.path[:] = [{source_root!r}, *{stdlib_paths!r}]
+
+    from {package}.core.launcher import rebuild_launcher
+
+    rebuild_launcher({launcher!r}, {archive!r})
+
+from {package}.cli import main
+
+main()
+"""
+
+
+def _get_hooks_dir(git_root: str) -> str:
+    return git_path(git_root, "hooks") or os.path.join(git_root, GIT_DIR, "hooks")
+
+
+def get_launcher_path(git_root: str) -> str:
+    return os.path.join(_get_hooks_dir(git_root), LAUNCHER_FILE)
+
+
+def get_launcher_archive_path(git_root: str) -> str:
+    return os.path.join(_get_hooks_dir(git_root), LAUNCHER_ARCHIVE)
+
+
+def launcher_exists(git_root: str) -> bool:
+    return os.path.exists(get_launcher_path(git_root)) and os.path.exists(get_launcher_archive_path(git_root))
+
+
+def get_launcher_command(launcher: str) -> str:
+    return f'"{sys.executable}" -S -E "{launcher}"'
+
+
+def _get_package_dir() -> str:
+    import branchctx
+
+    return os.path.dirname(os.path.abspath(branchctx.__file__))
+
+
+def _get_stdlib_paths() -> list[str]:
+    prefixes = tuple({os.path.abspath(sys.base_prefix), os.path.abspath(sys.base_exec_prefix)})
+    return [
+        p
+        for p in sys.path
+        if p and os.path.abspath(p).startswith(prefixes) and "site-packages" not in p and "dist-packages" not in p
+    ]
+
+
+def _iter_package_sources(package_dir: str):
+    for root, dirs, files in os.walk(package_dir):
+        rel_root = os.path.relpath(root, package_dir)
+        if rel_root.split(os.sep)[0] in _SKIPPED_PACKAGES:
+            dirs[:] = []
+            continue
+        dirs[:] = [d for d in sorted(dirs) if d != "__pycache__"]
+        for name in sorted(files):
+            if name.endswith(".py"):
+                arcname = os.path.normpath(os.path.join(PACKAGE_NAME, rel_root, name)).replace(os.sep, "/")
+                yield os.path.join(root, name), arcname
+
+
+def _get_stamp_file(package_dir: str) -> str:
+    return os.path.join(package_dir, "__init__.py")
+
+
+def get_source_stamp(package_dir: str) -> list[int]:
+    return [sys.hexversion, os.stat(_get_stamp_file(package_dir)).st_mtime_ns]
+
+
+def _write_atomic(path: str, write):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _write_archive(path: str, package_dir: str, main_source: str):
+    with tempfile.TemporaryDirectory() as build_dir, zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("__main__.py", main_source)
+        for index, (source, arcname) in enumerate(_iter_package_sources(package_dir)):
+            cfile = os.path.join(build_dir, f"{index}.pyc")
+            py_compile.compile(
+                source,
+                cfile=cfile,
+                dfile=arcname,
+                doraise=True,
+                invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+            )
+            zf.write(cfile, arcname + "c")
+
+
+def _write_text(path: str, content: str):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def _build(launcher: str, archive: str):
+    package_dir = _get_package_dir()
+    os.makedirs(os.path.dirname(launcher), exist_ok=True)
+
+    main_source = _MAIN_TEMPLATE.format(
+        archive=archive,
+        launcher=launcher,
+        stdlib_paths=_get_stdlib_paths(),
+        package=PACKAGE_NAME,
+        package_dir=package_dir,
+        source_root=os.path.dirname(package_dir),
+        stamp_file=_get_stamp_file(package_dir),
+        stamp=get_source_stamp(package_dir),
+    )
+
+    _write_atomic(archive, lambda path: _write_archive(path, package_dir, main_source))
+    _write_atomic(launcher, lambda path: _write_text(path, main_source))
+
+
+def build_launcher(git_root: str) -> str:
+    hooks_dir = _get_hooks_dir(git_root)
+    launcher = os.path.join(hooks_dir, LAUNCHER_FILE)
+    _build(launcher, os.path.join(hooks_dir, LAUNCHER_ARCHIVE))
+    return launcher
+
+
+def rebuild_launcher(launcher: str, archive: str):
+    try:
+        _build(launcher, archive)
+    except (OSError, py_compile.PyCompileError):
+        pass
+
+
+def remove_launcher(git_root: str) -> bool:
+    removed = False
+    hooks_dir = _get_hooks_dir(git_root)
+    for path in (os.path.join(hooks_dir, LAUNCHER_FILE), os.path.join(hooks_dir, LAUNCHER_ARCHIVE)):
+        if os.path.exists(path):
+            os.remove(path)
+            removed = True
+    return removed
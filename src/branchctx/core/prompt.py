@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+
+from branchctx.constants import (
+    BASE_BRANCH_FILE,
+    CONFIG_DIR,
+    CONFIG_FILE,
+    DEFAULT_SYMLINK,
+    GIT_DIR,
+    HOOK_POST_CHECKOUT,
+    HOOK_POST_COMMIT,
+    META_FILE,
+    PROMPT_CACHE_FILE,
+)
+from branchctx.data.branch_base import get_base_branch
+from branchctx.data.paths import get_branches_dir, sanitize_branch_name
+
+DETACHED_HEAD = "HEAD"
+PENDING_TTL_SECONDS = 10
+
+
+def find_repo(start: str) -> tuple[str, str] | None:
+    current = os.path.abspath(start)
+    while True:
+        dot_git = os.path.join(current, GIT_DIR)
+        if os.path.isdir(dot_git):
+            return current, dot_git
+        if os.path.isfile(dot_git):
+            try:
+                with open(dot_git) as f:
+                    content = f.read().strip()
+            except OSError:
+                return None
+            if content.startswith("gitdir:"):
+                return current, os.path.normpath(os.path.join(current, content[len("gitdir:") :].strip()))
+            return None
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def read_head(git_dir: str) -> str | None:
+    try:
+        with open(os.path.join(git_dir, "HEAD")) as f:
+            content = f.read().strip()
+    except OSError:
+        return None
+    if content.startswith("ref: refs/heads/"):
+        return content[len("ref: refs/heads/") :]
+    return DETACHED_HEAD if content else None
+
+
+def _mtime_ns(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _readlink(path: str) -> str | None:
+    try:
+        return os.readlink(path)
+    except OSError:
+        return None
+
+
+def get_common_dir(git_dir: str) -> str:
+    try:
+        with open(os.path.join(git_dir, "commondir")) as f:
+            return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
+        return git_dir
+
+
+def get_cache_key(workspace: str, git_dir: str, branch: str | None) -> list:
+    common_dir = get_common_dir(git_dir)
+    context_dir = os.path.join(get_branches_dir(workspace), sanitize_branch_name(branch)) if branch else None
+    base = get_base_branch(workspace, context_dir) if context_dir else None
+    return [
+        branch,
+        _mtime_ns(os.path.join(git_dir, "HEAD")),
+        _mtime_ns(os.path.join(common_dir, "refs", "heads", branch or "")),
+        _mtime_ns(os.path.join(common_dir, "packed-refs")),
+        base,
+        _mtime_ns(os.path.join(common_dir, "refs", "heads", base or "")),
+        _mtime_ns(os.path.join(common_dir, "refs", "remotes", base or "")),
+        _mtime_ns(os.path.join(context_dir, BASE_BRANCH_FILE)) if context_dir else None,
+        _readlink(os.path.join(workspace, DEFAULT_SYMLINK)),
+        _mtime_ns(os.path.join(get_branches_dir(workspace), META_FILE)),
+        _mtime_ns(os.path.join(workspace, CONFIG_DIR, CONFIG_FILE)),
+    ]
+
+
+def get_prompt_cache_path(workspace: str) -> str:
+    return os.path.join(get_branches_dir(workspace), PROMPT_CACHE_FILE)
+
+
+def read_prompt_cache(workspace: str) -> dict | None:
+    try:
+        with open(get_prompt_cache_path(workspace)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_prompt_cache(workspace: str, key: list, status: dict, pending_at: float | None = None):
+    path = get_prompt_cache_path(workspace)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    entry = {"key": key, "status": status}
+    if pending_at is not None:
+        entry["pending_at"] = pending_at
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def get_fast_status(workspace: str, branch: str | None) -> dict:
+    context = sanitize_branch_name(branch) if branch else None
+    context_dir = os.path.join(get_branches_dir(workspace), context) if context else None
+    symlink_path = os.path.join(workspace, DEFAULT_SYMLINK)
+    symlink_ok = bool(context_dir and os.path.islink(symlink_path))
+    return {
+        "branch": branch,
+        "context": context,
+        "context_exists": bool(context_dir and os.path.isdir(context_dir)),
+        "symlink_ok": symlink_ok and os.path.realpath(symlink_path) == os.path.realpath(context_dir),
+    }
+
+
+def compute_prompt_status(workspace: str, branch: str | None) -> dict:
+    from datetime import datetime
+
+    from branchctx.core.hooks import get_installed_hooks
+    from branchctx.data.branch_base import get_base_branch
+    from branchctx.data.meta import get_branch_meta
+    from branchctx.utils.git import run_git
+
+    status = get_fast_status(workspace, branch)
+    context_dir = os.path.join(get_branches_dir(workspace), status["context"] or "")
+    base = get_base_branch(workspace, context_dir)
+    hooks = get_installed_hooks(workspace, (HOOK_POST_CHECKOUT, HOOK_POST_COMMIT))
+    meta = get_branch_meta(workspace, status["context"]) if status["context"] else None
+
+    ahead = None
+    if branch and branch != DETACHED_HEAD:
+        result = run_git(["rev-list", "--count", f"{base}..HEAD"], cwd=workspace)
+        if result.returncode == 0 and result.stdout.strip().isdigit():
+            ahead = int(result.stdout.strip())
+
+    issues = [f"{hook} hook not installed" for hook, installed in hooks.items() if not installed]
+    if not status["context_exists"]:
+        issues.append("no context for current branch")
+    elif not status["symlink_ok"]:
+        issues.append(f"{DEFAULT_SYMLINK} does not point to the current context")
+
+    return {
+        **status,
+        "base": base,
+        "ahead": ahead,
+        "stale": bool(meta and meta.get("stale")),
+        "hooks": hooks,
+        "issues": issues,
+        "pending": False,
+        "checked_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def refresh_prompt_cache(workspace: str, git_dir: str) -> dict:
+    branch = read_head(git_dir)
+    key = get_cache_key(workspace, git_dir, branch)
+    status = compute_prompt_status(workspace, branch)
+    write_prompt_cache(workspace, key, status)
+    return status
+
+
+def spawn_prompt_refresh(workspace: str):
+    import subprocess
+
+    from branchctx.core.hooks import get_branchctx_path
+
+    try:
+        subprocess.Popen(
+            [get_branchctx_path(), "prompt", "--refresh"],
+            cwd=workspace,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        pass
+
+
+def get_prompt_status(workspace: str, git_dir: str, background: bool = True) -> dict:
+    branch = read_head(git_dir)
+    key = get_cache_key(workspace, git_dir, branch)
+
+    cache = read_prompt_cache(workspace)
+    if cache and cache.get("key") == key:
+        if "pending_at" not in cache:
+            return cache["status"]
+        if background and 0 <= time.time() - cache["pending_at"] < PENDING_TTL_SECONDS:
+            return cache["status"]
+
+    if not background:
+        status = compute_prompt_status(workspace, branch)
+        write_prompt_cache(workspace, key, status)
+        return status
+
+    status = {**get_fast_status(workspace, branch), "pending": True}
+    write_prompt_cache(workspace, key, status, pending_at=time.time())
+    spawn_prompt_refresh(workspace)
+    return status
+
+
+def format_prompt(status: dict) -> str:
+    parts = [status.get("branch") or "?"]
+    if not status.get("context_exists"):
+        parts.append("(no context)")
+    if status.get("ahead"):
+        parts.append(f"+{status['ahead']}")
+    if status.get("stale"):
+        parts.append("~")
+    if status.get("issues"):
+        parts.append("!")
+    return " ".join(parts)
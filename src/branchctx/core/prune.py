@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+
+from branchctx.core.sync import archive_branches, get_branch_dir, list_branches, sanitize_branch_name
+from branchctx.data.branch_base import get_base_branch
+from branchctx.data.config import PrunePolicy
+from branchctx.data.meta import load_branch_meta
+from branchctx.utils.git import (
+    git_current_branch,
+    git_delete_branches,
+    git_list_branch_heads,
+    git_merged_branches,
+    git_resolve_ref,
+)
+from branchctx.utils.profile import profiled
+
+PROTECTED_BRANCHES = ("main", "master")
+
+REASON_MERGED = "merged"
+REASON_ORPHAN = "orphan"
+REASON_INACTIVE = "inactive"
+
+
+@dataclass
+class PruneAction:
+    branch: str
+    context: str
+    reason: str
+
+
+@dataclass
+class PrunePlan:
+    policy: PrunePolicy
+    delete_branches: list[PruneAction] = field(default_factory=list)
+    archive_contexts: list[PruneAction] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        return not self.delete_branches and not self.archive_contexts
+
+    def to_dict(self) -> dict:
+        return {
+            "policy": self.policy.to_dict(),
+            "delete_branches": [asdict(action) for action in self.delete_branches],
+            "archive_contexts": [asdict(action) for action in self.archive_contexts],
+        }
+
+
+@dataclass
+class PruneResult:
+    deleted: list[str] = field(default_factory=list)
+    archived: list[str] = field(default_factory=list)
+
+
+def _is_inactive(entry: dict | None, cutoff: datetime) -> bool:
+    try:
+        updated_at = datetime.fromisoformat((entry or {})["updated_at"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return updated_at.replace(tzinfo=None) < cutoff
+
+
+def _find_merged(workspace: str, heads: dict[str, str], bases: dict[str, str], protected: set[str]) -> list[str]:
+    by_base: dict[str, list[str]] = {}
+    for branch, base in bases.items():
+        if branch not in protected:
+            by_base.setdefault(base, []).append(branch)
+
+    merged = []
+    for base, branches in by_base.items():
+        base_tip = git_resolve_ref(workspace, base)
+        if base_tip is None:
+            continue
+        merged_into_base = set(git_merged_branches(workspace, base))
+        merged.extend(b for b in branches if b in merged_into_base and heads[b] != base_tip)
+    return sorted(merged)
+
+
+@profiled("prune.build_plan")
+def build_prune_plan(workspace: str, policy: PrunePolicy, now: datetime | None = None) -> PrunePlan:
+    plan = PrunePlan(policy=policy)
+    heads = git_list_branch_heads(workspace)
+    current = git_current_branch(workspace)
+    meta = load_branch_meta(workspace)
+    contexts = sorted(list_branches(workspace))
+
+    local_keys = {sanitize_branch_name(branch): branch for branch in heads}
+    current_key = sanitize_branch_name(current) if current else None
+
+    def branch_name(key: str) -> str:
+        return local_keys.get(key) or (meta.get(key) or {}).get("branch") or key
+
+    bases = {branch: get_base_branch(workspace, get_branch_dir(workspace, branch)) for branch in heads}
+    protected = {*PROTECTED_BRANCHES, *(b.split("/", 1)[-1] for b in bases.values()), *bases.values()}
+    if current:
+        protected.add(current)
+
+    merged_keys = set()
+    if policy.delete_merged:
+        for branch in _find_merged(workspace, heads, bases, protected):
+            key = sanitize_branch_name(branch)
+            merged_keys.add(key)
+            plan.delete_branches.append(PruneAction(branch=branch, context=key, reason=REASON_MERGED))
+
+    cutoff = (now or datetime.now()) - timedelta(days=policy.archive_after_days)
+    for key in contexts:
+        if key == current_key:
+            continue
+        if key in merged_keys:
+            reason = REASON_MERGED
+        elif policy.archive_orphans and key not in local_keys:
+            reason = REASON_ORPHAN
+        elif policy.archive_after_days and _is_inactive(meta.get(key), cutoff):
+            reason = REASON_INACTIVE
+        else:
+            continue
+        plan.archive_contexts.append(PruneAction(branch=branch_name(key), context=key, reason=reason))
+
+    return plan
+
+
+@profiled("prune.apply_plan")
+def apply_prune_plan(workspace: str, plan: PrunePlan) -> PruneResult:
+    result = PruneResult()
+    if plan.delete_branches:
+        result.deleted = git_delete_branches(workspace, [a.branch for a in plan.delete_branches], force=True)
+
+    deleted = set(result.deleted)
+    contexts = [
+        action.context for action in plan.archive_contexts if action.reason != REASON_MERGED or action.branch in deleted
+    ]
+    result.archived = archive_branches(workspace, contexts)
+    return result
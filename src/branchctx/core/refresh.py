@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import subprocess
+import time
+from dataclasses import dataclass, field
+
+from branchctx.core.context_tags import TagUpdate, get_index_meta_fields, load_context_index, update_context_tags
+from branchctx.core.hooks import get_branchctx_path
+from branchctx.core.sync import SHELL_SOUND_PLAYERS, get_sound_command
+from branchctx.data.config import Config
+from branchctx.data.meta import set_branch_stale, update_branch_meta
+from branchctx.data.state import (
+    clear_head_marker,
+    get_branch_state,
+    update_branch_state,
+    write_head_marker,
+    write_sound_marker,
+)
+from branchctx.utils.git import git_resolve_refs
+from branchctx.utils.profile import profiled
+
+PHASE_META = "meta"
+PHASE_TAGS = "tags"
+
+
+@dataclass
+class HookBudget:
+    budget_ms: int
+    background_refresh: bool = True
+    enforce: bool = True
+    started_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def from_config(cls, config: Config, enforce: bool = True, started_at: float | None = None) -> "HookBudget":
+        return cls(
+            budget_ms=config.hook_budget_ms,
+            background_refresh=config.hook_background_refresh,
+            enforce=enforce,
+            started_at=started_at if started_at is not None else time.monotonic(),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget_ms > 0
+
+    def remaining_ms(self) -> float:
+        return self.budget_ms - (time.monotonic() - self.started_at) * 1000
+
+    def allows(self, estimate_ms: float) -> bool:
+        return not (self.enabled and self.enforce) or self.remaining_ms() > estimate_ms
+
+
+@dataclass
+class RefreshResult:
+    updates: list[TagUpdate] = field(default_factory=list)
+    stale: bool = False
+
+
+def _elapsed_ms(started_at: float) -> int:
+    return round((time.monotonic() - started_at) * 1000)
+
+
+def spawn_background_refresh(workspace: str):
+    try:
+        subprocess.Popen(
+            [get_branchctx_path(), "refresh"],
+            cwd=workspace,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        pass
+
+
+def _defer(workspace: str, branch_key: str, budget: HookBudget, timings: dict[str, int]) -> RefreshResult:
+    set_branch_stale(workspace, branch_key, True)
+    if timings:
+        update_branch_state(workspace, branch_key, timings=timings)
+    if budget.background_refresh:
+        spawn_background_refresh(workspace)
+    return RefreshResult(stale=True)
+
+
+@profiled("refresh.refresh_branch_context")
+def refresh_branch_context(
+    workspace: str,
+    context_dir: str,
+    branch_key: str,
+    base_branch: str,
+    budget: HookBudget | None = None,
+) -> RefreshResult:
+    budget = budget or HookBudget(budget_ms=0)
+    timings: dict[str, int] = get_branch_state(workspace, branch_key).get("timings", {}) if budget.enabled else {}
+
+    if not budget.allows(timings.get(PHASE_META, 0)):
+        return _defer(workspace, branch_key, budget, {})
+
+    started_at = time.monotonic()
+    index, index_changed = load_context_index(workspace, context_dir, branch_key)
+    update_branch_meta(workspace, branch_key, base_branch, get_index_meta_fields(index))
+    timings = {**timings, PHASE_META: _elapsed_ms(started_at)}
+
+    if not budget.allows(timings.get(PHASE_TAGS, 0)):
+        return _defer(workspace, branch_key, budget, timings)
+
+    started_at = time.monotonic()
+    updates = update_context_tags(workspace, context_dir, branch_key, base_branch, index, index_changed)
+    timings[PHASE_TAGS] = _elapsed_ms(started_at)
+
+    if budget.enabled:
+        update_branch_state(workspace, branch_key, timings=timings)
+
+    return RefreshResult(updates=updates)
+
+
+@profiled("refresh.record_head")
+def record_branch_head(
+    workspace: str,
+    branch_key: str,
+    config: Config,
+    result: RefreshResult,
+    base_branch: str,
+    head: str | None = None,
+    base_head: str | None = None,
+):
+    sound = get_sound_command(config.sound_file) if config.sound else None
+    if not result.stale and (sound is None or sound[0] in SHELL_SOUND_PLAYERS):
+        if head is None:
+            head, base_head = git_resolve_refs(workspace, ["HEAD", base_branch])
+        if head:
+            write_sound_marker(workspace, sound)
+            write_head_marker(workspace, branch_key, head, base_branch, base_head)
+            return
+    clear_head_marker(workspace, branch_key)
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import os
 import platform
-import re
 import shutil
 import subprocess
 from importlib import resources
@@ -18,7 +17,9 @@ from branchctx.constants import (
     TEMPLATE_FILE_EXTENSIONS,
 )
 from branchctx.data.config import Config, get_branches_dir, get_default_template, get_template_dir
-from branchctx.data.meta import archive_branch_meta, create_branch_meta, unarchive_branch_meta
+from branchctx.data.meta import archive_branch_meta_entries, create_branch_meta, unarchive_branch_meta
+from branchctx.data.paths import sanitize_branch_name as sanitize_branch_name
+from branchctx.utils.profile import profiled
 from branchctx.utils.template import get_template_variables, render_template_content
 
 
@@ -29,30 +30,38 @@ def get_default_sound_file() -> str | None:
         return None
 
 
-def play_sound(sound_file: str | None):
+SHELL_SOUND_PLAYERS = ("afplay", "paplay")
+
+
+def get_sound_command(sound_file: str | None) -> list[str] | None:
     if sound_file is None:
         sound_file = get_default_sound_file()
 
     if sound_file is None or not os.path.exists(sound_file):
+        return None
+
+    system = platform.system()
+    if system == "Darwin":
+        return ["afplay", sound_file]
+    if system == "Linux":
+        return ["paplay", sound_file]
+    if system == "Windows":
+        return ["powershell", "-c", f"(New-Object Media.SoundPlayer '{sound_file}').Play()"]
+    return None
+
+
+@profiled("sync.play_sound")
+def play_sound(sound_file: str | None):
+    command = get_sound_command(sound_file)
+    if command is None:
         return
 
     try:
-        system = platform.system()
-        if system == "Darwin":
-            subprocess.Popen(["afplay", sound_file], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        elif system == "Linux":
-            subprocess.Popen(["paplay", sound_file], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        elif system == "Windows":
-            cmd = f"(New-Object Media.SoundPlayer '{sound_file}').Play()"
-            subprocess.Popen(["powershell", "-c", cmd], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     except FileNotFoundError:
         pass
 
 
-def sanitize_branch_name(branch: str) -> str:
-    return re.sub(r'[/\\:*?"<>|~^@\[\]\s]', "-", branch)
-
-
 def get_branch_dir(workspace: str, branch: str) -> str:
     safe_name = sanitize_branch_name(branch)
     return os.path.join(get_branches_dir(workspace), safe_name)
@@ -66,6 +75,7 @@ def branch_context_exists(workspace: str, branch: str) -> bool:
     return os.path.exists(get_branch_dir(workspace, branch))
 
 
+@profiled("sync.resolve_template_dir")
 def _resolve_template_dir(workspace: str, branch: str, template: str | None) -> str | None:
     explicit = template is not None
 
@@ -86,6 +96,7 @@ def _resolve_template_dir(workspace: str, branch: str, template: str | None) ->
     return template_dir
 
 
+@profiled("sync.copy_template")
 def _copy_template_to_branch(template_dir: str, branch_dir: str, branch: str):
     variables = get_template_variables(branch)
 
@@ -108,8 +119,9 @@ def _copy_template_to_branch(template_dir: str, branch_dir: str, branch: str):
     copy_with_render(template_dir, branch_dir)
 
 
+@profiled("sync.create_branch_context")
 def create_branch_context(
-    workspace: str, branch: str, template: str | None = None
+    workspace: str, branch: str, template: str | None = None, record_meta: bool = True
 ) -> Literal["exists", "restored_from_archive", "created_from_template", "created_empty"]:
     branch_dir = get_branch_dir(workspace, branch)
     branch_key = sanitize_branch_name(branch)
@@ -121,7 +133,8 @@ def create_branch_context(
         return "restored_from_archive"
 
     os.makedirs(branch_dir, exist_ok=True)
-    create_branch_meta(workspace, branch_key, branch)
+    if record_meta:
+        create_branch_meta(workspace, branch_key, branch)
 
     template_dir = _resolve_template_dir(workspace, branch, template)
 
@@ -132,6 +145,7 @@ def create_branch_context(
     return "created_empty"
 
 
+@profiled("sync.reset_branch_context")
 def reset_branch_context(
     workspace: str, branch: str, template: str | None = None
 ) -> Literal["reset", "template_not_found"]:
@@ -147,6 +161,7 @@ def reset_branch_context(
     return "reset"
 
 
+@profiled("sync.update_symlink")
 def update_symlink(workspace: str, branch: str) -> Literal["unchanged", "error_not_symlink", "updated"]:
     branch_dir = get_branch_dir(workspace, branch)
     symlink_path = os.path.join(workspace, DEFAULT_SYMLINK)
@@ -157,24 +172,36 @@ def update_symlink(workspace: str, branch: str) -> Literal["unchanged", "error_n
     rel_path = os.path.relpath(branch_dir, workspace)
 
     if os.path.islink(symlink_path):
-        current_target = os.readlink(symlink_path)
-        if current_target == rel_path:
+        if os.path.realpath(symlink_path) == os.path.realpath(branch_dir):
             return "unchanged"
-        os.remove(symlink_path)
     elif os.path.exists(symlink_path):
         return "error_not_symlink"
 
-    os.symlink(rel_path, symlink_path)
+    _replace_symlink(rel_path, symlink_path)
     return "updated"
 
 
-def sync_branch(workspace: str, branch: str) -> dict:
+@profiled("sync.replace_symlink")
+def _replace_symlink(target: str, symlink_path: str):
+    tmp_path = f"{symlink_path}.{os.getpid()}.tmp"
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    os.symlink(target, tmp_path)
+    try:
+        os.replace(tmp_path, symlink_path)
+    except OSError:
+        os.remove(tmp_path)
+        raise
+
+
+@profiled("sync.sync_branch")
+def sync_branch(workspace: str, branch: str, notify: bool = True) -> dict:
     config = Config.load(workspace)
 
     create_result = create_branch_context(workspace, branch)
     symlink_result = update_symlink(workspace, branch)
 
-    if config.sound:
+    if notify and config.sound:
         play_sound(config.sound_file)
 
     return {
@@ -186,6 +213,7 @@ def sync_branch(workspace: str, branch: str) -> dict:
     }
 
 
+@profiled("sync.list_branches")
 def list_branches(workspace: str) -> list[str]:
     branches_dir = get_branches_dir(workspace)
     if not os.path.exists(branches_dir):
@@ -202,6 +230,7 @@ def get_archived_dir(workspace: str) -> str:
     return os.path.join(get_branches_dir(workspace), ARCHIVED_DIR)
 
 
+@profiled("sync.list_archived_branches")
 def list_archived_branches(workspace: str) -> list[str]:
     archived_dir = get_archived_dir(workspace)
     if not os.path.exists(archived_dir):
@@ -210,21 +239,31 @@ def list_archived_branches(workspace: str) -> list[str]:
     return [d for d in os.listdir(archived_dir) if os.path.isdir(os.path.join(archived_dir, d))]
 
 
+@profiled("sync.archive_branch")
 def archive_branch(workspace: str, branch_name: str) -> bool:
+    return archive_branches(workspace, [branch_name]) == [branch_name]
+
+
+@profiled("sync.archive_branches")
+def archive_branches(workspace: str, branch_names: list[str]) -> list[str]:
     branches_dir = get_branches_dir(workspace)
     archived_dir = get_archived_dir(workspace)
-    src = os.path.join(branches_dir, branch_name)
-    dst = os.path.join(archived_dir, branch_name)
 
-    if not os.path.exists(src):
-        return False
+    archived = []
+    for branch_name in branch_names:
+        src = os.path.join(branches_dir, branch_name)
+        if not os.path.exists(src):
+            continue
+        if not archived:
+            os.makedirs(archived_dir, exist_ok=True)
+        shutil.move(src, os.path.join(archived_dir, branch_name))
+        archived.append(branch_name)
 
-    os.makedirs(archived_dir, exist_ok=True)
-    shutil.move(src, dst)
-    archive_branch_meta(workspace, branch_name)
-    return True
+    archive_branch_meta_entries(workspace, archived)
+    return archived
 
 
+@profiled("sync.unarchive_branch")
 def unarchive_branch(workspace: str, branch_name: str) -> bool:
     branches_dir = get_branches_dir(workspace)
     archived_dir = get_archived_dir(workspace)
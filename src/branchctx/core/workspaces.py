@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable
+
+from branchctx.constants import CONFIG_DIR, CONFIG_FILE, GIT_DIR
+from branchctx.utils.profile import profiled
+
+DISCOVERY_MAX_DEPTH = 5
+DISCOVERY_SKIP_DIRS = ("node_modules", "__pycache__", "venv")
+
+
+@profiled("workspaces.find_repos")
+def find_initialized_repos(root: str, max_depth: int = DISCOVERY_MAX_DEPTH) -> list[str]:
+    found = []
+    stack = [(os.path.abspath(root), 0)]
+    while stack:
+        path, depth = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        if any(entry.name == GIT_DIR for entry in entries):
+            if os.path.isfile(os.path.join(path, CONFIG_DIR, CONFIG_FILE)):
+                found.append(path)
+            continue
+
+        if depth >= max_depth:
+            continue
+        for entry in entries:
+            if entry.name.startswith(".") or entry.name in DISCOVERY_SKIP_DIRS:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                stack.append((entry.path, depth + 1))
+    return sorted(found)
+
+
+def _run_in_repo(fn: Callable[[str], dict], repo: str) -> dict:
+    try:
+        return fn(repo)
+    except Exception as e:
+        return {"error": str(e) or type(e).__name__}
+
+
+@profiled("workspaces.map_repos")
+def map_repos(fn: Callable[[str], dict], repos: list[str], max_workers: int | None = None) -> list[dict]:
+    task = partial(_run_in_repo, fn)
+    workers = min(max_workers or os.cpu_count() or 1, len(repos))
+    if workers <= 1:
+        results = list(map(task, repos))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(task, repos))
+    return [{"repo": repo, **result} for repo, result in zip(repos, results)]
@@ -3,15 +3,17 @@ from __future__ import annotations
 import json
 import os
 from dataclasses import dataclass, field
+from typing import Literal
 
-from branchctx.assets import get_default_config
-from branchctx.constants import (
-    BRANCHES_DIR,
-    CONFIG_DIR,
-    CONFIG_FILE,
-    DEFAULT_TEMPLATE,
-    TEMPLATES_DIR,
-)
+from branchctx.constants import CONFIG_DIR, CONFIG_FILE, DEFAULT_TEMPLATE, TEMPLATES_DIR
+from branchctx.data.paths import config_exists as config_exists
+from branchctx.data.paths import get_branches_dir as get_branches_dir
+from branchctx.data.paths import get_config_dir as get_config_dir
+from branchctx.data.paths import get_templates_dir
+from branchctx.utils.profile import profiled
+
+CommitGroupBy = Literal["author", "day"]
+RenameDetection = Literal["off", "exact", "similarity"]
 
 _DEFAULTS: dict | None = None
 
@@ -19,18 +21,66 @@ _DEFAULTS: dict | None = None
 def _get_defaults() -> dict:
     global _DEFAULTS
     if _DEFAULTS is None:
+        from branchctx.assets import get_default_config
+
         _DEFAULTS = get_default_config()
     return _DEFAULTS
 
 
+@dataclass
+class Scope:
+    include: list[str] = field(default_factory=list)
+    exclude: list[str] = field(default_factory=list)
+
+    def to_pathspecs(self) -> list[str]:
+        return [f":(glob){p}" for p in self.include] + [f":(glob,exclude){p}" for p in self.exclude]
+
+    def to_dict(self) -> dict:
+        return {"include": self.include, "exclude": self.exclude}
+
+
+def _parse_scope(data: dict | None) -> Scope | None:
+    if not data:
+        return None
+    return Scope(include=list(data.get("include", [])), exclude=list(data.get("exclude", [])))
+
+
+@dataclass
+class PrunePolicy:
+    archive_orphans: bool = True
+    archive_after_days: int = 0
+    delete_merged: bool = False
+
+    def to_dict(self) -> dict:
+        return {
+            "archive_orphans": self.archive_orphans,
+            "archive_after_days": self.archive_after_days,
+            "delete_merged": self.delete_merged,
+        }
+
+
+def _parse_prune_policy(data: dict | None) -> PrunePolicy:
+    data = {**_get_defaults()["prune_policy"], **(data or {})}
+    return PrunePolicy(
+        archive_orphans=data["archive_orphans"],
+        archive_after_days=data["archive_after_days"],
+        delete_merged=data["delete_merged"],
+    )
+
+
 @dataclass
 class TemplateRule:
     prefix: str
     template: str
+    scope: Scope | None = None
+
+
+def _parse_template_rule(data: dict) -> TemplateRule:
+    return TemplateRule(prefix=data["prefix"], template=data["template"], scope=_parse_scope(data.get("scope")))
 
 
 def _get_default_template_rules() -> list[TemplateRule]:
-    return [TemplateRule(prefix=r["prefix"], template=r["template"]) for r in _get_defaults().get("template_rules", [])]
+    return [_parse_template_rule(r) for r in _get_defaults().get("template_rules", [])]
 
 
 def get_default_template() -> str:
@@ -42,8 +92,20 @@ class Config:
     sound: bool = field(default_factory=lambda: _get_defaults()["sound"])
     sound_file: str | None = None
     template_rules: list[TemplateRule] = field(default_factory=_get_default_template_rules)
+    files_max_entries: int = field(default_factory=lambda: _get_defaults()["files_max_entries"])
+    files_max_bytes: int = field(default_factory=lambda: _get_defaults()["files_max_bytes"])
+    commits_max_entries: int = field(default_factory=lambda: _get_defaults()["commits_max_entries"])
+    commits_group_by: CommitGroupBy | None = field(default_factory=lambda: _get_defaults()["commits_group_by"])
+    rename_detection: RenameDetection = field(default_factory=lambda: _get_defaults()["rename_detection"])
+    rename_limit: int = field(default_factory=lambda: _get_defaults()["rename_limit"])
+    rename_max_files: int = field(default_factory=lambda: _get_defaults()["rename_max_files"])
+    hook_budget_ms: int = field(default_factory=lambda: _get_defaults()["hook_budget_ms"])
+    hook_background_refresh: bool = field(default_factory=lambda: _get_defaults()["hook_background_refresh"])
+    scope: Scope | None = None
+    prune_policy: PrunePolicy = field(default_factory=lambda: _parse_prune_policy(None))
 
     @classmethod
+    @profiled("config.load")
     def load(cls, workspace: str) -> "Config":
         config_path = os.path.join(workspace, CONFIG_DIR, CONFIG_FILE)
 
@@ -58,14 +120,23 @@ class Config:
 
         defaults = _get_defaults()
 
-        template_rules = [
-            TemplateRule(prefix=r["prefix"], template=r["template"]) for r in data.get("template_rules", [])
-        ]
+        template_rules = [_parse_template_rule(r) for r in data.get("template_rules", [])]
 
         return cls(
             sound=data.get("sound", defaults["sound"]),
             sound_file=data.get("sound_file"),
             template_rules=template_rules,
+            files_max_entries=data.get("files_max_entries", defaults["files_max_entries"]),
+            files_max_bytes=data.get("files_max_bytes", defaults["files_max_bytes"]),
+            commits_max_entries=data.get("commits_max_entries", defaults["commits_max_entries"]),
+            commits_group_by=data.get("commits_group_by", defaults["commits_group_by"]),
+            rename_detection=data.get("rename_detection", defaults["rename_detection"]),
+            rename_limit=data.get("rename_limit", defaults["rename_limit"]),
+            rename_max_files=data.get("rename_max_files", defaults["rename_max_files"]),
+            hook_budget_ms=data.get("hook_budget_ms", defaults["hook_budget_ms"]),
+            hook_background_refresh=data.get("hook_background_refresh", defaults["hook_background_refresh"]),
+            scope=_parse_scope(data.get("scope")),
+            prune_policy=_parse_prune_policy(data.get("prune_policy")),
         )
 
     def save(self, workspace: str):
@@ -73,28 +144,48 @@ class Config:
 
         data = {
             "sound": self.sound,
-            "template_rules": [{"prefix": r.prefix, "template": r.template} for r in self.template_rules],
+            "template_rules": [self._template_rule_to_dict(r) for r in self.template_rules],
+            "files_max_entries": self.files_max_entries,
+            "files_max_bytes": self.files_max_bytes,
+            "commits_max_entries": self.commits_max_entries,
+            "commits_group_by": self.commits_group_by,
+            "rename_detection": self.rename_detection,
+            "rename_limit": self.rename_limit,
+            "rename_max_files": self.rename_max_files,
+            "hook_budget_ms": self.hook_budget_ms,
+            "hook_background_refresh": self.hook_background_refresh,
+            "prune_policy": self.prune_policy.to_dict(),
         }
 
         if self.sound_file:
             data["sound_file"] = self.sound_file
 
+        if self.scope:
+            data["scope"] = self.scope.to_dict()
+
         with open(config_path, "w") as f:
             json.dump(data, f, indent=2)
 
+    @staticmethod
+    def _template_rule_to_dict(rule: TemplateRule) -> dict:
+        data: dict = {"prefix": rule.prefix, "template": rule.template}
+        if rule.scope:
+            data["scope"] = rule.scope.to_dict()
+        return data
+
     def get_template_for_branch(self, branch: str) -> str:
         for rule in self.template_rules:
             if branch.startswith(rule.prefix):
                 return rule.template
         return DEFAULT_TEMPLATE
 
-
-def get_config_dir(workspace: str) -> str:
-    return os.path.join(workspace, CONFIG_DIR)
-
-
-def get_templates_dir(workspace: str) -> str:
-    return os.path.join(workspace, CONFIG_DIR, TEMPLATES_DIR)
+    def get_pathspecs_for_branch(self, branch: str) -> list[str]:
+        for rule in self.template_rules:
+            if branch.startswith(rule.prefix):
+                if rule.scope:
+                    return rule.scope.to_pathspecs()
+                break
+        return self.scope.to_pathspecs() if self.scope else []
 
 
 def get_template_dir(workspace: str, template: str | None = None) -> str:
@@ -103,14 +194,6 @@ def get_template_dir(workspace: str, template: str | None = None) -> str:
     return os.path.join(workspace, CONFIG_DIR, TEMPLATES_DIR, template)
 
 
-def get_branches_dir(workspace: str) -> str:
-    return os.path.join(workspace, CONFIG_DIR, BRANCHES_DIR)
-
-
-def config_exists(workspace: str) -> bool:
-    return os.path.exists(os.path.join(workspace, CONFIG_DIR, CONFIG_FILE))
-
-
 def list_templates(workspace: str) -> list[str]:
     templates_dir = get_templates_dir(workspace)
     if not os.path.exists(templates_dir):
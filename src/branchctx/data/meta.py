@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import subprocess
 from datetime import datetime
+from typing import Callable, Iterable
 
 from branchctx.constants import ARCHIVED_DIR, META_FILE
-from branchctx.data.config import get_branches_dir
-from branchctx.utils.git import git_user_name
+from branchctx.data.config import Config, get_branches_dir
+from branchctx.data.state import clear_head_marker, remove_branches_state
+from branchctx.data.tag_index import remove_tag_index_entries
+from branchctx.utils.filelock import file_lock
+from branchctx.utils.git import git_iter_nul_fields, git_user_name, run_git
+from branchctx.utils.profile import profiled
 
 
 def _get_meta_path(workspace: str) -> str:
@@ -18,6 +24,11 @@ def _get_archived_meta_path(workspace: str) -> str:
     return os.path.join(get_branches_dir(workspace), ARCHIVED_DIR, META_FILE)
 
 
+def _meta_lock(workspace: str) -> file_lock:
+    return file_lock(_get_meta_path(workspace))
+
+
+@profiled("meta.load")
 def _load_meta(path: str) -> dict:
     if not os.path.exists(path):
         return {}
@@ -28,21 +39,19 @@ def _load_meta(path: str) -> dict:
         return {}
 
 
+@profiled("meta.save")
 def _save_meta(path: str, data: dict):
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w") as f:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
         json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
 
 
-def _get_last_commit(workspace: str) -> dict | None:
+@profiled("meta.last_commit")
+def _get_last_commit(workspace: str, head: str = "HEAD") -> dict | None:
     try:
-        result = subprocess.run(
-            ["git", "log", "-1", "--format=%H|%s|%aI"],
-            cwd=workspace,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
+        result = run_git(["log", "-1", "--format=%H|%s|%aI", head], cwd=workspace, check=True)
         parts = result.stdout.strip().split("|", 2)
         if len(parts) == 3:
             return {"hash": parts[0][:7], "message": parts[1], "datetime": parts[2]}
@@ -51,89 +60,278 @@ def _get_last_commit(workspace: str) -> dict | None:
     return None
 
 
-def _get_commits_since_base(workspace: str, base_branch: str) -> str:
+COMMIT_GROUP_FORMATS = {
+    "author": "%an",
+    "day": "%ad",
+}
+
+
+def _pathspec_args(pathspecs: list[str] | None) -> list[str]:
+    return ["--", *pathspecs] if pathspecs else []
+
+
+@profiled("meta.count_commits")
+def _count_commits_since_base(
+    workspace: str, base_branch: str, pathspecs: list[str] | None = None, head: str = "HEAD"
+) -> int:
     try:
-        result = subprocess.run(
-            ["git", "log", f"{base_branch}..HEAD", "--oneline"],
-            cwd=workspace,
-            capture_output=True,
-            text=True,
-            check=True,
+        result = run_git(
+            ["rev-list", "--count", f"{base_branch}..{head}", *_pathspec_args(pathspecs)], cwd=workspace, check=True
         )
-        return result.stdout.strip()
+        return int(result.stdout.strip() or 0)
+    except (subprocess.CalledProcessError, ValueError):
+        return 0
+
+
+@profiled("meta.grouped_commits")
+def _get_grouped_commits(
+    workspace: str,
+    base_branch: str,
+    group_by: str,
+    max_entries: int,
+    pathspecs: list[str] | None = None,
+    head: str = "HEAD",
+) -> str:
+    counts: dict[str, int] = {}
+    fields = git_iter_nul_fields(
+        workspace,
+        [
+            "log",
+            "-z",
+            f"--format={COMMIT_GROUP_FORMATS[group_by]}",
+            "--date=short",
+            f"{base_branch}..{head}",
+            *_pathspec_args(pathspecs),
+        ],
+    )
+    try:
+        for key in fields:
+            counts[key] = counts.get(key, 0) + 1
     except subprocess.CalledProcessError:
         return ""
 
+    if group_by == "day":
+        groups = sorted(counts.items(), reverse=True)
+    else:
+        groups = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
 
-def _get_changed_files(workspace: str, base_branch: str) -> str:
-    try:
-        status_result = subprocess.run(
-            ["git", "diff", "--name-status", "-M100", f"{base_branch}...HEAD"],
-            cwd=workspace,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        numstat_result = subprocess.run(
-            ["git", "diff", "--numstat", "-M100", f"{base_branch}...HEAD"],
-            cwd=workspace,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
+    shown = groups[:max_entries] if max_entries else groups
+    if not shown:
+        return ""
 
-        status_lines = status_result.stdout.strip().split("\n")
-        numstat_lines = numstat_result.stdout.strip().split("\n")
+    width = max(len(key) for key, _ in shown)
+    result_lines = [f"{key.ljust(width)}  ({count:,} commit{'s' if count != 1 else ''})" for key, count in shown]
 
-        if not status_lines or status_lines == [""]:
-            return ""
+    if len(groups) > len(shown):
+        result_lines.append(f"... and {len(groups) - len(shown):,} more")
 
-        file_stats: dict[str, tuple[str, str]] = {}
-        for line in numstat_lines:
-            if not line:
-                continue
-            parts = line.split("\t")
-            if len(parts) >= 3:
-                added, removed = parts[0], parts[1]
-                filepath = parts[2] if len(parts) == 3 else parts[3]
-                file_stats[filepath] = (added, removed)
-
-        files: list[tuple[str, str, str, str, str]] = []
-        for line in status_lines:
-            if not line:
-                continue
-            parts = line.split("\t")
-            if len(parts) >= 2:
-                status = parts[0][0]
-                if status == "R" and len(parts) >= 3:
-                    old_path, new_path = parts[1], parts[2]
-                    added, removed = file_stats.get(new_path, ("0", "0"))
-                    files.append((status, new_path, old_path, added, removed))
-                else:
-                    filepath = parts[-1]
-                    added, removed = file_stats.get(filepath, ("0", "0"))
-                    files.append((status, filepath, "", added, removed))
-
-        if not files:
-            return ""
-
-        def get_display_path(f: tuple) -> str:
-            status, filepath, old_path = f[0], f[1], f[2]
-            if status == "R" and old_path:
-                return f"{filepath}  <-  {old_path}"
-            return filepath
-
-        max_display_len = max(len(get_display_path(f)) for f in files)
-        result_lines = []
-        for status, filepath, old_path, added, removed in files:
-            display_path = get_display_path((status, filepath, old_path, added, removed))
+    return "\n".join(result_lines)
+
+
+@profiled("meta.commits")
+def _get_commits_since_base(
+    workspace: str,
+    base_branch: str,
+    config: Config | None = None,
+    pathspecs: list[str] | None = None,
+    head: str = "HEAD",
+) -> str:
+    config = config or Config.load(workspace)
+    max_entries = config.commits_max_entries
+
+    if config.commits_group_by in COMMIT_GROUP_FORMATS:
+        return _get_grouped_commits(workspace, base_branch, config.commits_group_by, max_entries, pathspecs, head)
+
+    args = ["log", f"{base_branch}..{head}", "--oneline"]
+    if max_entries:
+        args.append(f"--max-count={max_entries}")
+    args.extend(_pathspec_args(pathspecs))
+
+    try:
+        result = run_git(args, cwd=workspace, check=True)
+    except subprocess.CalledProcessError:
+        return ""
+
+    commits = result.stdout.strip()
+    if not commits or not max_entries or commits.count("\n") + 1 < max_entries:
+        return commits
+
+    total = _count_commits_since_base(workspace, base_branch, pathspecs, head)
+    if total > max_entries:
+        commits += f"\n... and {total - max_entries:,} more commits"
+    return commits
+
+
+def _format_count(n: int) -> str:
+    for threshold, suffix in ((1_000_000, "M"), (1_000, "k")):
+        if n >= threshold:
+            return f"{n / threshold:.1f}".rstrip("0").rstrip(".") + suffix
+    return str(n)
+
+
+def _parse_stat(value: str) -> int:
+    return int(value) if value.isdigit() else 0
+
+
+@profiled("meta.render_changed_files")
+def _render_changed_files(
+    files: list[list[str]], omitted: int, omitted_added: int, omitted_removed: int, max_bytes: int
+) -> str:
+    def get_display_path(f: list[str]) -> str:
+        status, filepath, old_path = f[0], f[1], f[2]
+        if status == "R" and old_path:
+            return f"{filepath}  <-  {old_path}"
+        return filepath
+
+    displays = [get_display_path(f) for f in files]
+
+    if max_bytes:
+        kept = 0
+        width = 0
+        extra_bytes = 0
+        for i, (f, display) in enumerate(zip(files, displays)):
+            row_width = max(width, len(display))
+            row_extra = extra_bytes + len(display.encode()) - len(display) + len(f"(+{f[3]} -{f[4]})")
+            if (i + 1) * (row_width + 6) + row_extra > max_bytes:
+                break
+            kept, width, extra_bytes = i + 1, row_width, row_extra
+
+        for f in files[kept:]:
+            omitted += 1
+            omitted_added += _parse_stat(f[3])
+            omitted_removed += _parse_stat(f[4])
+        files, displays = files[:kept], displays[:kept]
+
+    result_lines = []
+    if files:
+        max_display_len = max(len(d) for d in displays)
+        for (status, _, _, added, removed), display_path in zip(files, displays):
             padded_display = display_path.ljust(max_display_len)
             result_lines.append(f"{status}  {padded_display}  (+{added} -{removed})")
 
-        return "\n".join(result_lines)
+    if omitted:
+        added, removed = _format_count(omitted_added), _format_count(omitted_removed)
+        result_lines.append(f"... and {omitted:,} more, +{added}/-{removed}")
+
+    return "\n".join(result_lines)
+
+
+@profiled("meta.count_changed_files")
+def _count_changed_files(
+    workspace: str, base_branch: str, limit: int, pathspecs: list[str] | None = None, head: str = "HEAD"
+) -> int:
+    fields = git_iter_nul_fields(
+        workspace,
+        ["diff", "--no-renames", "--name-only", "-z", f"{base_branch}...{head}", *_pathspec_args(pathspecs)],
+    )
+    count = 0
+    try:
+        for _ in fields:
+            count += 1
+            if count > limit:
+                break
     except subprocess.CalledProcessError:
+        return 0
+    finally:
+        fields.close()
+    return count
+
+
+@profiled("meta.rename_args")
+def _get_rename_args(
+    workspace: str, base_branch: str, config: Config, pathspecs: list[str] | None = None, head: str = "HEAD"
+) -> list[str]:
+    if config.rename_detection == "off":
+        return ["--no-renames"]
+    if config.rename_detection != "similarity":
+        return ["-M100%"]
+
+    if config.rename_max_files:
+        count = _count_changed_files(workspace, base_branch, config.rename_max_files, pathspecs, head)
+        if count > config.rename_max_files:
+            return ["--no-renames"]
+
+    args = ["-M"]
+    if config.rename_limit:
+        args.append(f"-l{config.rename_limit}")
+    return args
+
+
+@profiled("meta.changed_files")
+def _get_changed_files(
+    workspace: str,
+    base_branch: str,
+    config: Config | None = None,
+    pathspecs: list[str] | None = None,
+    head: str = "HEAD",
+) -> str:
+    config = config or Config.load(workspace)
+    fields = git_iter_nul_fields(
+        workspace,
+        [
+            "diff",
+            "--raw",
+            "--numstat",
+            "-z",
+            *_get_rename_args(workspace, base_branch, config, pathspecs, head),
+            f"{base_branch}...{head}",
+            *_pathspec_args(pathspecs),
+        ],
+    )
+
+    shown: dict[str, list[str]] = {}
+    omitted = 0
+    omitted_added = 0
+    omitted_removed = 0
+
+    try:
+        for field in fields:
+            if field.startswith(":"):
+                status = field.split()[-1][0]
+                if status in ("R", "C"):
+                    old_path, filepath = next(fields), next(fields)
+                else:
+                    old_path, filepath = "", next(fields)
+
+                if config.files_max_entries and len(shown) >= config.files_max_entries:
+                    omitted += 1
+                else:
+                    shown[filepath] = [status, filepath, old_path if status == "R" else "", "0", "0"]
+                continue
+
+            parts = field.split("\t")
+            if len(parts) < 3:
+                continue
+            added, removed = parts[0], parts[1]
+            filepath = parts[2]
+            if not filepath:
+                next(fields)
+                filepath = next(fields)
+
+            if filepath in shown:
+                shown[filepath][3], shown[filepath][4] = added, removed
+            else:
+                omitted_added += _parse_stat(added)
+                omitted_removed += _parse_stat(removed)
+    except (subprocess.CalledProcessError, StopIteration):
         return ""
 
+    return _render_changed_files(list(shown.values()), omitted, omitted_added, omitted_removed, config.files_max_bytes)
+
+
+META_PROVIDERS: dict[str, Callable[..., str]] = {
+    "commits": _get_commits_since_base,
+    "changed_files": _get_changed_files,
+}
+
+
+META_CONTENT_FIELDS = ("last_commit", "stale", *META_PROVIDERS)
+
+
+def get_meta_content_digest(entry: dict) -> str:
+    content = {field: entry.get(field) for field in META_CONTENT_FIELDS}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
 
 def load_branch_meta(workspace: str) -> dict:
     return _load_meta(_get_meta_path(workspace))
@@ -148,69 +346,183 @@ def get_branch_meta(workspace: str, branch_key: str) -> dict | None:
     return meta.get(branch_key)
 
 
+def new_branch_meta_entry(branch: str, author: str | None) -> dict:
+    now = datetime.now().isoformat()
+    return {
+        "branch": branch,
+        "created_at": now,
+        "author": author,
+        "updated_at": now,
+        "last_commit": None,
+        "commits": "",
+        "changed_files": "",
+    }
+
+
+@profiled("meta.create_branch_meta")
 def create_branch_meta(workspace: str, branch_key: str, branch: str):
-    meta = load_branch_meta(workspace)
+    if branch_key in load_branch_meta(workspace):
+        return
+
+    entry = new_branch_meta_entry(branch, git_user_name(workspace))
+    with _meta_lock(workspace):
+        meta = load_branch_meta(workspace)
+        if branch_key not in meta:
+            meta[branch_key] = entry
+            _save_meta(_get_meta_path(workspace), meta)
+
+
+def compute_meta_entry(
+    workspace: str,
+    branch_key: str,
+    current: dict,
+    base_branch: str,
+    fields: Iterable[str] | None,
+    head: str = "HEAD",
+) -> dict:
+    requested = set(META_PROVIDERS) if fields is None else set(fields)
+    config = Config.load(workspace)
+    pathspecs = config.get_pathspecs_for_branch(current.get("branch", branch_key))
+
+    entry = dict(current)
+    entry.pop("stale", None)
+    entry["last_commit"] = _get_last_commit(workspace, head)
+    for field, provider in META_PROVIDERS.items():
+        entry[field] = provider(workspace, base_branch, config, pathspecs, head) if field in requested else ""
+    return entry
+
+
+def compute_branch_meta(
+    workspace: str, branch_key: str, base_branch: str, fields: Iterable[str] | None = None
+) -> dict | None:
+    current = get_branch_meta(workspace, branch_key)
+    if current is None:
+        return None
+    return compute_meta_entry(workspace, branch_key, current, base_branch, fields)
+
+
+@profiled("meta.update_branch_meta")
+def update_branch_meta(workspace: str, branch_key: str, base_branch: str, fields: Iterable[str] | None = None) -> bool:
+    current = get_branch_meta(workspace, branch_key)
+    if current is None:
+        return False
+
+    computed = compute_meta_entry(workspace, branch_key, current, base_branch, fields)
+
+    with _meta_lock(workspace):
+        meta = load_branch_meta(workspace)
+        latest = meta.get(branch_key)
+        if latest is None:
+            return False
+
+        entry = {**latest, **{field: computed[field] for field in ("last_commit", *META_PROVIDERS)}}
+        entry.pop("stale", None)
+        if get_meta_content_digest(entry) == get_meta_content_digest(latest):
+            return False
+
+        entry["updated_at"] = datetime.now().isoformat()
+        meta[branch_key] = entry
+        _save_meta(_get_meta_path(workspace), meta)
+    return True
+
+
+@profiled("meta.save_entries")
+def save_branch_meta_entries(workspace: str, entries: dict[str, dict]) -> list[str]:
     now = datetime.now().isoformat()
 
-    if branch_key not in meta:
-        meta[branch_key] = {
-            "branch": branch,
-            "created_at": now,
-            "author": git_user_name(workspace),
-            "updated_at": now,
-            "last_commit": None,
-            "commits": "",
-            "changed_files": "",
-        }
+    changed = []
+    with _meta_lock(workspace):
+        meta = load_branch_meta(workspace)
+        for branch_key, entry in entries.items():
+            current = meta.get(branch_key)
+            if current is not None and entry == current:
+                continue
+            if current is not None and get_meta_content_digest(entry) != get_meta_content_digest(current):
+                entry = {**entry, "updated_at": now}
+            meta[branch_key] = entry
+            changed.append(branch_key)
+
+        if changed:
+            _save_meta(_get_meta_path(workspace), meta)
+    return changed
+
+
+@profiled("meta.set_branch_stale")
+def set_branch_stale(workspace: str, branch_key: str, stale: bool):
+    with _meta_lock(workspace):
+        meta = load_branch_meta(workspace)
+        if branch_key not in meta or meta[branch_key].get("stale", False) == stale:
+            return
+
+        if stale:
+            meta[branch_key]["stale"] = True
+        else:
+            meta[branch_key].pop("stale", None)
         _save_meta(_get_meta_path(workspace), meta)
 
 
-def update_branch_meta(workspace: str, branch_key: str, base_branch: str):
-    meta = load_branch_meta(workspace)
-    if branch_key not in meta:
-        return
+@profiled("meta.set_branch_tags_digest")
+def set_branch_tags_digest(workspace: str, branch_key: str, digest: str):
+    with _meta_lock(workspace):
+        meta = load_branch_meta(workspace)
+        if branch_key not in meta or meta[branch_key].get("tags_digest") == digest:
+            return
 
-    now = datetime.now().isoformat()
-    commits = _get_commits_since_base(workspace, base_branch)
-    changed_files = _get_changed_files(workspace, base_branch)
-    last_commit = _get_last_commit(workspace)
+        meta[branch_key]["tags_digest"] = digest
+        _save_meta(_get_meta_path(workspace), meta)
 
-    meta[branch_key]["updated_at"] = now
-    meta[branch_key]["last_commit"] = last_commit
-    meta[branch_key]["commits"] = commits
-    meta[branch_key]["changed_files"] = changed_files
 
-    _save_meta(_get_meta_path(workspace), meta)
+def _remove_branch_sidecars(workspace: str, branch_keys: list[str]):
+    remove_tag_index_entries(workspace, branch_keys)
+    remove_branches_state(workspace, branch_keys)
+    for key in branch_keys:
+        clear_head_marker(workspace, key)
 
 
+@profiled("meta.archive_branch_meta")
 def archive_branch_meta(workspace: str, branch_key: str):
-    meta = load_branch_meta(workspace)
-    if branch_key not in meta:
-        return
+    archive_branch_meta_entries(workspace, [branch_key])
+
 
-    branch_data = meta.pop(branch_key)
-    _save_meta(_get_meta_path(workspace), meta)
+@profiled("meta.archive_entries")
+def archive_branch_meta_entries(workspace: str, branch_keys: Iterable[str]) -> list[str]:
+    with _meta_lock(workspace):
+        meta = load_branch_meta(workspace)
+        moved = [key for key in dict.fromkeys(branch_keys) if key in meta]
+        if not moved:
+            return []
 
-    archived = load_archived_meta(workspace)
-    archived[branch_key] = branch_data
-    _save_meta(_get_archived_meta_path(workspace), archived)
+        archived = load_archived_meta(workspace)
+        for key in moved:
+            archived[key] = meta.pop(key)
+        _save_meta(_get_archived_meta_path(workspace), archived)
+        _save_meta(_get_meta_path(workspace), meta)
+
+    _remove_branch_sidecars(workspace, moved)
+    return moved
 
 
+@profiled("meta.unarchive_branch_meta")
 def unarchive_branch_meta(workspace: str, branch_key: str):
-    archived = load_archived_meta(workspace)
-    if branch_key not in archived:
-        return
+    with _meta_lock(workspace):
+        archived = load_archived_meta(workspace)
+        if branch_key not in archived:
+            return
 
-    branch_data = archived.pop(branch_key)
-    _save_meta(_get_archived_meta_path(workspace), archived)
+        branch_data = archived.pop(branch_key)
+        _save_meta(_get_archived_meta_path(workspace), archived)
 
-    meta = load_branch_meta(workspace)
-    meta[branch_key] = branch_data
-    _save_meta(_get_meta_path(workspace), meta)
+        meta = load_branch_meta(workspace)
+        meta[branch_key] = branch_data
+        _save_meta(_get_meta_path(workspace), meta)
 
 
+@profiled("meta.delete_branch_meta")
 def delete_branch_meta(workspace: str, branch_key: str):
-    meta = load_branch_meta(workspace)
-    if branch_key in meta:
-        del meta[branch_key]
-        _save_meta(_get_meta_path(workspace), meta)
+    with _meta_lock(workspace):
+        meta = load_branch_meta(workspace)
+        if branch_key in meta:
+            del meta[branch_key]
+            _save_meta(_get_meta_path(workspace), meta)
+
+    _remove_branch_sidecars(workspace, [branch_key])
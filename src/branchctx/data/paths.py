@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import os
+import re
+
+from branchctx.constants import BRANCHES_DIR, CONFIG_DIR, CONFIG_FILE, TEMPLATES_DIR
+
+_UNSAFE_BRANCH_CHARS = re.compile(r'[/\\:*?"<>|~^@\[\]\s]')
+
+
+def get_config_dir(workspace: str) -> str:
+    return os.path.join(workspace, CONFIG_DIR)
+
+
+def get_templates_dir(workspace: str) -> str:
+    return os.path.join(workspace, CONFIG_DIR, TEMPLATES_DIR)
+
+
+def get_branches_dir(workspace: str) -> str:
+    return os.path.join(workspace, CONFIG_DIR, BRANCHES_DIR)
+
+
+def config_exists(workspace: str) -> bool:
+    return os.path.exists(os.path.join(workspace, CONFIG_DIR, CONFIG_FILE))
+
+
+def sanitize_branch_name(branch: str) -> str:
+    return _UNSAFE_BRANCH_CHARS.sub("-", branch)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Iterable
+
+from branchctx.constants import BASE_BRANCH_FILE, CONFIG_FILE, HEADS_DIR, SOUND_MARKER_FILE, STATE_FILE
+from branchctx.data.config import get_branches_dir, get_config_dir
+from branchctx.utils.filelock import file_lock
+
+
+def _get_state_path(workspace: str) -> str:
+    return os.path.join(get_branches_dir(workspace), STATE_FILE)
+
+
+def load_state(workspace: str) -> dict:
+    path = _get_state_path(workspace)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+
+def get_branch_state(workspace: str, branch_key: str) -> dict:
+    return load_state(workspace).get(branch_key) or {}
+
+
+def update_branch_state(workspace: str, branch_key: str, **values):
+    update_branches_state(workspace, {branch_key: values})
+
+
+def _save_state(path: str, state: dict):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def update_branches_state(workspace: str, values_by_key: dict[str, dict]):
+    path = _get_state_path(workspace)
+    with file_lock(path):
+        state = load_state(workspace)
+        for branch_key, values in values_by_key.items():
+            state.setdefault(branch_key, {}).update(values)
+        _save_state(path, state)
+
+
+def remove_branches_state(workspace: str, branch_keys: Iterable[str]):
+    path = _get_state_path(workspace)
+    if not os.path.exists(path):
+        return
+
+    with file_lock(path):
+        state = load_state(workspace)
+        removed = [key for key in branch_keys if state.pop(key, None) is not None]
+        if removed:
+            _save_state(path, state)
+
+
+def get_head_marker_path(workspace: str, branch_key: str) -> str:
+    return os.path.join(get_branches_dir(workspace), HEADS_DIR, branch_key)
+
+
+def read_head_marker(workspace: str, branch_key: str) -> str | None:
+    try:
+        with open(get_head_marker_path(workspace, branch_key)) as f:
+            fields = f.readline().split()
+    except OSError:
+        return None
+    return fields[0] if fields else None
+
+
+def write_head_marker(workspace: str, branch_key: str, head: str, base_branch: str, base_head: str | None):
+    path = get_head_marker_path(workspace, branch_key)
+    content = f"{head} {base_branch} {base_head or ''}".rstrip() + "\n"
+    if _is_marker_current(path, content, os.path.join(get_branches_dir(workspace), branch_key, BASE_BRANCH_FILE)):
+        return
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def clear_head_marker(workspace: str, branch_key: str):
+    path = get_head_marker_path(workspace, branch_key)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def get_sound_marker_path(workspace: str) -> str:
+    return os.path.join(get_branches_dir(workspace), HEADS_DIR, SOUND_MARKER_FILE)
+
+
+def _is_marker_current(path: str, content: str, source_path: str) -> bool:
+    try:
+        with open(path) as f:
+            if f.read() != content:
+                return False
+        marker_mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return False
+    try:
+        return marker_mtime >= os.stat(source_path).st_mtime_ns
+    except OSError:
+        return True
+
+
+def write_sound_marker(workspace: str, command: list[str] | None):
+    path = get_sound_marker_path(workspace)
+    content = "".join(f"{part}\n" for part in command or [])
+    if _is_marker_current(path, content, os.path.join(get_config_dir(workspace), CONFIG_FILE)):
+        return
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Iterable
+
+from branchctx.constants import TAG_INDEX_FILE
+from branchctx.data.config import get_branches_dir
+from branchctx.utils.filelock import file_lock
+
+
+def _get_tag_index_path(workspace: str) -> str:
+    return os.path.join(get_branches_dir(workspace), TAG_INDEX_FILE)
+
+
+def load_tag_index(workspace: str) -> dict:
+    path = _get_tag_index_path(workspace)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+
+def get_branch_tag_index(workspace: str, branch_key: str) -> dict:
+    return load_tag_index(workspace).get(branch_key) or {}
+
+
+def save_branch_tag_index(workspace: str, branch_key: str, entry: dict):
+    save_tag_index_entries(workspace, {branch_key: entry})
+
+
+def _save_tag_index(path: str, index: dict):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, path)
+
+
+def save_tag_index_entries(workspace: str, entries: dict[str, dict]):
+    path = _get_tag_index_path(workspace)
+    with file_lock(path):
+        index = load_tag_index(workspace)
+        index.update(entries)
+        _save_tag_index(path, index)
+
+
+def remove_tag_index_entries(workspace: str, branch_keys: Iterable[str]):
+    path = _get_tag_index_path(workspace)
+    if not os.path.exists(path):
+        return
+
+    with file_lock(path):
+        index = load_tag_index(workspace)
+        removed = [key for key in branch_keys if index.pop(key, None) is not None]
+        if removed:
+            _save_tag_index(path, index)
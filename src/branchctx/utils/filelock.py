@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import os
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LOCK_SUFFIX = ".lock"
+
+
+class file_lock:
+    def __init__(self, path: str):
+        self.path = f"{path}{LOCK_SUFFIX}"
+        self._fd: int | None = None
+
+    def __enter__(self) -> file_lock:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        return False
@@ -1,43 +1,78 @@
 from __future__ import annotations
 
+import os
 import subprocess
-from typing import Literal
+import threading
+from typing import Iterator, Literal, NamedTuple
+
+from branchctx.utils.profile import span
+
+ARGV_BUDGET = 8000
+
+_git_call_counts: dict[str, int] = {}
+_git_call_lock = threading.Lock()
+
+
+def _count_git_call(name: str):
+    with _git_call_lock:
+        _git_call_counts[name] = _git_call_counts.get(name, 0) + 1
+
+
+def get_git_call_counts() -> dict[str, int]:
+    with _git_call_lock:
+        return dict(_git_call_counts)
+
+
+def get_git_call_total() -> int:
+    return sum(get_git_call_counts().values())
+
+
+def reset_git_call_counts():
+    with _git_call_lock:
+        _git_call_counts.clear()
+
+
+def run_git(args: list[str], cwd: str | None = None, check: bool = False) -> subprocess.CompletedProcess:
+    cmd = ["git", *args]
+    name = args[0] if args else "git"
+    _count_git_call(name)
+    with span(name, kind="git", argv=cmd) as git_span:
+        result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True)
+        git_span.fields["rc"] = result.returncode
+    if check and result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, cmd, result.stdout, result.stderr)
+    return result
 
 
 def git_init(path: str, branch: str | None = None) -> subprocess.CompletedProcess:
-    cmd = ["git", "init"]
+    args = ["init"]
     if branch:
-        cmd.extend(["-b", branch])
-    return subprocess.run(cmd, cwd=path, capture_output=True, text=True, check=True)
+        args.extend(["-b", branch])
+    return run_git(args, cwd=path, check=True)
 
 
 def git_config(path: str, key: str, value: str) -> subprocess.CompletedProcess:
-    return subprocess.run(["git", "config", key, value], cwd=path, capture_output=True, text=True)
+    return run_git(["config", key, value], cwd=path)
 
 
 def git_add(path: str, files: str = ".") -> subprocess.CompletedProcess:
-    return subprocess.run(["git", "add", files], cwd=path, capture_output=True, text=True)
+    return run_git(["add", files], cwd=path)
 
 
 def git_commit(path: str, message: str) -> subprocess.CompletedProcess:
-    return subprocess.run(["git", "commit", "-m", message], cwd=path, capture_output=True, text=True, check=True)
+    return run_git(["commit", "-m", message], cwd=path, check=True)
 
 
 def git_checkout(path: str, branch: str, create: bool = False) -> subprocess.CompletedProcess:
-    cmd = ["git", "checkout"]
+    args = ["checkout"]
     if create:
-        cmd.append("-b")
-    cmd.append(branch)
-    return subprocess.run(cmd, cwd=path, capture_output=True, text=True, check=True)
+        args.append("-b")
+    args.append(branch)
+    return run_git(args, cwd=path, check=True)
 
 
 def git_current_branch(path: str) -> str | None:
-    result = subprocess.run(
-        ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-        cwd=path,
-        capture_output=True,
-        text=True,
-    )
+    result = run_git(["rev-parse", "--abbrev-ref", "HEAD"], cwd=path)
     if result.returncode == 0:
         return result.stdout.strip()
 
@@ -53,27 +88,28 @@ def git_current_branch(path: str) -> str | None:
     return None
 
 
+def git_head(path: str) -> str | None:
+    result = run_git(["rev-parse", "HEAD"], cwd=path)
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
+
+
 def git_root(path: str) -> str | None:
     try:
-        result = subprocess.run(
-            ["git", "rev-parse", "--show-toplevel"],
-            cwd=path,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
+        result = run_git(["rev-parse", "--show-toplevel"], cwd=path, check=True)
         return result.stdout.strip()
     except subprocess.CalledProcessError:
         return None
 
 
 def git_config_get(key: str, scope: Literal["global"] | None = None, path: str | None = None) -> str | None:
-    cmd = ["git", "config"]
+    args = ["config"]
     if scope == "global":
-        cmd.append("--global")
-    cmd.append(key)
+        args.append("--global")
+    args.append(key)
     try:
-        result = subprocess.run(cmd, cwd=path, capture_output=True, text=True, check=True)
+        result = run_git(args, cwd=path, check=True)
         return result.stdout.strip()
     except subprocess.CalledProcessError:
         return None
@@ -84,55 +120,91 @@ def git_user_name(path: str | None = None) -> str | None:
 
 
 def git_config_unset(key: str, scope: Literal["global"] | None = None) -> bool:
-    cmd = ["git", "config", "--unset"]
+    args = ["config", "--unset"]
     if scope == "global":
-        cmd.insert(2, "--global")
-    cmd.append(key)
+        args.insert(1, "--global")
+    args.append(key)
     try:
-        subprocess.run(cmd, capture_output=True, text=True, check=True)
+        run_git(args, check=True)
         return True
     except subprocess.CalledProcessError:
         return False
 
 
 def git_delete_branch(path: str, branch: str, force: bool = False) -> bool:
+    return git_delete_branches(path, [branch], force) == [branch]
+
+
+def _argv_batches(items: list[str], budget: int = ARGV_BUDGET) -> list[list[str]]:
+    batches: list[list[str]] = [[]]
+    size = 0
+    for item in items:
+        if batches[-1] and size + len(item) + 1 > budget:
+            batches.append([])
+            size = 0
+        batches[-1].append(item)
+        size += len(item) + 1
+    return [batch for batch in batches if batch]
+
+
+def git_delete_branches(path: str, branches: list[str], force: bool = False) -> list[str]:
     flag = "-D" if force else "-d"
+    failed = False
+    for batch in _argv_batches(branches):
+        if run_git(["branch", flag, *batch], cwd=path).returncode != 0:
+            failed = True
+    if not failed:
+        return list(branches)
+    remaining = set(git_list_branches(path))
+    return [branch for branch in branches if branch not in remaining]
+
+
+def git_list_branches(path: str) -> list[str]:
     try:
-        subprocess.run(
-            ["git", "branch", flag, branch],
-            cwd=path,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        return True
+        result = run_git(["branch", "--format=%(refname:short)"], cwd=path, check=True)
+        return [b.strip() for b in result.stdout.strip().split("\n") if b.strip()]
     except subprocess.CalledProcessError:
-        return False
+        return []
 
 
-def git_list_branches(path: str) -> list[str]:
+def git_list_branch_heads(path: str) -> dict[str, str]:
     try:
-        result = subprocess.run(
-            ["git", "branch", "--format=%(refname:short)"],
-            cwd=path,
-            capture_output=True,
-            text=True,
-            check=True,
+        result = run_git(
+            ["for-each-ref", "--format=%(refname:short)%00%(objectname)", "refs/heads"], cwd=path, check=True
         )
-        return [b.strip() for b in result.stdout.strip().split("\n") if b.strip()]
     except subprocess.CalledProcessError:
+        return {}
+    heads = {}
+    for line in result.stdout.splitlines():
+        name, _, sha = line.partition("\0")
+        if name and sha:
+            heads[name] = sha
+    return heads
+
+
+def git_merged_branches(path: str, base: str) -> list[str]:
+    result = run_git(["branch", "--merged", base, "--format=%(refname:short)"], cwd=path)
+    if result.returncode != 0:
         return []
+    return [b.strip() for b in result.stdout.splitlines() if b.strip()]
+
+
+def git_resolve_ref(path: str, ref: str) -> str | None:
+    result = run_git(["rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"], cwd=path)
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def git_resolve_refs(path: str, refs: list[str]) -> list[str | None]:
+    args = [f"{ref}^{{commit}}" for ref in refs]
+    lines = run_git(["rev-parse", *args], cwd=path).stdout.splitlines()
+    return [line if line != arg else None for arg, line in zip(args, lines)] + [None] * (len(args) - len(lines))
 
 
 def git_list_remote_branches(path: str, remote: str = "origin") -> list[str]:
     try:
-        result = subprocess.run(
-            ["git", "branch", "-r", "--format=%(refname:short)"],
-            cwd=path,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
+        result = run_git(["branch", "-r", "--format=%(refname:short)"], cwd=path, check=True)
         prefix = f"{remote}/"
         return [
             b.strip()[len(prefix) :]
@@ -143,20 +215,49 @@ def git_list_remote_branches(path: str, remote: str = "origin") -> list[str]:
         return []
 
 
-def git_hooks_path(path: str) -> str | None:
+class RefSnapshot(NamedTuple):
+    local: list[str]
+    remote: list[str]
+    current: str | None
+
+
+def git_ref_snapshot(path: str, remote: str = "origin") -> RefSnapshot:
+    local_prefix = "refs/heads/"
+    remote_prefix = f"refs/remotes/{remote}/"
     try:
-        result = subprocess.run(
-            ["git", "config", "--get", "core.hooksPath"],
-            cwd=path,
-            capture_output=True,
-            text=True,
-            check=True,
+        result = run_git(
+            ["for-each-ref", "--format=%(HEAD)%00%(refname)", local_prefix, remote_prefix], cwd=path, check=True
         )
+    except subprocess.CalledProcessError:
+        return RefSnapshot([], [], None)
+
+    local, remote_branches, current = [], [], None
+    for line in result.stdout.splitlines():
+        head, _, ref = line.partition("\0")
+        if ref.startswith(local_prefix):
+            local.append(ref[len(local_prefix) :])
+            if head == "*":
+                current = local[-1]
+        elif ref.startswith(remote_prefix) and ref != f"{remote_prefix}HEAD":
+            remote_branches.append(ref[len(remote_prefix) :])
+    return RefSnapshot(local, remote_branches, current)
+
+
+def git_hooks_path(path: str) -> str | None:
+    try:
+        result = run_git(["config", "--get", "core.hooksPath"], cwd=path, check=True)
         return result.stdout.strip()
     except subprocess.CalledProcessError:
         return None
 
 
+def git_path(path: str, name: str) -> str | None:
+    result = run_git(["rev-parse", "--git-path", name], cwd=path)
+    if result.returncode != 0:
+        return None
+    return os.path.join(path, result.stdout.strip())
+
+
 def git_info_exclude_add(path: str, pattern: str) -> bool:
     exclude_file = f"{path}/.git/info/exclude"
     try:
@@ -177,3 +278,28 @@ def git_info_exclude_add(path: str, pattern: str) -> bool:
         return True
     except (OSError, IOError):
         return False
+
+
+def git_iter_nul_fields(path: str, args: list[str]) -> Iterator[str]:
+    cmd = ["git", *args]
+    _count_git_call(args[0])
+    git_span = span(args[0], kind="git", argv=cmd).__enter__()
+    proc = subprocess.Popen(cmd, cwd=path, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    assert proc.stdout is not None
+
+    pending = b""
+    try:
+        for chunk in iter(lambda: proc.stdout.read(65536), b""):
+            *fields, pending = (pending + chunk).split(b"\0")
+            for field in fields:
+                yield field.decode(errors="replace")
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+        git_span.fields["rc"] = returncode
+        git_span.__exit__(None, None, None)
+
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+    if pending:
+        yield pending.decode(errors="replace")
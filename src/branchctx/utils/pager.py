@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+
+DEFAULT_PAGER = "less -FRX"
+NO_PAGER_ENV = "BCTX_NO_PAGER"
+
+
+def _pager_command() -> list[str] | None:
+    if os.environ.get(NO_PAGER_ENV):
+        return None
+    command = os.environ.get("PAGER", DEFAULT_PAGER)
+    return shlex.split(command) or None
+
+
+def should_page(line_count: int) -> bool:
+    if not (hasattr(sys.stdout, "isatty") and sys.stdout.isatty()):
+        return False
+    return line_count >= shutil.get_terminal_size().lines - 1
+
+
+def write_lines(lines: list[str], pager: bool = True):
+    text = "\n".join(lines) + "\n"
+    command = _pager_command() if pager and should_page(len(lines)) else None
+    if command is None:
+        sys.stdout.write(text)
+        return
+
+    sys.stdout.flush()
+    try:
+        proc = subprocess.Popen(command, stdin=subprocess.PIPE, text=True)
+    except OSError:
+        sys.stdout.write(text)
+        return
+
+    try:
+        proc.stdin.write(text)
+        proc.stdin.close()
+    except BrokenPipeError:
+        pass
+    proc.wait()
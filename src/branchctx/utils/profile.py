@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import functools
+import os
+import sys
+import time
+from _thread import get_ident
+
+from branchctx.constants import CONFIG_DIR, CONFIG_FILE, PROFILE_ENV, PROFILE_LOG_FILE, TRACES_DIR
+
+SINK_STDERR = "stderr"
+SINK_LOG = "log"
+SINK_TRACE = "trace"
+
+_SINK_VALUES = {
+    "1": SINK_STDERR,
+    "true": SINK_STDERR,
+    SINK_STDERR: SINK_STDERR,
+    SINK_LOG: SINK_LOG,
+    SINK_TRACE: SINK_TRACE,
+}
+
+
+class _Profile:
+    def __init__(self, command: str, sink: str):
+        self.command = command
+        self.sink = sink
+        self.pid = os.getpid()
+        self.started_wall = time.time()
+        self.origin = time.perf_counter()
+        self.events: list[dict] = []
+        self.depth: dict[int, int] = {}
+
+
+_profile: _Profile | None = None
+
+_TRACE_RESERVED_FIELDS = ("type", "name", "command", "start_ms", "ms", "pid", "tid", "depth")
+
+
+def resolve_sink(flag: bool = False, trace: bool = False) -> str | None:
+    if trace:
+        return SINK_TRACE
+    if flag:
+        return SINK_STDERR
+    return _SINK_VALUES.get(os.environ.get(PROFILE_ENV, "").strip().lower())
+
+
+def start_profile(command: str, sink: str | None) -> bool:
+    global _profile
+    if sink is None:
+        _profile = None
+        return False
+    _profile = _Profile(command, sink)
+    return True
+
+
+def is_profiling() -> bool:
+    return _profile is not None
+
+
+class span:
+    __slots__ = ("name", "kind", "fields", "start", "depth", "tid")
+
+    def __init__(self, name: str, kind: str = "phase", **fields):
+        self.name = name
+        self.kind = kind
+        self.fields = fields
+        self.start: float | None = None
+
+    def __enter__(self) -> span:
+        profile = _profile
+        if profile is None:
+            return self
+        self.tid = get_ident()
+        self.depth = profile.depth.get(self.tid, 0)
+        profile.depth[self.tid] = self.depth + 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        profile = _profile
+        if profile is None or self.start is None:
+            return False
+        end = time.perf_counter()
+        profile.depth[self.tid] = self.depth
+        event = {
+            "type": self.kind,
+            "name": self.name,
+            "start_ms": round((self.start - profile.origin) * 1000, 3),
+            "ms": round((end - self.start) * 1000, 3),
+            "depth": self.depth,
+            "tid": self.tid,
+            **self.fields,
+        }
+        if exc_type is not None:
+            event["error"] = exc_type.__name__
+        profile.events.append(event)
+        return False
+
+
+def profiled(name: str):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _profile is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _find_workspace(start: str) -> str | None:
+    current = os.path.abspath(start)
+    while True:
+        if os.path.isfile(os.path.join(current, CONFIG_DIR, CONFIG_FILE)):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def get_profile_log_path(workspace: str) -> str:
+    return os.path.join(workspace, CONFIG_DIR, PROFILE_LOG_FILE)
+
+
+def get_trace_dir(workspace: str) -> str:
+    return os.path.join(workspace, CONFIG_DIR, TRACES_DIR)
+
+
+def to_chrome_trace(records: list[dict]) -> dict:
+    events: list[dict] = []
+    threads: dict[int, int] = {}
+    for record in records:
+        if record["type"] == "summary":
+            events.append(
+                {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": record["pid"],
+                    "args": {"name": f"bctx {record['command']}"},
+                }
+            )
+            continue
+        threads.setdefault(record["tid"], len(threads))
+        args = {k: v for k, v in record.items() if k not in _TRACE_RESERVED_FIELDS}
+        events.append(
+            {
+                "name": " ".join(record["argv"]) if record["type"] == "git" else record["name"],
+                "cat": record["type"],
+                "ph": "X",
+                "ts": round(record["start_ms"] * 1000, 1),
+                "dur": round(record["ms"] * 1000, 1),
+                "pid": record["pid"],
+                "tid": record["tid"],
+                "args": args,
+            }
+        )
+    pid = records[-1]["pid"] if records else os.getpid()
+    for tid, index in threads.items():
+        name = "main" if index == 0 else f"worker-{index}"
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def _write_trace(records: list[dict], command: str, workspace: str | None) -> str:
+    import json
+
+    trace_dir = get_trace_dir(workspace) if workspace else os.getcwd()
+    os.makedirs(trace_dir, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(trace_dir, f"{command}-{stamp}-{os.getpid()}.json")
+    with open(path, "w") as f:
+        json.dump(to_chrome_trace(records), f)
+    return path
+
+
+def _build_records(profile: _Profile, exit_code: int | None, workspace: str | None) -> list[dict]:
+    base = {"pid": profile.pid, "command": profile.command}
+    records = [{**base, **event} for event in sorted(profile.events, key=lambda e: e["start_ms"])]
+    git_events = [e for e in profile.events if e["type"] == "git"]
+    git_commands: dict[str, int] = {}
+    for event in git_events:
+        git_commands[event["name"]] = git_commands.get(event["name"], 0) + 1
+    records.append(
+        {
+            **base,
+            "type": "summary",
+            "ts": round(profile.started_wall, 3),
+            "repo": os.path.basename(workspace) if workspace else None,
+            "ms": round((time.perf_counter() - profile.origin) * 1000, 3),
+            "exit_code": exit_code,
+            "git_calls": len(git_events),
+            "git_commands": git_commands,
+            "git_ms": round(sum(e["ms"] for e in git_events), 3),
+        }
+    )
+    return records
+
+
+def stop_profile() -> list[dict]:
+    global _profile
+    profile = _profile
+    _profile = None
+    if profile is None:
+        return []
+    return _build_records(profile, None, None)
+
+
+def finish_profile(exit_code: int | None = None) -> list[dict]:
+    global _profile
+    profile = _profile
+    _profile = None
+    if profile is None:
+        return []
+
+    workspace = _find_workspace(os.getcwd())
+    records = _build_records(profile, exit_code, workspace)
+
+    if profile.sink == SINK_TRACE:
+        try:
+            path = _write_trace(records, profile.command, workspace)
+            sys.stderr.write(f"Trace written: {path}\n")
+            return records
+        except OSError:
+            pass
+
+    import json
+
+    lines = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+
+    if profile.sink == SINK_LOG and workspace:
+        try:
+            with open(get_profile_log_path(workspace), "a") as f:
+                f.write(lines)
+            return records
+        except OSError:
+            pass
+
+    sys.stderr.write(lines)
+    sys.stderr.flush()
+    return records
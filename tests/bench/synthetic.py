@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+from dataclasses import dataclass, replace
+
+from branchctx.constants import HOOK_POST_CHECKOUT, HOOK_POST_COMMIT
+from branchctx.core.hooks import install_hook
+from branchctx.core.sync import sanitize_branch_name
+from branchctx.data.config import get_branches_dir, get_config_dir, get_template_dir
+from branchctx.utils.git import git_checkout
+
+FEATURE_BRANCH = "feature/bench"
+BASE_BRANCH = "main"
+_COMMITTER = "Bench <bench@example.com>"
+_EPOCH = 1_700_000_000
+
+
+@dataclass(frozen=True)
+class SyntheticRepoSpec:
+    branches: int = 10
+    changed_files: int = 100
+    commits_ahead: int = 10
+    template_files: int = 5
+    context_notes: int = 10
+
+    @property
+    def orphans(self) -> int:
+        return max(1, self.branches // 10)
+
+
+BASELINE_SPEC = SyntheticRepoSpec()
+
+SCENARIOS: dict[str, SyntheticRepoSpec] = {
+    "baseline": BASELINE_SPEC,
+    "branches-1k": replace(BASELINE_SPEC, branches=1_000),
+    "branches-10k": replace(BASELINE_SPEC, branches=10_000),
+    "files-100k": replace(BASELINE_SPEC, changed_files=100_000),
+    "commits-5k": replace(BASELINE_SPEC, commits_ahead=5_000),
+    "template-500": replace(BASELINE_SPEC, template_files=500),
+    "notes-1k": replace(BASELINE_SPEC, context_notes=1_000),
+}
+
+
+def _data(payload: str) -> str:
+    return f"data {len(payload.encode())}\n{payload}\n"
+
+
+def _commit(ref: str, mark: int, message: str, parent: int | None, files: dict[str, str]) -> str:
+    lines = [f"commit {ref}\n", f"mark :{mark}\n", f"committer {_COMMITTER} {_EPOCH + mark} +0000\n", _data(message)]
+    if parent is not None:
+        lines.append(f"from :{parent}\n")
+    for path, content in files.items():
+        lines.append(f"M 100644 inline {path}\n")
+        lines.append(_data(content))
+    lines.append("\n")
+    return "".join(lines)
+
+
+def _changed_file_path(index: int) -> str:
+    return f"src/d{index // 1000}/f{index}.txt"
+
+
+def _fast_import_stream(spec: SyntheticRepoSpec) -> str:
+    parts = [_commit(f"refs/heads/{BASE_BRANCH}", 1, "init", None, {"README.md": "# Bench\n"})]
+
+    files = {_changed_file_path(i): f"file {i}\n" for i in range(spec.changed_files)}
+    parts.append(_commit(f"refs/heads/{FEATURE_BRANCH}", 2, "feat: add files", 1, files))
+    for n in range(1, spec.commits_ahead):
+        index = n % spec.changed_files
+        content = f"file {index}\nrevision {n}\n"
+        parts.append(
+            _commit(
+                f"refs/heads/{FEATURE_BRANCH}", n + 2, f"feat: change {n}", n + 1, {_changed_file_path(index): content}
+            )
+        )
+
+    for i in range(spec.branches):
+        parts.append(f"reset refs/heads/bench/branch-{i}\nfrom :1\n\n")
+    return "".join(parts)
+
+
+def _write(path: str, content: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def _write_templates(workspace: str, spec: SyntheticRepoSpec):
+    template_dir = get_template_dir(workspace)
+    _write(
+        os.path.join(template_dir, "context.md"),
+        "# {{branch}}\n\n<bctx:commits></bctx:commits>\n\n<bctx:files></bctx:files>\n",
+    )
+    for i in range(1, spec.template_files):
+        _write(
+            os.path.join(template_dir, "docs", f"d{i // 50}", f"note{i}.md"), f"# Note {i}\n\nBranch: {{{{branch}}}}\n"
+        )
+
+
+def _write_branch_contexts(workspace: str, spec: SyntheticRepoSpec):
+    branches_dir = get_branches_dir(workspace)
+    names = [f"bench/branch-{i}" for i in range(spec.branches)] + [f"orphan/{i}" for i in range(spec.orphans)]
+    meta = {}
+    for name in names:
+        key = sanitize_branch_name(name)
+        _write(os.path.join(branches_dir, key, "context.md"), f"# {name}\n")
+        meta[key] = {
+            "branch": name,
+            "created_at": "2024-01-01T00:00:00",
+            "author": "Bench",
+            "updated_at": "2024-01-01T00:00:00",
+            "last_commit": None,
+            "commits": "",
+            "changed_files": "",
+        }
+    _write(os.path.join(branches_dir, "meta.json"), json.dumps(meta, indent=2))
+
+
+def _write_context_notes(workspace: str, spec: SyntheticRepoSpec):
+    context_dir = os.path.join(get_branches_dir(workspace), sanitize_branch_name(FEATURE_BRANCH))
+    for i in range(spec.context_notes):
+        body = "<bctx:commits></bctx:commits>\n" if i % 10 == 0 else "Plain notes.\n"
+        _write(os.path.join(context_dir, "notes", f"n{i // 100}", f"note{i}.md"), f"# Note {i}\n\n{body}")
+
+
+def build_synthetic_repo(workspace: str, spec: SyntheticRepoSpec, bctx: list[str]) -> str:
+    subprocess.run(["git", "init", "-q", "-b", BASE_BRANCH], cwd=workspace, check=True)
+    subprocess.run(["git", "config", "user.email", "bench@example.com"], cwd=workspace, check=True)
+    subprocess.run(["git", "config", "user.name", "Bench"], cwd=workspace, check=True)
+    subprocess.run(
+        ["git", "fast-import", "--quiet"], cwd=workspace, input=_fast_import_stream(spec).encode(), check=True
+    )
+
+    os.makedirs(get_config_dir(workspace), exist_ok=True)
+    _write(
+        os.path.join(get_config_dir(workspace), "config.json"),
+        json.dumps({"default_base_branch": BASE_BRANCH, "sound": False}),
+    )
+    _write(os.path.join(workspace, ".gitignore"), "_branch\n.bctx/\n")
+    _write_templates(workspace, spec)
+    _write_branch_contexts(workspace, spec)
+
+    git_checkout(workspace, FEATURE_BRANCH)
+    subprocess.run([*bctx, "sync"], cwd=workspace, capture_output=True, check=True)
+    _write_context_notes(workspace, spec)
+    subprocess.run([*bctx, "sync"], cwd=workspace, capture_output=True, check=True)
+    install_hook(workspace, HOOK_POST_CHECKOUT)
+    install_hook(workspace, HOOK_POST_COMMIT)
+    return workspace
@@ -0,0 +1,90 @@
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+
+from tests.bench.synthetic import BASE_BRANCH, FEATURE_BRANCH, SCENARIOS, build_synthetic_repo
+
+BASELINES_FILE = os.path.join(os.path.dirname(__file__), "baselines.json")
+BCTX = [sys.executable, "-m", "branchctx.cli"]
+
+RUNS = int(os.environ.get("BCTX_BENCH_RUNS", "7"))
+TOLERANCE = float(os.environ.get("BCTX_BENCH_TOLERANCE", "1.5"))
+UPDATE_BASELINES = os.environ.get("BCTX_BENCH_UPDATE") == "1"
+
+COMMANDS = {
+    "on-checkout": ["on-checkout", BASE_BRANCH, FEATURE_BRANCH],
+    "on-commit": ["on-commit"],
+    "sync": ["sync"],
+    "status": ["status"],
+    "prune": ["prune"],
+    "template": ["template", "_default"],
+}
+
+pytestmark = pytest.mark.skipif(os.environ.get("BCTX_BENCH") != "1", reason="set BCTX_BENCH=1 to run benchmarks")
+
+
+def _load_baselines() -> dict:
+    if not os.path.exists(BASELINES_FILE):
+        return {}
+    with open(BASELINES_FILE) as f:
+        return json.load(f)
+
+
+def _save_baseline(key: str, result: dict):
+    baselines = _load_baselines()
+    baselines[key] = result
+    with open(BASELINES_FILE, "w") as f:
+        json.dump(dict(sorted(baselines.items())), f, indent=2)
+        f.write("\n")
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _measure(workspace: str, args: list[str]) -> dict:
+    env = {k: v for k, v in os.environ.items() if k != "BCTX_PROFILE"}
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [*BCTX, *args], cwd=workspace, env=env, stdin=subprocess.DEVNULL, capture_output=True, text=True
+        )
+        timings.append((time.perf_counter() - started) * 1000)
+        assert result.returncode == 0, result.stdout + result.stderr
+    return {"median_ms": round(statistics.median(timings), 1), "p95_ms": round(_percentile(timings, 95), 1)}
+
+
+@pytest.fixture(scope="module", params=list(SCENARIOS), ids=list(SCENARIOS))
+def synthetic_repo(request):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield request.param, build_synthetic_repo(tmpdir, SCENARIOS[request.param], BCTX)
+
+
+@pytest.mark.parametrize("command", list(COMMANDS))
+def test_command_against_baseline(synthetic_repo, command):
+    scenario, workspace = synthetic_repo
+    key = f"{scenario}/{command}"
+
+    result = _measure(workspace, COMMANDS[command])
+    baseline = _load_baselines().get(key)
+
+    summary = f"{key}: median {result['median_ms']}ms, p95 {result['p95_ms']}ms"
+    if baseline:
+        summary += f" (baseline median {baseline['median_ms']}ms, p95 {baseline['p95_ms']}ms)"
+    print(summary)
+
+    if UPDATE_BASELINES or baseline is None:
+        _save_baseline(key, result)
+        return
+
+    assert result["median_ms"] <= baseline["median_ms"] * TOLERANCE, summary
+    assert result["p95_ms"] <= baseline["p95_ms"] * TOLERANCE, summary
@@ -0,0 +1,33 @@
+import os
+import tempfile
+
+import pytest
+
+from branchctx.utils.git import git_init
+from tests.utils import import_profile
+
+IMPORT_BUDGET_US = {
+    "on-commit": 80_000,
+    "on-checkout": 80_000,
+    "--help": 50_000,
+    "prompt": 50_000,
+}
+
+pytestmark = pytest.mark.skipif(os.environ.get("BCTX_BENCH") != "1", reason="set BCTX_BENCH=1 to run benchmarks")
+
+
+@pytest.fixture
+def bare_repo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        git_init(tmpdir, "main")
+        yield tmpdir
+
+
+@pytest.mark.parametrize(
+    "args",
+    [["on-commit"], ["on-checkout", "main", "feature"], ["--help"], ["prompt"]],
+)
+def test_startup_import_budget(bare_repo, args):
+    best_us = min(import_profile(bare_repo, args)[1] for _ in range(3))
+
+    assert best_us < IMPORT_BUDGET_US[args[0]]
@@ -4,11 +4,13 @@ import tempfile
 import pytest
 
 from branchctx.constants import DEFAULT_SYMLINK, HOOK_POST_CHECKOUT, HOOK_POST_COMMIT
+from branchctx.core import context_tags
 from branchctx.core.context_tags import update_context_tags
 from branchctx.core.hooks import install_hook
 from branchctx.core.sync import sanitize_branch_name, sync_branch
 from branchctx.data.config import Config, get_branches_dir, get_template_dir
-from branchctx.data.meta import create_branch_meta, update_branch_meta
+from branchctx.data.meta import create_branch_meta, get_branch_meta, update_branch_meta
+from branchctx.data.tag_index import get_branch_tag_index
 from branchctx.utils.git import git_add, git_checkout, git_commit, git_config, git_init
 
 
@@ -198,3 +200,98 @@ def test_no_tags_in_file_skips_silently(git_repo):
     )
 
     assert len(updates) == 0
+
+
+def test_tag_index_skips_unchanged_files(git_repo, monkeypatch):
+    sync_branch(git_repo, "main")
+
+    branch_key = sanitize_branch_name("main")
+    create_branch_meta(git_repo, branch_key, "main")
+    update_branch_meta(git_repo, branch_key, "main")
+
+    context_dir = os.path.join(git_repo, DEFAULT_SYMLINK)
+    for i in range(3):
+        with open(os.path.join(context_dir, f"note{i}.md"), "w") as f:
+            f.write(f"# Note {i}")
+
+    update_context_tags(git_repo, context_dir, branch_key, "main")
+
+    index = get_branch_tag_index(git_repo, branch_key)
+    assert index["files"]["context.md"]["tags"]
+    assert index["files"]["note0.md"]["tags"] == []
+
+    def fail(_filepath):
+        raise AssertionError("unchanged file was read")
+
+    monkeypatch.setattr(context_tags, "find_tag_spans_in_file", fail)
+    updates = update_context_tags(git_repo, context_dir, branch_key, "main")
+
+    assert updates == []
+
+
+def test_tag_index_picks_up_new_tag_file(git_repo):
+    sync_branch(git_repo, "main")
+
+    branch_key = sanitize_branch_name("main")
+    create_branch_meta(git_repo, branch_key, "main")
+    update_branch_meta(git_repo, branch_key, "main")
+
+    context_dir = os.path.join(git_repo, DEFAULT_SYMLINK)
+    update_context_tags(git_repo, context_dir, branch_key, "main")
+
+    notes = os.path.join(context_dir, "notes.md")
+    with open(notes, "w") as f:
+        f.write("<bctx:commits></bctx:commits>")
+
+    updates = update_context_tags(git_repo, context_dir, branch_key, "main")
+
+    assert [u.file for u in updates] == [notes]
+    with open(notes) as f:
+        assert "N/A - in sync with main" in f.read()
+
+
+def test_unchanged_payload_skips_tag_phase(git_repo, monkeypatch):
+    sync_branch(git_repo, "main")
+
+    branch_key = sanitize_branch_name("main")
+    create_branch_meta(git_repo, branch_key, "main")
+    update_branch_meta(git_repo, branch_key, "main")
+
+    context_dir = os.path.join(git_repo, DEFAULT_SYMLINK)
+    update_context_tags(git_repo, context_dir, branch_key, "main")
+
+    assert get_branch_meta(git_repo, branch_key)["tags_digest"]
+
+    def fail(*_args):
+        raise AssertionError("tag file was opened")
+
+    monkeypatch.setattr(context_tags, "_tags_up_to_date", fail)
+    updates = update_context_tags(git_repo, context_dir, branch_key, "main")
+
+    assert updates == []
+
+
+def test_changed_payload_updates_tags(git_repo):
+    sync_branch(git_repo, "main")
+
+    git_checkout(git_repo, "feature/digest", create=True)
+    sync_branch(git_repo, "feature/digest")
+
+    branch_key = sanitize_branch_name("feature/digest")
+    create_branch_meta(git_repo, branch_key, "feature/digest")
+
+    context_dir = os.path.join(git_repo, DEFAULT_SYMLINK)
+    update_branch_meta(git_repo, branch_key, "main")
+    update_context_tags(git_repo, context_dir, branch_key, "main")
+    digest = get_branch_meta(git_repo, branch_key)["tags_digest"]
+
+    with open(os.path.join(git_repo, "new_file.py"), "w") as f:
+        f.write("print('hello')")
+    git_add(git_repo)
+    git_commit(git_repo, "feat: add new file")
+
+    update_branch_meta(git_repo, branch_key, "main")
+    updates = update_context_tags(git_repo, context_dir, branch_key, "main")
+
+    assert len(updates) == 2
+    assert get_branch_meta(git_repo, branch_key)["tags_digest"] != digest
@@ -0,0 +1,209 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from branchctx.commands.sync import cmd_sync
+from branchctx.constants import DEFAULT_SYMLINK, HOOK_POST_CHECKOUT, HOOK_POST_COMMIT, PROFILE_ENV
+from branchctx.core.hooks import install_hook
+from branchctx.core.sync import get_branch_rel_path, get_sound_command, sanitize_branch_name
+from branchctx.data.branch_base import save_base_branch
+from branchctx.data.config import get_branches_dir, get_config_dir, get_template_dir
+from branchctx.data.meta import get_branch_meta
+from branchctx.data.state import get_head_marker_path, get_sound_marker_path, read_head_marker
+from branchctx.utils.git import git_add, git_checkout, git_commit, git_config, git_head, git_init, run_git
+from tests.utils import normalize_path
+
+
+@pytest.fixture
+def git_repo():
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmpdir:
+        git_init(tmpdir, "main")
+        git_config(tmpdir, "user.email", "test@test.com")
+        git_config(tmpdir, "user.name", "Test User")
+
+        with open(os.path.join(tmpdir, "README.md"), "w") as f:
+            f.write("# Test")
+        git_add(tmpdir)
+        git_commit(tmpdir, "init")
+
+        template_dir = get_template_dir(tmpdir)
+        os.makedirs(template_dir)
+        os.makedirs(get_branches_dir(tmpdir))
+
+        with open(os.path.join(get_config_dir(tmpdir), "config.json"), "w") as f:
+            json.dump({"default_base_branch": "main", "sound": False, "template_rules": []}, f)
+
+        with open(os.path.join(template_dir, "context.md"), "w") as f:
+            f.write("# Context\n<bctx:commits></bctx:commits>")
+
+        install_hook(tmpdir, HOOK_POST_CHECKOUT)
+        install_hook(tmpdir, HOOK_POST_COMMIT)
+
+        original_cwd = os.getcwd()
+        os.chdir(tmpdir)
+        yield tmpdir
+        os.chdir(original_cwd)
+
+
+def _read_marker(git_repo, branch):
+    return read_head_marker(git_repo, sanitize_branch_name(branch))
+
+
+def _prepare_branches(git_repo):
+    git_checkout(git_repo, "feature/fast", create=True)
+    cmd_sync([])
+    git_checkout(git_repo, "main")
+    cmd_sync([])
+
+
+def test_sync_writes_head_marker(git_repo):
+    _prepare_branches(git_repo)
+
+    assert _read_marker(git_repo, "main") == git_head(git_repo)
+    assert _read_marker(git_repo, "feature/fast") == git_head(git_repo)
+
+
+def test_checkout_fast_path_skips_python(git_repo, monkeypatch):
+    _prepare_branches(git_repo)
+    monkeypatch.setenv(PROFILE_ENV, "1")
+
+    result = git_checkout(git_repo, "feature/fast")
+
+    assert "Branch: main -> feature/fast (synced)" in result.stderr + result.stdout
+    assert '"on-checkout"' not in result.stderr
+    symlink_path = os.path.join(git_repo, DEFAULT_SYMLINK)
+    assert normalize_path(os.readlink(symlink_path)) == get_branch_rel_path("feature/fast")
+
+
+def test_checkout_with_moved_head_runs_python(git_repo):
+    _prepare_branches(git_repo)
+    git_checkout(git_repo, "feature/fast")
+
+    with open(os.path.join(git_repo, "file.py"), "w") as f:
+        f.write("x = 1")
+    git_add(git_repo, "file.py")
+    git_commit(git_repo, "feat: move head")
+    feature_head = git_head(git_repo)
+
+    git_checkout(git_repo, "main")
+    marker_path = get_head_marker_path(git_repo, sanitize_branch_name("feature/fast"))
+    with open(marker_path, "w") as f:
+        f.write("0" * 40)
+
+    git_checkout(git_repo, "feature/fast")
+
+    assert _read_marker(git_repo, "feature/fast") == feature_head
+    assert "feat: move head" in get_branch_meta(git_repo, sanitize_branch_name("feature/fast"))["commits"]
+
+
+def test_checkout_new_branch_runs_python(git_repo):
+    _prepare_branches(git_repo)
+
+    git_checkout(git_repo, "feature/new", create=True)
+
+    assert os.path.isdir(os.path.join(get_branches_dir(git_repo), sanitize_branch_name("feature/new")))
+    assert get_branch_meta(git_repo, sanitize_branch_name("feature/new")) is not None
+
+
+def _enable_sound(git_repo):
+    config_path = os.path.join(get_config_dir(git_repo), "config.json")
+    with open(config_path) as f:
+        config_data = json.load(f)
+    config_data["sound"] = True
+    with open(config_path, "w") as f:
+        json.dump(config_data, f)
+
+
+def _read_sound_marker(git_repo):
+    with open(get_sound_marker_path(git_repo)) as f:
+        return f.read().splitlines()
+
+
+@patch("branchctx.core.sync.play_sound")
+def test_sound_keeps_head_marker(mock_play, git_repo):
+    _prepare_branches(git_repo)
+    assert _read_sound_marker(git_repo) == []
+
+    _enable_sound(git_repo)
+    cmd_sync([])
+
+    assert _read_marker(git_repo, "main") == git_head(git_repo)
+    assert _read_sound_marker(git_repo) == get_sound_command(None)
+
+
+@patch("branchctx.core.sync.platform.system", return_value="Windows")
+@patch("branchctx.core.sync.play_sound")
+def test_sound_without_shell_player_clears_head_marker(mock_play, mock_system, git_repo):
+    _prepare_branches(git_repo)
+
+    _enable_sound(git_repo)
+    cmd_sync([])
+
+    assert _read_marker(git_repo, "main") is None
+
+
+def test_config_change_after_marker_runs_python(git_repo):
+    _prepare_branches(git_repo)
+    sound_marker = get_sound_marker_path(git_repo)
+    os.utime(sound_marker, ns=(0, 0))
+
+    result = git_checkout(git_repo, "feature/fast")
+
+    assert "Branch: main -> feature/fast (synced)" in result.stderr + result.stdout
+    assert os.stat(sound_marker).st_mtime_ns > 0
+
+
+def test_checkout_after_base_moved_runs_python(git_repo):
+    _prepare_branches(git_repo)
+    git_checkout(git_repo, "feature/fast")
+    with open(os.path.join(git_repo, "file.py"), "w") as f:
+        f.write("x = 1")
+    git_add(git_repo, "file.py")
+    git_commit(git_repo, "feat commit")
+    with open(os.path.join(git_repo, DEFAULT_SYMLINK, "context.md")) as f:
+        assert "feat commit" in f.read()
+
+    git_checkout(git_repo, "main")
+    assert run_git(["merge", "--ff-only", "feature/fast"], cwd=git_repo).returncode == 0
+    git_checkout(git_repo, "feature/fast")
+
+    with open(os.path.join(git_repo, DEFAULT_SYMLINK, "context.md")) as f:
+        content = f.read()
+    assert "feat commit" not in content
+    assert "N/A - in sync with main" in content
+
+
+def test_base_branch_override_after_marker_runs_python(git_repo):
+    _prepare_branches(git_repo)
+    run_git(["branch", "develop"], cwd=git_repo)
+    os.utime(get_head_marker_path(git_repo, sanitize_branch_name("feature/fast")), ns=(0, 0))
+    save_base_branch(os.path.join(get_branches_dir(git_repo), sanitize_branch_name("feature/fast")), "develop")
+
+    git_checkout(git_repo, "feature/fast")
+
+    with open(get_head_marker_path(git_repo, sanitize_branch_name("feature/fast"))) as f:
+        assert f.read().split()[1] == "develop"
+
+
+def test_fast_path_renames_symlink_into_place(git_repo, tmp_path, monkeypatch):
+    _prepare_branches(git_repo)
+    log_path = tmp_path / "ln.log"
+    shim = tmp_path / "ln"
+    shim.write_text(f'#!/bin/sh\nfor last; do :; done\n{shutil.which("ln")} "$@" && ls -di "$last" >> "{log_path}"\n')
+    shim.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    symlink_path = os.path.join(git_repo, DEFAULT_SYMLINK)
+    old_inode = os.lstat(symlink_path).st_ino
+
+    result = git_checkout(git_repo, "feature/fast")
+
+    assert "Branch: main -> feature/fast (synced)" in result.stderr + result.stdout
+    inode, name = log_path.read_text().split()
+    assert name != DEFAULT_SYMLINK
+    assert not os.path.lexists(os.path.join(git_repo, name))
+    assert os.lstat(symlink_path).st_ino == int(inode) != old_inode
+    assert normalize_path(os.readlink(symlink_path)) == get_branch_rel_path("feature/fast")
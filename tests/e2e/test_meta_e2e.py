@@ -6,12 +6,17 @@ import pytest
 
 from branchctx.commands.on_checkout import cmd_on_checkout
 from branchctx.commands.on_commit import cmd_on_commit
+from branchctx.commands.refresh import cmd_refresh
+from branchctx.commands.sync import cmd_sync
 from branchctx.commands.template import cmd_template
 from branchctx.constants import DEFAULT_SYMLINK, HOOK_POST_CHECKOUT, HOOK_POST_COMMIT
+from branchctx.core import context_tags as context_tags_module
+from branchctx.core import refresh as refresh_module
 from branchctx.core.hooks import install_hook
 from branchctx.core.sync import archive_branch, sanitize_branch_name, sync_branch
 from branchctx.data.config import get_branches_dir, get_config_dir, get_template_dir
 from branchctx.data.meta import get_branch_meta, load_archived_meta
+from branchctx.data.state import get_branch_state, update_branch_state
 from branchctx.utils.git import git_add, git_checkout, git_commit, git_config, git_init
 
 
@@ -110,6 +115,27 @@ def test_on_commit_updates_context_tags(git_repo):
     assert "test.py" in content
 
 
+def test_on_commit_skips_meta_fields_without_tags(git_repo):
+    sync_branch(git_repo, "main")
+    git_checkout(git_repo, "feature/no-files-tag", create=True)
+    cmd_on_checkout(["main", "feature/no-files-tag"])
+
+    context_file = os.path.join(git_repo, DEFAULT_SYMLINK, "context.md")
+    with open(context_file, "w") as f:
+        f.write("# Context\n<bctx:commits></bctx:commits>")
+
+    with open(os.path.join(git_repo, "new_file.py"), "w") as f:
+        f.write("print('hello')")
+    git_add(git_repo)
+    git_commit(git_repo, "feat: add file")
+
+    cmd_on_commit([])
+
+    meta = get_branch_meta(git_repo, sanitize_branch_name("feature/no-files-tag"))
+    assert "feat: add file" in meta["commits"]
+    assert meta["changed_files"] == ""
+
+
 def test_template_preserves_meta_data(git_repo):
     sync_branch(git_repo, "main")
     git_checkout(git_repo, "feature/template-test", create=True)
@@ -156,3 +182,162 @@ def test_prune_moves_meta_to_archived(git_repo):
     archived = load_archived_meta(git_repo)
     assert branch_key in archived
     assert archived[branch_key]["branch"] == "feature/to-prune"
+
+
+def _set_hook_budget(git_repo, budget_ms):
+    config_path = os.path.join(get_config_dir(git_repo), "config.json")
+    with open(config_path) as f:
+        config_data = json.load(f)
+    config_data["hook_budget_ms"] = budget_ms
+    with open(config_path, "w") as f:
+        json.dump(config_data, f)
+
+
+def _commit_file(git_repo, name, message):
+    with open(os.path.join(git_repo, name), "w") as f:
+        f.write("x = 1")
+    git_add(git_repo, name)
+    git_commit(git_repo, message)
+
+
+def test_on_commit_records_phase_timings_with_budget(git_repo):
+    _set_hook_budget(git_repo, 60000)
+    sync_branch(git_repo, "main")
+    git_checkout(git_repo, "feature/budget", create=True)
+    cmd_on_checkout(["main", "feature/budget"])
+
+    _commit_file(git_repo, "file.py", "feat: add file")
+    cmd_on_commit([])
+
+    branch_key = sanitize_branch_name("feature/budget")
+    timings = get_branch_state(git_repo, branch_key)["timings"]
+    assert set(timings) == {"meta", "tags"}
+    assert "stale" not in get_branch_meta(git_repo, branch_key)
+
+
+def test_on_commit_over_budget_marks_stale(git_repo, monkeypatch):
+    spawned = []
+    monkeypatch.setattr(refresh_module, "spawn_background_refresh", spawned.append)
+
+    _set_hook_budget(git_repo, 100)
+    sync_branch(git_repo, "main")
+    git_checkout(git_repo, "feature/slow", create=True)
+    cmd_on_checkout(["main", "feature/slow"])
+
+    branch_key = sanitize_branch_name("feature/slow")
+    update_branch_state(git_repo, branch_key, timings={"meta": 5, "tags": 500})
+
+    _commit_file(git_repo, "file.py", "feat: slow commit")
+    cmd_on_commit([])
+
+    meta = get_branch_meta(git_repo, branch_key)
+    assert meta["stale"] is True
+    assert "feat: slow commit" in meta["commits"]
+    assert spawned == [git_repo]
+
+    context_file = os.path.join(git_repo, DEFAULT_SYMLINK, "context.md")
+    with open(context_file) as f:
+        assert "feat: slow commit" not in f.read()
+
+    cmd_refresh([])
+
+    assert "stale" not in get_branch_meta(git_repo, branch_key)
+    with open(context_file) as f:
+        assert "feat: slow commit" in f.read()
+
+
+def test_on_commit_over_budget_skips_meta(git_repo, monkeypatch):
+    monkeypatch.setattr(refresh_module, "spawn_background_refresh", lambda _workspace: None)
+
+    _set_hook_budget(git_repo, 100)
+    sync_branch(git_repo, "main")
+    git_checkout(git_repo, "feature/very-slow", create=True)
+    cmd_on_checkout(["main", "feature/very-slow"])
+
+    branch_key = sanitize_branch_name("feature/very-slow")
+    update_branch_state(git_repo, branch_key, timings={"meta": 500, "tags": 5})
+
+    _commit_file(git_repo, "file.py", "feat: skipped")
+    cmd_on_commit([])
+
+    meta = get_branch_meta(git_repo, branch_key)
+    assert meta["stale"] is True
+    assert "feat: skipped" not in meta["commits"]
+
+    cmd_sync([])
+
+    meta = get_branch_meta(git_repo, branch_key)
+    assert "stale" not in meta
+    assert "feat: skipped" in meta["commits"]
+
+
+def test_refresh_ignores_fresh_branch(git_repo, monkeypatch):
+    sync_branch(git_repo, "main")
+    git_checkout(git_repo, "feature/fresh", create=True)
+    cmd_on_checkout(["main", "feature/fresh"])
+
+    calls = []
+    monkeypatch.setattr("branchctx.commands.refresh.refresh_branch_context", lambda *args: calls.append(args))
+
+    assert cmd_refresh([]) == 0
+    assert calls == []
+
+
+def test_refresh_indexes_context_files_once(git_repo, monkeypatch):
+    sync_branch(git_repo, "main")
+    git_checkout(git_repo, "feature/indexed", create=True)
+    _commit_file(git_repo, "file.py", "feat: indexed")
+
+    calls = []
+    index_context_files = context_tags_module.index_context_files
+    monkeypatch.setattr(
+        context_tags_module,
+        "index_context_files",
+        lambda *args: calls.append(args) or index_context_files(*args),
+    )
+
+    cmd_on_commit([])
+
+    assert len(calls) == 1
+    assert "feat: indexed" in get_branch_meta(git_repo, sanitize_branch_name("feature/indexed"))["commits"]
+
+
+def _snapshot_files(root):
+    snapshot = {}
+    for dirpath, _dirs, files in os.walk(root):
+        for name in files:
+            path = os.path.join(dirpath, name)
+            snapshot[path] = os.stat(path).st_mtime_ns
+    return snapshot
+
+
+def test_repeated_sync_writes_nothing(git_repo):
+    sync_branch(git_repo, "main")
+    git_checkout(git_repo, "feature/idle", create=True)
+    _commit_file(git_repo, "file.py", "feat: idle")
+    cmd_sync([])
+
+    branches_dir = get_branches_dir(git_repo)
+    before = _snapshot_files(branches_dir)
+    symlink_target = os.readlink(os.path.join(git_repo, DEFAULT_SYMLINK))
+
+    for _ in range(3):
+        cmd_sync([])
+
+    assert _snapshot_files(branches_dir) == before
+    assert os.readlink(os.path.join(git_repo, DEFAULT_SYMLINK)) == symlink_target
+
+
+def test_identical_syncs_keep_meta_and_state_mtimes(git_repo):
+    git_checkout(git_repo, "feature/idle", create=True)
+    _commit_file(git_repo, "file.py", "feat: idle")
+    cmd_sync([])
+    update_branch_state(git_repo, sanitize_branch_name("feature/idle"), timings={"meta": 5, "tags": 5})
+    branches_dir = get_branches_dir(git_repo)
+    paths = [os.path.join(branches_dir, "meta.json"), os.path.join(branches_dir, "state.json")]
+    cmd_sync([])
+    mtimes = [os.stat(path).st_mtime_ns for path in paths]
+
+    cmd_sync([])
+
+    assert [os.stat(path).st_mtime_ns for path in paths] == mtimes
@@ -1,15 +1,45 @@
 import os
 import subprocess
+import sys
 import tempfile
+from unittest.mock import patch
 
 import pytest
 
-from branchctx.commands._branches import collect_branch_info
+from branchctx.commands._branches import (
+    STREAM_NAME_WIDTH,
+    BranchInfo,
+    TableOptions,
+    collect_branch_info,
+    filter_branch_info,
+    parse_table_options,
+    render_table,
+    stream_table,
+)
 from branchctx.commands.prune import cmd_prune
 from branchctx.commands.status import cmd_status
 from branchctx.core.sync import sync_branch
 from branchctx.data.config import Config, get_branches_dir, get_template_dir
-from branchctx.utils.git import git_add, git_checkout, git_commit, git_config, git_init
+from branchctx.data.meta import load_archived_meta, load_branch_meta
+from branchctx.utils.git import (
+    get_git_call_counts,
+    git_add,
+    git_checkout,
+    git_commit,
+    git_config,
+    git_init,
+    git_list_branches,
+    reset_git_call_counts,
+    run_git,
+)
+from branchctx.utils.pager import write_lines
+
+TABLE = {
+    "main": BranchInfo(context=True, local=True, remote=True, sanitized="main"),
+    "feature/auth": BranchInfo(context=True, local=True, remote=False, sanitized="feature-auth"),
+    "feature/old": BranchInfo(context=True, local=False, remote=False, sanitized="feature-old"),
+    "fix/bug": BranchInfo(context=False, local=True, remote=False, sanitized="fix-bug"),
+}
 
 
 @pytest.fixture
@@ -101,6 +131,29 @@ def test_prune_archives_orphans(git_repo, capsys, monkeypatch):
     assert "feature" in captured.out
 
 
+def test_prune_batches_branch_deletes_and_archives(git_repo, capsys, monkeypatch):
+    sync_branch(git_repo, "main")
+    for name in ("feature/a", "feature/b", "feature/c"):
+        git_checkout(git_repo, name, create=True)
+        sync_branch(git_repo, name)
+        git_checkout(git_repo, "main")
+
+    inputs = iter(["1,2,3", "1,2,3"])
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+
+    reset_git_call_counts()
+    assert cmd_prune([]) == 0
+
+    assert get_git_call_counts().get("branch") == 1
+    assert get_git_call_counts().get("for-each-ref") == 1
+    assert git_list_branches(git_repo) == ["main"]
+    assert list(load_branch_meta(git_repo)) == ["main"]
+    assert sorted(load_archived_meta(git_repo)) == ["feature-a", "feature-b", "feature-c"]
+    output = capsys.readouterr().out
+    assert "Deleting 3 local branch(es)" in output
+    assert "Archiving 3 context(s)" in output
+
+
 def test_prune_excludes_branches_with_remote(git_repo, capsys, monkeypatch):
     sync_branch(git_repo, "main")
 
@@ -151,3 +204,185 @@ def test_collect_branch_info_orphan(git_repo):
     info = collect_branch_info(git_repo)
     orphans = [n for n, i in info.items() if i.context and not i.local]
     assert len(orphans) == 1
+
+
+def test_render_table_groups_and_separators():
+    lines = render_table(TABLE, "feature/auth")
+
+    names = [line.split()[1] if line.startswith("  *") else line.split()[0] for line in lines[2:]]
+    assert names == ["main", "─" * 12, "feature/auth", "─" * 12, "feature/old", "fix/bug"]
+    assert lines[4].startswith("  * feature/auth")
+
+
+def test_render_table_pads_to_longest_name():
+    long_name = "feature/" + "x" * 100
+    lines = render_table({long_name: TABLE["fix/bug"], "main": TABLE["main"]}, None)
+
+    assert lines[1] == "    " + "─" * len(long_name) + "  ───────  ─────  ──────"
+    assert f"    {long_name}     " in "\n".join(lines)
+    assert f"    {'main':<{len(long_name)}}     " in "\n".join(lines)
+
+
+def test_stream_table_lets_long_names_overflow(capsys):
+    long_name = "feature/" + "x" * 100
+
+    stream_table([(long_name, TABLE["fix/bug"]), ("main", TABLE["main"])], None)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[2].startswith(f"    {long_name}     ")
+    assert lines[3].startswith(f"    {'main':<{STREAM_NAME_WIDTH}}     ")
+
+
+@pytest.mark.parametrize(
+    ("options", "expected"),
+    [
+        (TableOptions(), ["main", "feature/auth", "feature/old", "fix/bug"]),
+        (TableOptions(pattern="feature/*"), ["feature/auth", "feature/old"]),
+        (TableOptions(pattern="auth"), ["feature/auth"]),
+        (TableOptions(only="orphans"), ["feature/old"]),
+        (TableOptions(only="no-context"), ["fix/bug"]),
+        (TableOptions(pattern="f*", only="contexts"), ["feature/auth", "feature/old"]),
+    ],
+)
+def test_filter_branch_info(options, expected):
+    assert list(filter_branch_info(TABLE, options)) == expected
+
+
+def test_parse_table_options():
+    assert parse_table_options(["--filter", "f*", "--only", "orphans", "--stream", "--no-pager"]) == (
+        TableOptions(pattern="f*", only="orphans", stream=True, pager=False),
+        None,
+    )
+    assert parse_table_options(["--filter"])[1] == "--filter expects a pattern, e.g. --filter 'feature/*'"
+    assert parse_table_options(["--only", "nope"])[1] == "--only expects one of: orphans, contexts, no-context"
+
+
+def test_stream_table_writes_in_chunks(capsys):
+    items = ((f"feature/{i}", TABLE["fix/bug"]) for i in range(450))
+
+    with patch.object(sys.stdout, "flush", wraps=sys.stdout.flush) as flush:
+        count = stream_table(items, None)
+
+    assert count == 450
+    assert flush.call_count == 3
+    assert len(capsys.readouterr().out.splitlines()) == 452
+
+
+def test_write_lines_uses_pager_when_output_is_long(monkeypatch, capsys):
+    monkeypatch.setenv("PAGER", "cat")
+    monkeypatch.delenv("BCTX_NO_PAGER", raising=False)
+
+    with patch("branchctx.utils.pager.should_page", return_value=True), patch("subprocess.Popen") as popen:
+        popen.return_value.stdin.write.side_effect = BrokenPipeError
+        write_lines(["a", "b"])
+
+    popen.assert_called_once()
+    assert popen.call_args.args[0] == ["cat"]
+    assert capsys.readouterr().out == ""
+
+
+def test_write_lines_skips_pager_when_disabled(monkeypatch, capsys):
+    monkeypatch.setenv("BCTX_NO_PAGER", "1")
+
+    with patch("branchctx.utils.pager.should_page", return_value=True), patch("subprocess.Popen") as popen:
+        write_lines(["a", "b"])
+
+    popen.assert_not_called()
+    assert capsys.readouterr().out == "a\nb\n"
+
+
+def test_status_filter(git_repo, capsys):
+    sync_branch(git_repo, "main")
+    for name in ("feature/a", "feature/b", "fix/c"):
+        run_git(["branch", name], cwd=git_repo, check=True)
+
+    cmd_status(["--filter", "feature/*"])
+
+    output = capsys.readouterr().out
+    assert "(1 contexts, 0 archived, 2 shown)" in output
+    assert "feature/a" in output
+    assert "fix/c" not in output
+
+
+def test_status_stream(git_repo, capsys):
+    sync_branch(git_repo, "main")
+    run_git(["branch", "feature/a"], cwd=git_repo, check=True)
+
+    with patch("branchctx.commands.status.collect_branch_info", side_effect=AssertionError("table was buffered")):
+        cmd_status(["--stream"])
+
+    rows = capsys.readouterr().out.split("Branches:")[1]
+    assert "main" in rows
+    assert "feature/a" in rows
+    assert "1 contexts, 0 archived, 2 shown" in rows
+    assert "no orphan contexts" in rows
+
+
+def test_status_stream_writes_rows_before_classifying_the_rest(git_repo, capsys, monkeypatch):
+    sync_branch(git_repo, "main")
+    written = []
+
+    def rows(_git_root, _refs):
+        yield "feature/old", TABLE["feature/old"]
+        written.append(capsys.readouterr().out)
+        yield "fix/bug", TABLE["fix/bug"]
+
+    monkeypatch.setattr("branchctx.commands._branches.STREAM_CHUNK_ROWS", 1)
+    with patch("branchctx.commands.status.iter_branch_info", rows):
+        cmd_status(["--stream", "--filter", "f*"])
+
+    assert "feature/old" in written[0]
+    output = capsys.readouterr().out
+    assert "fix/bug" in output
+    assert "1 contexts, 0 archived, 2 shown" in output
+    assert "1 orphan contexts" in output
+
+
+def test_prune_stream(git_repo, capsys, monkeypatch):
+    sync_branch(git_repo, "main")
+    git_checkout(git_repo, "feature/gone", create=True)
+    sync_branch(git_repo, "feature/gone")
+    git_checkout(git_repo, "main")
+    subprocess.run(["git", "branch", "-D", "feature/gone"], cwd=git_repo, capture_output=True)
+
+    inputs = iter([""])
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+
+    assert cmd_prune(["--stream"]) == 0
+
+    output = capsys.readouterr().out
+    assert output.index("feature-gone") < output.index("2 shown") < output.index("orphan contexts")
+
+
+def test_prune_stream_nothing_to_prune(git_repo, capsys):
+    sync_branch(git_repo, "main")
+
+    assert cmd_prune(["--stream"]) == 0
+
+    output = capsys.readouterr().out
+    assert "1 shown" in output
+    assert output.rstrip().endswith("Nothing to prune")
+
+
+def test_status_invalid_only(git_repo, capsys):
+    assert cmd_status(["--only", "nope"]) == 1
+    assert "error: --only expects one of" in capsys.readouterr().out
+
+
+def test_prune_only_orphans_skips_branch_deletes(git_repo, capsys, monkeypatch):
+    sync_branch(git_repo, "main")
+    git_checkout(git_repo, "feature/gone", create=True)
+    sync_branch(git_repo, "feature/gone")
+    git_checkout(git_repo, "main")
+    subprocess.run(["git", "branch", "-D", "feature/gone"], cwd=git_repo, capture_output=True)
+    run_git(["branch", "feature/local-only"], cwd=git_repo, check=True)
+
+    inputs = iter(["1"])
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+
+    assert cmd_prune(["--only", "orphans"]) == 0
+
+    output = capsys.readouterr().out
+    assert "Branch contexts (1)" in output
+    assert "local branches" not in output
+    assert "feature/local-only" in git_list_branches(git_repo)
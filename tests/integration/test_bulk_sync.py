@@ -0,0 +1,187 @@
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from branchctx.commands.sync import cmd_sync
+from branchctx.core.bulk import select_branches, sync_all_branches
+from branchctx.data import meta as meta_module
+from branchctx.data.config import get_branches_dir, get_config_dir, get_template_dir
+from branchctx.data.meta import load_branch_meta
+from branchctx.data.state import load_state, read_head_marker
+from branchctx.data.tag_index import load_tag_index
+from branchctx.utils.git import git_add, git_checkout, git_commit, git_config, git_head, git_init, git_list_branch_heads
+
+FEATURES = ["feature/a", "feature/b", "fix/c"]
+
+
+@pytest.fixture
+def git_repo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        git_init(tmpdir, "main")
+        git_config(tmpdir, "user.email", "test@test.com")
+        git_config(tmpdir, "user.name", "Test User")
+
+        with open(os.path.join(tmpdir, "README.md"), "w") as f:
+            f.write("# Test")
+        git_add(tmpdir)
+        git_commit(tmpdir, "init")
+
+        for branch in FEATURES:
+            git_checkout(tmpdir, branch, create=True)
+            filename = branch.replace("/", "_") + ".py"
+            with open(os.path.join(tmpdir, filename), "w") as f:
+                f.write("x = 1")
+            git_add(tmpdir, filename)
+            git_commit(tmpdir, f"feat: {branch}")
+            git_checkout(tmpdir, "main")
+
+        template_dir = get_template_dir(tmpdir)
+        os.makedirs(template_dir)
+        os.makedirs(get_branches_dir(tmpdir))
+
+        with open(os.path.join(get_config_dir(tmpdir), "config.json"), "w") as f:
+            json.dump({"default_base_branch": "main", "sound": False, "template_rules": []}, f)
+
+        with open(os.path.join(template_dir, "context.md"), "w") as f:
+            f.write("# {{branch}}\n<bctx:commits></bctx:commits>\n<bctx:files></bctx:files>")
+
+        original_cwd = os.getcwd()
+        os.chdir(tmpdir)
+        yield tmpdir
+        os.chdir(original_cwd)
+
+
+def _read_context(workspace: str, key: str) -> str:
+    with open(os.path.join(get_branches_dir(workspace), key, "context.md")) as f:
+        return f.read()
+
+
+def test_git_list_branch_heads(git_repo):
+    heads = git_list_branch_heads(git_repo)
+
+    assert sorted(heads) == ["feature/a", "feature/b", "fix/c", "main"]
+    assert heads["main"] == git_head(git_repo)
+    assert all(len(sha) == 40 for sha in heads.values())
+
+
+def test_select_branches():
+    heads = {"main": "1", "feature/a": "2", "feature/b": "3", "fix/c": "4"}
+
+    assert select_branches(heads) == heads
+    assert select_branches(heads, "feature/*") == {"feature/a": "2", "feature/b": "3"}
+    assert select_branches(heads, "nope/*") == {}
+
+
+def test_sync_all_creates_contexts_against_branch_tips(git_repo):
+    result = sync_all_branches(git_repo, max_workers=1)
+
+    assert result.branches == ["feature/a", "feature/b", "fix/c", "main"]
+    assert result.created == result.branches
+    assert result.tag_updates == 8
+
+    content = _read_context(git_repo, "feature-b")
+    assert "# feature/b" in content
+    assert "feat: feature/b" in content
+    assert "feature_b.py" in content
+    assert "feature/a" not in content
+
+    meta = load_branch_meta(git_repo)
+    assert meta["feature-a"]["last_commit"]["message"] == "feat: feature/a"
+    assert meta["feature-a"]["author"] == "Test User"
+    assert meta["main"]["commits"] == ""
+    assert "feature-a" in load_tag_index(git_repo)
+    assert load_state(git_repo) == {}
+
+
+def test_sync_all_does_not_switch_branch(git_repo):
+    sync_all_branches(git_repo, max_workers=1)
+
+    assert git_head(git_repo) == git_list_branch_heads(git_repo)["main"]
+    assert not os.path.lexists(os.path.join(git_repo, "_branch"))
+
+
+def test_sync_all_records_head_markers(git_repo):
+    heads = git_list_branch_heads(git_repo)
+
+    sync_all_branches(git_repo, max_workers=1)
+
+    assert read_head_marker(git_repo, "feature-a") == heads["feature/a"]
+    assert read_head_marker(git_repo, "fix-c") == heads["fix/c"]
+
+
+def test_sync_all_pattern(git_repo):
+    result = sync_all_branches(git_repo, "feature/*", max_workers=1)
+
+    assert result.branches == ["feature/a", "feature/b"]
+    assert sorted(load_branch_meta(git_repo)) == ["feature-a", "feature-b"]
+    assert not os.path.exists(os.path.join(get_branches_dir(git_repo), "fix-c"))
+
+
+def test_sync_all_writes_meta_once(git_repo):
+    with patch.object(meta_module, "_save_meta", wraps=meta_module._save_meta) as save_meta:
+        sync_all_branches(git_repo, max_workers=1)
+
+    assert save_meta.call_count == 1
+
+
+def test_sync_all_second_run_is_noop(git_repo):
+    sync_all_branches(git_repo, max_workers=1)
+
+    with patch.object(meta_module, "_save_meta", wraps=meta_module._save_meta) as save_meta:
+        result = sync_all_branches(git_repo, max_workers=1)
+
+    assert result.created == []
+    assert result.updated == []
+    assert result.tag_updates == 0
+    assert save_meta.call_count == 0
+
+
+def test_sync_all_refreshes_existing_context(git_repo):
+    sync_all_branches(git_repo, max_workers=1)
+    git_checkout(git_repo, "feature/a")
+    with open(os.path.join(git_repo, "more.py"), "w") as f:
+        f.write("y = 2")
+    git_add(git_repo, "more.py")
+    git_commit(git_repo, "feat: more")
+    git_checkout(git_repo, "main")
+
+    result = sync_all_branches(git_repo, max_workers=1)
+
+    assert result.updated == ["feature-a"]
+    assert "feat: more" in _read_context(git_repo, "feature-a")
+
+
+def test_sync_all_process_pool_matches_serial(git_repo):
+    sync_all_branches(git_repo, "feature/*", max_workers=2)
+    pooled = {key: entry["commits"] for key, entry in load_branch_meta(git_repo).items()}
+
+    serial = sync_all_branches(git_repo, max_workers=1)
+
+    assert serial.updated == ["fix-c", "main"]
+    assert pooled == {key: entry["commits"] for key, entry in load_branch_meta(git_repo).items() if key in pooled}
+
+
+def test_cmd_sync_all(git_repo, capsys):
+    assert cmd_sync(["--all", "--pattern", "fix/*"]) == 0
+
+    output = capsys.readouterr().out
+    assert "Branches: 1 (matching 'fix/*')" in output
+    assert "Created:  1" in output
+
+
+def test_cmd_sync_all_no_match(git_repo, capsys):
+    assert cmd_sync(["--all", "--pattern", "nope/*"]) == 0
+    assert "No branches match 'nope/*'" in capsys.readouterr().out
+
+
+def test_cmd_sync_pattern_requires_all(git_repo, capsys):
+    assert cmd_sync(["--pattern", "feature/*"]) == 1
+    assert "error: --pattern requires --all" in capsys.readouterr().out
+
+
+def test_cmd_sync_pattern_missing_value(git_repo, capsys):
+    assert cmd_sync(["--all", "--pattern"]) == 1
+    assert "error: --pattern expects a glob" in capsys.readouterr().out
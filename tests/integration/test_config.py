@@ -1,3 +1,4 @@
+import json
 import os
 import tempfile
 
@@ -6,6 +7,8 @@ import pytest
 from branchctx.constants import BRANCHES_DIR, CONFIG_DIR, DEFAULT_TEMPLATE, TEMPLATES_DIR
 from branchctx.data.config import (
     Config,
+    PrunePolicy,
+    Scope,
     TemplateRule,
     config_exists,
     get_branches_dir,
@@ -97,3 +100,104 @@ def test_config_get_template_for_branch():
     assert config.get_template_for_branch("bugfix/123") == "bugfix"
     assert config.get_template_for_branch("main") == DEFAULT_TEMPLATE
     assert config.get_template_for_branch("develop") == DEFAULT_TEMPLATE
+
+
+def test_config_files_limits(workspace):
+    config = Config(files_max_entries=10, files_max_bytes=2048)
+    config.save(workspace)
+
+    loaded = Config.load(workspace)
+    assert loaded.files_max_entries == 10
+    assert loaded.files_max_bytes == 2048
+
+
+def test_config_files_limits_defaults(workspace):
+    config = Config.load(workspace)
+    assert config.files_max_entries == 500
+    assert config.files_max_bytes == 65536
+
+
+def test_config_commits_options(workspace):
+    config = Config(commits_max_entries=20, commits_group_by="author")
+    config.save(workspace)
+
+    loaded = Config.load(workspace)
+    assert loaded.commits_max_entries == 20
+    assert loaded.commits_group_by == "author"
+
+
+def test_config_scope_save_and_load(workspace):
+    config = Config(
+        scope=Scope(exclude=["**/generated/**"]),
+        template_rules=[
+            TemplateRule(prefix="payments/", template="feature", scope=Scope(include=["services/payments/**"])),
+        ],
+    )
+    config.save(workspace)
+
+    loaded = Config.load(workspace)
+    assert loaded.scope == Scope(exclude=["**/generated/**"])
+    assert loaded.template_rules[0].scope == Scope(include=["services/payments/**"])
+
+
+def test_config_get_pathspecs_for_branch():
+    config = Config(
+        scope=Scope(exclude=["**/generated/**"]),
+        template_rules=[
+            TemplateRule(prefix="payments/", template="feature", scope=Scope(include=["services/payments/**"])),
+            TemplateRule(prefix="fix/", template="fix"),
+        ],
+    )
+
+    assert config.get_pathspecs_for_branch("payments/refund") == [":(glob)services/payments/**"]
+    assert config.get_pathspecs_for_branch("fix/bug") == [":(glob,exclude)**/generated/**"]
+    assert config.get_pathspecs_for_branch("main") == [":(glob,exclude)**/generated/**"]
+
+
+def test_config_get_pathspecs_for_branch_no_scope():
+    config = Config(template_rules=[])
+    assert config.get_pathspecs_for_branch("main") == []
+
+
+def test_config_rename_policy(workspace):
+    config = Config(rename_detection="similarity", rename_limit=50, rename_max_files=100)
+    config.save(workspace)
+
+    loaded = Config.load(workspace)
+    assert loaded.rename_detection == "similarity"
+    assert loaded.rename_limit == 50
+    assert loaded.rename_max_files == 100
+
+
+def test_config_hook_budget(workspace):
+    config = Config(hook_budget_ms=150, hook_background_refresh=False)
+    config.save(workspace)
+
+    loaded = Config.load(workspace)
+    assert loaded.hook_budget_ms == 150
+    assert loaded.hook_background_refresh is False
+
+
+def test_config_prune_policy_defaults():
+    policy = Config().prune_policy
+    assert policy.archive_orphans is True
+    assert policy.archive_after_days == 0
+    assert policy.delete_merged is False
+
+
+def test_config_prune_policy(workspace):
+    config = Config(prune_policy=PrunePolicy(archive_orphans=False, archive_after_days=30, delete_merged=True))
+    config.save(workspace)
+
+    loaded = Config.load(workspace)
+    assert loaded.prune_policy == PrunePolicy(archive_orphans=False, archive_after_days=30, delete_merged=True)
+
+
+def test_config_prune_policy_partial(workspace):
+    with open(os.path.join(get_config_dir(workspace), "config.json"), "w") as f:
+        json.dump({"prune_policy": {"archive_after_days": 14}}, f)
+
+    policy = Config.load(workspace).prune_policy
+    assert policy.archive_after_days == 14
+    assert policy.archive_orphans is True
+    assert policy.delete_merged is False
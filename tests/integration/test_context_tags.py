@@ -3,12 +3,16 @@ import tempfile
 
 import pytest
 
+from branchctx.core import context_tags
 from branchctx.core.context_tags import (
     SYNC_MESSAGE_TEMPLATE,
     TAG_COMMITS,
     TAG_FILES,
     find_context_files,
+    find_tag_spans_in_file,
     find_tags_in_file,
+    get_required_meta_fields,
+    index_context_files,
     update_tag_content,
 )
 
@@ -153,3 +157,136 @@ def test_sync_message_template():
     message = SYNC_MESSAGE_TEMPLATE.format(base_branch="origin/main")
     assert "origin/main" in message
     assert "N/A" in message
+
+
+def test_find_tag_spans_in_file_byte_offsets(temp_dir):
+    file_path = os.path.join(temp_dir, "test.md")
+    content = "# Título\n<bctx:files>x</bctx:files>"
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+    result = find_tag_spans_in_file(file_path)
+    start = len("# Título\n".encode())
+    assert result == [[TAG_FILES, start, start + len("<bctx:files>x</bctx:files>")]]
+
+
+def test_index_context_files_records_tags(temp_dir):
+    with open(os.path.join(temp_dir, "context.md"), "w") as f:
+        f.write("<bctx:commits></bctx:commits>")
+    with open(os.path.join(temp_dir, "notes.md"), "w") as f:
+        f.write("# Notes")
+
+    index, changed = index_context_files(temp_dir)
+
+    assert changed
+    assert index["files"]["context.md"]["tags"][0][0] == TAG_COMMITS
+    assert index["files"]["notes.md"]["tags"] == []
+
+
+def test_index_context_files_reuses_unchanged_entries(temp_dir, monkeypatch):
+    with open(os.path.join(temp_dir, "notes.md"), "w") as f:
+        f.write("# Notes")
+
+    index, _ = index_context_files(temp_dir)
+
+    def fail(_filepath):
+        raise AssertionError("unchanged file was read")
+
+    monkeypatch.setattr(context_tags, "find_tag_spans_in_file", fail)
+    reindexed, changed = index_context_files(temp_dir, index)
+
+    assert not changed
+    assert reindexed == index
+
+
+def test_index_context_files_detects_new_and_modified_files(temp_dir):
+    notes = os.path.join(temp_dir, "notes.md")
+    with open(notes, "w") as f:
+        f.write("# Notes")
+
+    index, _ = index_context_files(temp_dir)
+
+    with open(notes, "w") as f:
+        f.write("# Notes\n<bctx:files></bctx:files>")
+    subdir = os.path.join(temp_dir, "logs")
+    os.makedirs(subdir)
+    with open(os.path.join(subdir, "log.txt"), "w") as f:
+        f.write("<bctx:commits></bctx:commits>")
+
+    reindexed, changed = index_context_files(temp_dir, index)
+
+    assert changed
+    assert reindexed["files"]["notes.md"]["tags"][0][0] == TAG_FILES
+    assert reindexed["files"][os.path.join("logs", "log.txt")]["tags"][0][0] == TAG_COMMITS
+
+
+def test_index_context_files_drops_deleted_files(temp_dir):
+    notes = os.path.join(temp_dir, "notes.md")
+    with open(notes, "w") as f:
+        f.write("# Notes")
+
+    index, _ = index_context_files(temp_dir)
+    os.remove(notes)
+
+    reindexed, changed = index_context_files(temp_dir, index)
+
+    assert changed
+    assert reindexed["files"] == {}
+
+
+def test_index_context_files_sees_file_added_while_listing(temp_dir, monkeypatch):
+    with open(os.path.join(temp_dir, "notes.md"), "w") as f:
+        f.write("# Notes")
+    scandir = os.scandir
+
+    class Listing:
+        def __init__(self, path):
+            with scandir(path) as it:
+                self.entries = iter(list(it))
+            with open(os.path.join(temp_dir, "late.md"), "w") as f:
+                f.write("<bctx:commits></bctx:commits>")
+            mtime_ns = os.stat(temp_dir).st_mtime_ns
+            os.utime(temp_dir, ns=(mtime_ns, mtime_ns + 1_000_000))
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def __iter__(self):
+            return self
+
+        def __next__(self):
+            return next(self.entries)
+
+    monkeypatch.setattr(os, "scandir", Listing)
+    index, _ = index_context_files(temp_dir)
+    monkeypatch.setattr(os, "scandir", scandir)
+
+    assert "late.md" not in index["files"]
+    reindexed, changed = index_context_files(temp_dir, index)
+
+    assert changed
+    assert reindexed["files"]["late.md"]["tags"][0][0] == TAG_COMMITS
+
+
+def test_get_required_meta_fields(temp_dir):
+    context_dir = os.path.join(temp_dir, "ctx")
+    os.makedirs(context_dir)
+    with open(os.path.join(context_dir, "context.md"), "w") as f:
+        f.write("<bctx:commits></bctx:commits>")
+
+    assert get_required_meta_fields(temp_dir, context_dir, "main") == {"commits"}
+
+    with open(os.path.join(context_dir, "files.md"), "w") as f:
+        f.write("<bctx:files></bctx:files>")
+
+    assert get_required_meta_fields(temp_dir, context_dir, "main") == {"commits", "changed_files"}
+
+
+def test_get_required_meta_fields_no_tags(temp_dir):
+    with open(os.path.join(temp_dir, "notes.md"), "w") as f:
+        f.write("# Notes")
+
+    assert get_required_meta_fields(temp_dir, temp_dir, "main") == set()
@@ -0,0 +1,222 @@
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from branchctx.commands.doctor import cmd_doctor
+from branchctx.commands.sync import cmd_sync
+from branchctx.constants import HOOK_POST_CHECKOUT, HOOK_POST_COMMIT
+from branchctx.core.doctor import (
+    META_SIZE_WARN_BYTES,
+    PerfReport,
+    TimingStats,
+    build_recommendations,
+    percentile,
+    run_perf_diagnostics,
+)
+from branchctx.core.hooks import install_hook
+from branchctx.data.config import Config, get_branches_dir, get_config_dir, get_template_dir
+from branchctx.utils.git import git_add, git_checkout, git_commit, git_config, git_init
+from branchctx.utils.profile import is_profiling
+
+
+@pytest.fixture
+def git_repo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        git_init(tmpdir, "main")
+        git_config(tmpdir, "user.email", "test@test.com")
+        git_config(tmpdir, "user.name", "Test User")
+
+        with open(os.path.join(tmpdir, "README.md"), "w") as f:
+            f.write("# Test")
+        git_add(tmpdir)
+        git_commit(tmpdir, "init")
+
+        template_dir = get_template_dir(tmpdir)
+        os.makedirs(template_dir)
+        os.makedirs(get_branches_dir(tmpdir))
+
+        with open(os.path.join(get_config_dir(tmpdir), "config.json"), "w") as f:
+            json.dump({"default_base_branch": "main", "sound": False, "template_rules": []}, f)
+
+        with open(os.path.join(template_dir, "context.md"), "w") as f:
+            f.write("# Context\n<bctx:commits></bctx:commits>\n<bctx:files></bctx:files>")
+
+        git_checkout(tmpdir, "feature", create=True)
+        install_hook(tmpdir, HOOK_POST_CHECKOUT)
+        install_hook(tmpdir, HOOK_POST_COMMIT)
+
+        original_cwd = os.getcwd()
+        os.chdir(tmpdir)
+        yield tmpdir
+        os.chdir(original_cwd)
+
+
+def _snapshot(workspace: str) -> dict[str, bytes]:
+    files = {}
+    for root, _, names in os.walk(os.path.join(workspace, ".bctx")):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, workspace)] = f.read()
+    return files
+
+
+def _report(**overrides) -> PerfReport:
+    values = {
+        "branch": "feature",
+        "runs": 1,
+        "interpreter_ms": 10.0,
+        "import_ms": 10.0,
+        "launcher": True,
+        "shell_fast_path": True,
+        "paths": [TimingStats("on-checkout", 20.0, 25.0, 5)],
+        "phases": [],
+        "meta_bytes": 1000,
+        "meta_contexts": 1,
+        "context_files": 1,
+        "tag_files": 1,
+    }
+    values.update(overrides)
+    return PerfReport(**values)
+
+
+def test_percentile():
+    assert percentile([], 95) == 0.0
+    assert percentile([5.0], 95) == 5.0
+    assert percentile([float(n) for n in range(1, 21)], 95) == 19.0
+    assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+
+
+def test_run_perf_diagnostics_measures_hook_paths(git_repo):
+    cmd_sync([])
+
+    report = run_perf_diagnostics(git_repo, "feature", 2)
+
+    assert [path.name for path in report.paths] == ["on-checkout", "on-commit"]
+    assert all(path.p50_ms > 0 and path.git_calls > 0 for path in report.paths)
+    phase_names = {phase.name for phase in report.phases}
+    assert {"git_root", "config.load", "meta.commits", "meta.changed_files", "tags.find_outdated"} <= phase_names
+    assert report.shell_fast_path is True
+    assert report.launcher is False
+    assert report.meta_contexts == 1
+    assert report.context_files == 1
+    assert report.tag_files == 1
+    assert not is_profiling()
+
+
+def test_run_perf_diagnostics_is_read_only(git_repo):
+    cmd_sync([])
+    with open(os.path.join(git_repo, "file.py"), "w") as f:
+        f.write("x = 1")
+    git_add(git_repo, "file.py")
+    git_commit(git_repo, "feat: pending refresh")
+
+    before = _snapshot(git_repo)
+    symlink = os.readlink(os.path.join(git_repo, "_branch"))
+
+    run_perf_diagnostics(git_repo, "feature", 2)
+
+    assert _snapshot(git_repo) == before
+    assert os.readlink(os.path.join(git_repo, "_branch")) == symlink
+
+
+def test_run_perf_diagnostics_without_context(git_repo):
+    report = run_perf_diagnostics(git_repo, "feature", 1)
+
+    assert report.context_files == 0
+    assert report.meta_contexts == 0
+    assert not os.path.exists(os.path.join(get_branches_dir(git_repo), "feature"))
+
+
+def test_recommendations_empty_for_fast_repo(git_repo):
+    assert build_recommendations(_report(), Config.load(git_repo)) == []
+
+
+def test_recommendations_large_meta(git_repo):
+    recommendations = build_recommendations(_report(meta_bytes=META_SIZE_WARN_BYTES + 1), Config.load(git_repo))
+
+    assert len(recommendations) == 1
+    assert "bctx prune" in recommendations[0]
+
+
+def test_recommendations_startup_and_fast_path(git_repo):
+    report = _report(launcher=False, interpreter_ms=50.0, import_ms=50.0, shell_fast_path=False)
+
+    recommendations = build_recommendations(report, Config.load(git_repo))
+
+    assert any("--fast-launcher" in r for r in recommendations)
+    assert any("no shell fast path" in r for r in recommendations)
+
+
+def test_recommendations_sound_keeps_shell_fast_path(git_repo):
+    config = Config.load(git_repo)
+    config.sound = True
+
+    with patch("branchctx.core.doctor.get_sound_command", return_value=["paplay", "/tmp/x.wav"]):
+        assert build_recommendations(_report(), config) == []
+
+
+def test_recommendations_sound_without_shell_player(git_repo):
+    config = Config.load(git_repo)
+    config.sound = True
+
+    with patch("branchctx.core.doctor.get_sound_command", return_value=["powershell", "-c", "play"]):
+        recommendations = build_recommendations(_report(), config)
+
+    assert recommendations == [
+        '"sound": true plays through powershell, which disables the shell fast path; set "sound": false to skip Python'
+    ]
+
+
+def test_recommendations_slow_phases(git_repo):
+    report = _report(
+        paths=[TimingStats("on-checkout", 400.0, 500.0, 7)],
+        phases=[TimingStats("meta.changed_files", 200.0, 250.0), TimingStats("meta.commits", 150.0, 180.0)],
+    )
+
+    recommendations = build_recommendations(report, Config.load(git_repo))
+
+    assert len(recommendations) == 3
+    assert "changed files take 250ms" in recommendations[0]
+    assert 'narrow "scope"' in recommendations[1]
+    assert "hook_budget_ms" in recommendations[2]
+
+
+def test_cmd_doctor_prints_report(git_repo, capsys):
+    cmd_sync([])
+    capsys.readouterr()
+
+    assert cmd_doctor(["--perf", "--runs", "1"]) == 0
+
+    output = capsys.readouterr().out
+    for section in ("Startup:", "Hook paths:", "Phases:", "Storage:", "Recommendations:"):
+        assert section in output
+    assert "on-checkout" in output
+    assert "on-commit" in output
+
+
+def test_cmd_doctor_requires_perf(git_repo, capsys):
+    assert cmd_doctor([]) == 1
+    assert "usage: bctx doctor --perf" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("runs", [["--runs"], ["--runs", "0"], ["--runs", "many"]])
+def test_cmd_doctor_invalid_runs(git_repo, capsys, runs):
+    assert cmd_doctor(["--perf", *runs]) == 1
+    assert "error: --runs expects a positive integer" in capsys.readouterr().out
+
+
+def test_cmd_doctor_not_initialized(capsys):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        git_init(tmpdir, "main")
+        original_cwd = os.getcwd()
+        os.chdir(tmpdir)
+        try:
+            assert cmd_doctor(["--perf"]) == 1
+        finally:
+            os.chdir(original_cwd)
+
+    assert "not initialized" in capsys.readouterr().out
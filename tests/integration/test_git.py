@@ -1,6 +1,31 @@
 import tempfile
 
-from branchctx.utils.git import git_current_branch, git_init
+from branchctx.utils.git import (
+    _argv_batches,
+    get_git_call_counts,
+    git_add,
+    git_commit,
+    git_config,
+    git_current_branch,
+    git_delete_branches,
+    git_init,
+    git_list_branches,
+    git_ref_snapshot,
+    reset_git_call_counts,
+    run_git,
+)
+
+
+def _repo_with_branches(tmpdir: str, branches: list[str]):
+    git_init(tmpdir, "main")
+    git_config(tmpdir, "user.email", "test@test.com")
+    git_config(tmpdir, "user.name", "Test User")
+    with open(f"{tmpdir}/README.md", "w") as f:
+        f.write("# Test")
+    git_add(tmpdir)
+    git_commit(tmpdir, "init")
+    for branch in branches:
+        run_git(["branch", branch], cwd=tmpdir, check=True)
 
 
 def test_git_current_branch_empty_repo():
@@ -21,3 +46,63 @@ def test_git_current_branch_not_git_repo():
     with tempfile.TemporaryDirectory() as tmpdir:
         branch = git_current_branch(tmpdir)
         assert branch is None
+
+
+def test_git_delete_branches_single_call():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _repo_with_branches(tmpdir, ["feature/a", "feature/b", "fix/c"])
+
+        reset_git_call_counts()
+        deleted = git_delete_branches(tmpdir, ["feature/a", "feature/b", "fix/c"], force=True)
+
+        assert deleted == ["feature/a", "feature/b", "fix/c"]
+        assert get_git_call_counts() == {"branch": 1}
+        assert git_list_branches(tmpdir) == ["main"]
+
+
+def test_git_delete_branches_reports_failures():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _repo_with_branches(tmpdir, ["feature/a", "feature/b"])
+
+        deleted = git_delete_branches(tmpdir, ["feature/a", "main", "feature/b"], force=True)
+
+        assert deleted == ["feature/a", "feature/b"]
+        assert git_list_branches(tmpdir) == ["main"]
+
+
+def test_argv_batches():
+    assert _argv_batches([]) == []
+    assert _argv_batches(["a", "b", "c"]) == [["a", "b", "c"]]
+    assert _argv_batches(["aaaa", "bbbb", "cccc"], budget=10) == [["aaaa", "bbbb"], ["cccc"]]
+    assert _argv_batches(["a" * 20, "b"], budget=10) == [["a" * 20], ["b"]]
+
+
+def test_git_ref_snapshot():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _repo_with_branches(tmpdir, ["feature/a", "heads/b"])
+        head = run_git(["rev-parse", "HEAD"], cwd=tmpdir, check=True).stdout.strip()
+        run_git(["update-ref", "refs/remotes/origin/main", head], cwd=tmpdir, check=True)
+        run_git(["update-ref", "refs/remotes/origin/feature/a", head], cwd=tmpdir, check=True)
+        run_git(["symbolic-ref", "refs/remotes/origin/HEAD", "refs/remotes/origin/main"], cwd=tmpdir, check=True)
+        run_git(["update-ref", "refs/remotes/upstream/other", head], cwd=tmpdir, check=True)
+
+        reset_git_call_counts()
+        refs = git_ref_snapshot(tmpdir)
+
+        assert get_git_call_counts() == {"for-each-ref": 1}
+        assert refs.local == ["feature/a", "heads/b", "main"]
+        assert refs.remote == ["feature/a", "main"]
+        assert refs.current == "main"
+
+
+def test_git_ref_snapshot_detached_head():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _repo_with_branches(tmpdir, ["feature/a"])
+        run_git(["checkout", "--detach"], cwd=tmpdir, check=True)
+
+        assert git_ref_snapshot(tmpdir).current is None
+
+
+def test_git_ref_snapshot_not_git_repo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        assert git_ref_snapshot(tmpdir) == ([], [], None)
@@ -0,0 +1,136 @@
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from branchctx.assets import get_default_config
+from branchctx.commands.on_checkout import cmd_on_checkout
+from branchctx.commands.on_commit import cmd_on_commit
+from branchctx.commands.status import cmd_status
+from branchctx.commands.sync import cmd_sync
+from branchctx.data.config import get_branches_dir, get_config_dir, get_template_dir
+from branchctx.utils.git import (
+    get_git_call_counts,
+    get_git_call_total,
+    git_add,
+    git_checkout,
+    git_commit,
+    git_config,
+    git_init,
+    reset_git_call_counts,
+    run_git,
+)
+
+GIT_CALL_BUDGET = {
+    "on-checkout-existing": 5,
+    "on-checkout-new": 7,
+    "on-commit": 6,
+    "sync": 6,
+    "status": 3,
+}
+
+
+@pytest.fixture
+def git_repo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        git_init(tmpdir, "main")
+        git_config(tmpdir, "user.email", "test@test.com")
+        git_config(tmpdir, "user.name", "Test User")
+
+        with open(os.path.join(tmpdir, "README.md"), "w") as f:
+            f.write("# Test")
+        git_add(tmpdir)
+        git_commit(tmpdir, "init")
+
+        template_dir = get_template_dir(tmpdir)
+        os.makedirs(template_dir)
+        os.makedirs(get_branches_dir(tmpdir))
+
+        with open(os.path.join(get_config_dir(tmpdir), "config.json"), "w") as f:
+            json.dump({"default_base_branch": "main", "sound": False, "template_rules": []}, f)
+
+        with open(os.path.join(template_dir, "context.md"), "w") as f:
+            f.write("# Context\n<bctx:commits></bctx:commits>\n<bctx:files></bctx:files>")
+
+        git_checkout(tmpdir, "feature", create=True)
+
+        original_cwd = os.getcwd()
+        os.chdir(tmpdir)
+        yield tmpdir
+        os.chdir(original_cwd)
+
+
+def _git_calls(command, args) -> int:
+    reset_git_call_counts()
+    command(args)
+    return get_git_call_total()
+
+
+def test_run_git_counts_calls_per_subcommand(git_repo):
+    reset_git_call_counts()
+
+    run_git(["rev-parse", "HEAD"], cwd=git_repo)
+    run_git(["rev-parse", "--show-toplevel"], cwd=git_repo)
+    run_git(["log", "-1"], cwd=git_repo)
+
+    assert get_git_call_counts() == {"rev-parse": 2, "log": 1}
+    assert get_git_call_total() == 3
+
+    reset_git_call_counts()
+    assert get_git_call_counts() == {}
+
+
+def test_on_checkout_existing_branch_budget(git_repo):
+    cmd_sync([])
+
+    assert _git_calls(cmd_on_checkout, ["main", "feature"]) <= GIT_CALL_BUDGET["on-checkout-existing"]
+
+
+@patch("branchctx.core.sync.play_sound")
+def test_on_checkout_existing_branch_budget_with_default_config(mock_play, git_repo):
+    config = {**get_default_config(), "default_base_branch": "main"}
+    assert config["sound"] is True
+    with open(os.path.join(get_config_dir(git_repo), "config.json"), "w") as f:
+        json.dump(config, f)
+    cmd_sync([])
+
+    assert _git_calls(cmd_on_checkout, ["main", "feature"]) <= GIT_CALL_BUDGET["on-checkout-existing"]
+    assert mock_play.call_count == 2
+
+
+def test_on_checkout_after_commit_refreshes(git_repo, capsys):
+    cmd_sync([])
+    with open(os.path.join(git_repo, "file.py"), "w") as f:
+        f.write("x = 1")
+    git_add(git_repo, "file.py")
+    git_commit(git_repo, "feat: moved head")
+
+    calls = _git_calls(cmd_on_checkout, ["main", "feature"])
+
+    assert calls <= GIT_CALL_BUDGET["on-checkout-existing"]
+    with open(os.path.join(git_repo, "_branch", "context.md")) as f:
+        assert "feat: moved head" in f.read()
+
+
+def test_on_checkout_new_branch_budget(git_repo):
+    assert _git_calls(cmd_on_checkout, ["main", "feature"]) <= GIT_CALL_BUDGET["on-checkout-new"]
+
+
+def test_on_commit_budget(git_repo):
+    cmd_sync([])
+
+    assert _git_calls(cmd_on_commit, []) <= GIT_CALL_BUDGET["on-commit"]
+
+
+def test_sync_budget(git_repo):
+    cmd_sync([])
+
+    assert _git_calls(cmd_sync, []) <= GIT_CALL_BUDGET["sync"]
+
+
+def test_status_budget(git_repo):
+    cmd_sync([])
+
+    assert _git_calls(cmd_status, []) <= GIT_CALL_BUDGET["status"]
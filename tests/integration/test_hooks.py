@@ -1,4 +1,5 @@
 import os
+import subprocess
 import tempfile
 from unittest.mock import patch
 
@@ -6,12 +7,17 @@ import pytest
 
 from branchctx.constants import GIT_DIR, HOOK_MARKER, HOOK_POST_CHECKOUT, HOOK_POST_COMMIT
 from branchctx.core.hooks import (
+    _get_append_snippet,
+    _get_hook_template,
     _reset_confirmation_state,
     get_hook_path,
+    get_installed_hooks,
     install_hook,
     is_hook_installed,
     uninstall_hook,
 )
+from branchctx.core.sync import sanitize_branch_name
+from branchctx.utils.git import git_add, git_commit, git_config, git_init, run_git
 
 
 @pytest.fixture
@@ -226,3 +232,91 @@ class TestBothHooks:
 
         assert not is_hook_installed(git_repo, HOOK_POST_CHECKOUT)
         assert is_hook_installed(git_repo, HOOK_POST_COMMIT)
+
+    def test_get_installed_hooks_reads_hooks_path_once(self, git_repo):
+        install_hook(git_repo, HOOK_POST_COMMIT)
+
+        with patch("branchctx.core.hooks.git_hooks_path", return_value=None) as hooks_path:
+            installed = get_installed_hooks(git_repo, (HOOK_POST_CHECKOUT, HOOK_POST_COMMIT))
+
+        assert installed == {HOOK_POST_CHECKOUT: False, HOOK_POST_COMMIT: True}
+        assert list(installed) == [HOOK_POST_CHECKOUT, HOOK_POST_COMMIT]
+        assert hooks_path.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "branch",
+    ["feature/auth", "a\\b", "x:y*z?", 'q"r<s>t|u', "v~w^x@y", "[br]ack", "we/ird]][[", "ok-name_1.2", "ü/ñ"],
+)
+def test_post_checkout_shell_sanitize_matches_python(branch):
+    template = _get_hook_template(HOOK_POST_CHECKOUT).format(marker=HOOK_MARKER, callback="true")
+    key_line = next(line.strip() for line in template.splitlines() if "BCTX_KEY=" in line)
+
+    result = subprocess.run(
+        ["bash", "-c", f'{key_line}; printf "%s" "$BCTX_KEY"'],
+        env={**os.environ, "NEW_BRANCH": branch},
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.stdout == sanitize_branch_name(branch)
+
+
+@pytest.mark.parametrize(
+    "branch",
+    ["feature/auth", "a\\b", "x:y*z?", 'q"r<s>t|u', "v~w^x@y", "[br]ack", "we/ird]][[", "ok-name_1.2", "ü/ñ"],
+)
+def test_appended_post_checkout_sanitize_matches_python_in_sh(branch):
+    snippet = _get_append_snippet(HOOK_POST_CHECKOUT)
+    key_line = next(line.strip() for line in snippet.splitlines() if "BCTX_KEY=" in line)
+
+    result = subprocess.run(
+        ["sh", "-c", f'{key_line}; printf "%s" "$BCTX_KEY"'],
+        env={**os.environ, "NEW_BRANCH": branch},
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == sanitize_branch_name(branch)
+
+
+@patch("branchctx.core.hooks._prompt_yes_no", return_value=True)
+@patch("branchctx.core.hooks.get_callback", return_value="echo callback")
+def test_appended_post_checkout_runs_under_sh(mock_callback, mock_prompt):
+    _reset_confirmation_state()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        git_init(tmpdir, "main")
+        git_config(tmpdir, "user.email", "test@test.com")
+        git_config(tmpdir, "user.name", "Test User")
+        with open(os.path.join(tmpdir, "README.md"), "w") as f:
+            f.write("# Test")
+        git_add(tmpdir)
+        git_commit(tmpdir, "init")
+
+        hook_path = get_hook_path(tmpdir, HOOK_POST_CHECKOUT)
+        with open(hook_path, "w") as f:
+            f.write("#!/bin/sh\necho 'existing hook'\n")
+        os.chmod(hook_path, 0o755)
+        assert install_hook(tmpdir, HOOK_POST_CHECKOUT) == "appended"
+
+        result = run_git(["checkout", "-b", "feature/sh"], cwd=tmpdir)
+        assert result.returncode == 0
+        assert "existing hook" in result.stderr
+        assert "callback main feature/sh" in result.stderr
+        assert "Bad substitution" not in result.stderr
+
+        head = run_git(["rev-parse", "HEAD"], cwd=tmpdir).stdout.strip()
+        os.makedirs(os.path.join(tmpdir, ".bctx", "branches", "feature-sh"))
+        os.makedirs(os.path.join(tmpdir, ".bctx", "branches", ".heads"))
+        with open(os.path.join(tmpdir, ".bctx", "branches", ".heads", "feature-sh"), "w") as f:
+            f.write(f"{head} main {head}\n")
+        with open(os.path.join(tmpdir, ".bctx", "branches", ".heads", ".sound"), "w") as f:
+            f.write("paplay\n/nonexistent.wav\n")
+        run_git(["checkout", "main"], cwd=tmpdir)
+
+        result = run_git(["checkout", "feature/sh"], cwd=tmpdir)
+        assert "Branch: main -> feature/sh (synced)" in result.stderr
+        assert "callback" not in result.stderr
+        assert os.readlink(os.path.join(tmpdir, "_branch")) == ".bctx/branches/feature-sh"
+    _reset_confirmation_state()
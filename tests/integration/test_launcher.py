@@ -0,0 +1,224 @@
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
+from branchctx.commands.init import cmd_init
+from branchctx.commands.uninstall import cmd_uninstall
+from branchctx.constants import HOOK_POST_CHECKOUT, HOOK_POST_COMMIT, LAUNCHER_ARCHIVE, LAUNCHER_FILE
+from branchctx.core.hooks import _reset_confirmation_state, get_hook_path
+from branchctx.core.launcher import (
+    _get_package_dir,
+    build_launcher,
+    get_launcher_archive_path,
+    get_launcher_command,
+    get_launcher_path,
+    get_source_stamp,
+    launcher_exists,
+)
+from branchctx.utils.git import git_add, git_commit, git_config, git_init, run_git
+
+
+@pytest.fixture
+def git_repo():
+    _reset_confirmation_state()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        git_init(tmpdir, "main")
+        git_config(tmpdir, "user.email", "test@test.com")
+        git_config(tmpdir, "user.name", "Test User")
+
+        with open(os.path.join(tmpdir, "README.md"), "w") as f:
+            f.write("# Test")
+        git_add(tmpdir)
+        git_commit(tmpdir, "init")
+
+        with patch("os.getcwd", return_value=tmpdir):
+            yield tmpdir
+    _reset_confirmation_state()
+
+
+def _read_hook(git_repo, hook_type):
+    with open(get_hook_path(git_repo, hook_type)) as f:
+        return f.read()
+
+
+def _median_ms(cmd, cwd, runs=7):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, capture_output=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def _imported_modules(cmd, cwd):
+    result = subprocess.run([cmd[0], "-X", "importtime", *cmd[1:]], cwd=cwd, capture_output=True, text=True)
+    return {line.split("|")[-1].strip() for line in result.stderr.splitlines() if line.startswith("import time:")}
+
+
+def test_build_launcher_contains_bytecode_only(git_repo):
+    launcher = build_launcher(git_repo)
+
+    assert launcher == get_launcher_path(git_repo)
+    with zipfile.ZipFile(get_launcher_archive_path(git_repo)) as zf:
+        names = zf.namelist()
+
+    assert "__main__.py" in names
+    assert "branchctx/cli.pyc" in names
+    assert "branchctx/core/hooks.pyc" in names
+    assert not [n for n in names if n.endswith(".py") and n != "__main__.py"]
+    assert not [n for n in names if n.startswith("branchctx/assets/")]
+
+
+@pytest.mark.parametrize("entry", [get_launcher_path, get_launcher_archive_path])
+def test_launcher_runs_without_site(git_repo, entry):
+    build_launcher(git_repo)
+
+    result = subprocess.run(
+        [sys.executable, "-S", "-E", entry(git_repo), "--help"], cwd=git_repo, capture_output=True, text=True
+    )
+
+    assert result.returncode == 0
+    assert "Git branch context manager" in result.stdout
+
+
+def test_init_fast_launcher_installs_launcher_callbacks(git_repo):
+    assert cmd_init(["--fast-launcher"]) == 0
+
+    assert launcher_exists(git_repo)
+    command = get_launcher_command(get_launcher_path(git_repo))
+    assert f"{command} on-checkout" in _read_hook(git_repo, HOOK_POST_CHECKOUT)
+    assert f"{command} on-commit" in _read_hook(git_repo, HOOK_POST_COMMIT)
+
+
+def test_init_fast_launcher_updates_existing_hooks(git_repo, capsys):
+    cmd_init([])
+    assert "-S -E" not in _read_hook(git_repo, HOOK_POST_COMMIT)
+
+    cmd_init(["--fast-launcher"])
+
+    output = capsys.readouterr().out
+    assert f"Hook updated: {HOOK_POST_CHECKOUT}" in output
+    assert f"Hook updated: {HOOK_POST_COMMIT}" in output
+    assert _read_hook(git_repo, HOOK_POST_COMMIT).count(" on-commit") == 1
+
+
+def test_init_without_flag_keeps_launcher_callbacks(git_repo):
+    cmd_init(["--fast-launcher"])
+    cmd_init([])
+
+    assert "-S -E" in _read_hook(git_repo, HOOK_POST_CHECKOUT)
+
+
+def test_launcher_hook_updates_meta_on_commit(git_repo):
+    cmd_init(["--fast-launcher"])
+
+    with open(os.path.join(git_repo, "file.py"), "w") as f:
+        f.write("x = 1")
+    git_add(git_repo, "file.py")
+    result = git_commit(git_repo, "feat: via launcher")
+
+    assert result.returncode == 0
+    with open(os.path.join(git_repo, ".bctx", "branches", "meta.json")) as f:
+        assert "feat: via launcher" in f.read()
+
+
+def test_uninstall_removes_launcher(git_repo):
+    cmd_init(["--fast-launcher"])
+
+    cmd_uninstall([])
+
+    assert not launcher_exists(git_repo)
+
+
+def test_launcher_skips_site_imports(git_repo):
+    launcher = build_launcher(git_repo)
+
+    python_modules = _imported_modules([sys.executable, "-m", "branchctx.cli", "on-commit"], git_repo)
+    launcher_modules = _imported_modules([sys.executable, "-S", "-E", launcher, "on-commit"], git_repo)
+
+    assert "site" in python_modules
+    assert "site" not in launcher_modules
+    assert "runpy" not in launcher_modules
+    assert len(launcher_modules) < len(python_modules)
+    assert "branchctx.core.launcher" not in launcher_modules
+
+
+def test_launcher_stamp_matches_sources(git_repo):
+    launcher = build_launcher(git_repo)
+    archive_mtime = os.stat(get_launcher_archive_path(git_repo)).st_mtime_ns
+
+    with open(launcher) as f:
+        assert repr(get_source_stamp(_get_package_dir())) in f.read()
+    subprocess.run([sys.executable, "-S", "-E", launcher, "--help"], cwd=git_repo, capture_output=True, check=True)
+
+    assert os.stat(get_launcher_archive_path(git_repo)).st_mtime_ns == archive_mtime
+
+
+def test_launcher_rebuilds_on_source_mismatch(git_repo):
+    with patch("branchctx.core.launcher.get_source_stamp", return_value=[0, 0]):
+        launcher = build_launcher(git_repo)
+
+    result = subprocess.run(
+        [sys.executable, "-S", "-E", launcher, "--help"], cwd=git_repo, capture_output=True, text=True
+    )
+
+    assert result.returncode == 0
+    assert "Git branch context manager" in result.stdout
+    with open(launcher) as f:
+        content = f.read()
+    assert "[0, 0]" not in content
+    assert repr(get_source_stamp(_get_package_dir())) in content
+
+
+def test_launcher_stamp_is_one_stat(git_repo):
+    launcher = build_launcher(git_repo)
+
+    with open(launcher) as f:
+        content = f.read()
+    assert "os.walk" not in content
+    assert content.count("os.stat(") == 1
+    assert get_source_stamp(_get_package_dir()) == [
+        sys.hexversion,
+        os.stat(os.path.join(_get_package_dir(), "__init__.py")).st_mtime_ns,
+    ]
+
+
+def test_launcher_follows_core_hooks_path(git_repo):
+    git_config(git_repo, "core.hooksPath", ".githooks")
+
+    launcher = build_launcher(git_repo)
+
+    assert launcher == os.path.join(git_repo, ".githooks", LAUNCHER_FILE)
+    assert os.path.exists(os.path.join(git_repo, ".githooks", LAUNCHER_ARCHIVE))
+
+
+def test_launcher_in_worktree_uses_common_hooks_dir(git_repo):
+    with tempfile.TemporaryDirectory() as parent:
+        worktree = os.path.join(parent, "wt")
+        assert run_git(["worktree", "add", "-b", "wt", worktree], cwd=git_repo).returncode == 0
+
+        launcher = build_launcher(worktree)
+
+        assert os.path.samefile(os.path.dirname(launcher), os.path.join(git_repo, ".git", "hooks"))
+        assert launcher_exists(worktree)
+        result = subprocess.run([sys.executable, "-S", "-E", launcher, "--help"], cwd=worktree, capture_output=True)
+        assert result.returncode == 0
+
+
+@pytest.mark.skipif(shutil.which("bctx") is None, reason="bctx console script not installed")
+def test_launcher_benchmark_against_console_script(git_repo):
+    launcher = build_launcher(git_repo)
+
+    wrapper_ms = _median_ms([shutil.which("bctx"), "--help"], git_repo)
+    launcher_ms = _median_ms([sys.executable, "-S", "-E", launcher, "--help"], git_repo)
+
+    print(f"console script: {wrapper_ms:.1f}ms, launcher: {launcher_ms:.1f}ms")
+    assert launcher_ms < wrapper_ms * 1.2
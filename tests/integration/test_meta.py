@@ -1,20 +1,28 @@
 import os
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
 from branchctx.core.sync import sanitize_branch_name, sync_branch
-from branchctx.data.config import Config, get_branches_dir, get_template_dir
+from branchctx.data import meta as meta_module
+from branchctx.data.config import Config, Scope, get_branches_dir, get_template_dir
 from branchctx.data.meta import (
+    _format_count,
     _get_changed_files,
+    _get_commits_since_base,
     archive_branch_meta,
     create_branch_meta,
     delete_branch_meta,
     get_branch_meta,
     load_archived_meta,
     load_branch_meta,
+    set_branch_stale,
+    set_branch_tags_digest,
     update_branch_meta,
 )
+from branchctx.data.state import load_state, read_head_marker, update_branch_state, write_head_marker
+from branchctx.data.tag_index import load_tag_index, save_branch_tag_index
 from branchctx.utils.git import git_add, git_checkout, git_commit, git_config, git_init
 
 
@@ -94,6 +102,107 @@ def test_update_branch_meta(git_repo):
     assert "new_file.py" in meta["changed_files"]
 
 
+def test_update_branch_meta_skips_unchanged_content(git_repo):
+    sync_branch(git_repo, "main")
+    branch_key = sanitize_branch_name("main")
+
+    assert update_branch_meta(git_repo, branch_key, "main") is True
+    meta_path = os.path.join(get_branches_dir(git_repo), "meta.json")
+    mtime_ns = os.stat(meta_path).st_mtime_ns
+    updated_at = get_branch_meta(git_repo, branch_key)["updated_at"]
+
+    assert update_branch_meta(git_repo, branch_key, "main") is False
+
+    assert os.stat(meta_path).st_mtime_ns == mtime_ns
+    assert get_branch_meta(git_repo, branch_key)["updated_at"] == updated_at
+    assert not os.path.exists(os.path.join(get_branches_dir(git_repo), "state.json"))
+
+
+def test_update_branch_meta_writes_when_stale_cleared(git_repo):
+    sync_branch(git_repo, "main")
+    branch_key = sanitize_branch_name("main")
+    update_branch_meta(git_repo, branch_key, "main")
+    set_branch_stale(git_repo, branch_key, True)
+
+    assert update_branch_meta(git_repo, branch_key, "main") is True
+    assert "stale" not in get_branch_meta(git_repo, branch_key)
+
+
+def test_update_branch_meta_only_requested_fields(git_repo, monkeypatch):
+    sync_branch(git_repo, "main")
+    git_checkout(git_repo, "feature/test", create=True)
+
+    branch_key = sanitize_branch_name("feature/test")
+    create_branch_meta(git_repo, branch_key, "feature/test")
+
+    with open(os.path.join(git_repo, "new_file.py"), "w") as f:
+        f.write("print('hello')")
+    git_add(git_repo)
+    git_commit(git_repo, "feat: add new file")
+
+    def fail(_workspace, _base_branch, _config, _pathspecs):
+        raise AssertionError("changed_files provider was run")
+
+    monkeypatch.setitem(meta_module.META_PROVIDERS, "changed_files", fail)
+    update_branch_meta(git_repo, branch_key, "main", {"commits"})
+
+    meta = get_branch_meta(git_repo, branch_key)
+    assert "feat: add new file" in meta["commits"]
+    assert meta["changed_files"] == ""
+    assert meta["last_commit"]["message"] == "feat: add new file"
+
+
+def test_update_branch_meta_keeps_concurrent_writes(git_repo, monkeypatch):
+    sync_branch(git_repo, "main")
+    git_checkout(git_repo, "feature/test", create=True)
+    branch_key = sanitize_branch_name("feature/test")
+    create_branch_meta(git_repo, branch_key, "feature/test")
+    get_commits = meta_module.META_PROVIDERS["commits"]
+
+    def slow_commits(workspace, *args):
+        create_branch_meta(workspace, "feature-other", "feature/other")
+        set_branch_tags_digest(workspace, branch_key, "digest")
+        return get_commits(workspace, *args)
+
+    with open(os.path.join(git_repo, "new_file.py"), "w") as f:
+        f.write("print('hello')")
+    git_add(git_repo)
+    git_commit(git_repo, "feat: add new file")
+    monkeypatch.setitem(meta_module.META_PROVIDERS, "commits", slow_commits)
+
+    assert update_branch_meta(git_repo, branch_key, "main") is True
+
+    meta = load_branch_meta(git_repo)
+    assert "feature-other" in meta
+    assert meta[branch_key]["tags_digest"] == "digest"
+    assert "feat: add new file" in meta[branch_key]["commits"]
+
+
+def test_update_branch_meta_does_not_restore_archived_entry(git_repo, monkeypatch):
+    branch_key = "feature-old"
+    create_branch_meta(git_repo, branch_key, "feature/old")
+
+    def archive_during_update(workspace, *args):
+        archive_branch_meta(workspace, branch_key)
+        return ""
+
+    monkeypatch.setitem(meta_module.META_PROVIDERS, "commits", archive_during_update)
+
+    assert update_branch_meta(git_repo, branch_key, "main") is False
+    assert get_branch_meta(git_repo, branch_key) is None
+    assert branch_key in load_archived_meta(git_repo)
+
+
+def test_update_branch_state_concurrent_writers(git_repo):
+    keys = [f"branch-{i}" for i in range(20)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda key: update_branch_state(git_repo, key, checked_at=key), keys))
+
+    assert {key: value["checked_at"] for key, value in load_state(git_repo).items()} == {key: key for key in keys}
+    assert not [name for name in os.listdir(get_branches_dir(git_repo)) if name.endswith(".tmp")]
+
+
 def test_archive_branch_meta(git_repo):
     branch_key = "feature-old"
     create_branch_meta(git_repo, branch_key, "feature/old")
@@ -107,6 +216,36 @@ def test_archive_branch_meta(git_repo):
     assert archived[branch_key]["branch"] == "feature/old"
 
 
+def _add_sidecars(workspace: str, branch_key: str):
+    save_branch_tag_index(workspace, branch_key, {"dirs": {}, "files": {}})
+    update_branch_state(workspace, branch_key, checked_at="now")
+    write_head_marker(workspace, branch_key, "abc", "main", None)
+
+
+def test_archive_branch_meta_prunes_sidecars(git_repo):
+    for branch_key in ("feature-old", "feature-kept"):
+        create_branch_meta(git_repo, branch_key, branch_key)
+        _add_sidecars(git_repo, branch_key)
+
+    archive_branch_meta(git_repo, "feature-old")
+
+    assert list(load_tag_index(git_repo)) == ["feature-kept"]
+    assert list(load_state(git_repo)) == ["feature-kept"]
+    assert read_head_marker(git_repo, "feature-old") is None
+    assert read_head_marker(git_repo, "feature-kept") == "abc"
+
+
+def test_delete_branch_meta_prunes_sidecars(git_repo):
+    create_branch_meta(git_repo, "feature-temp", "feature/temp")
+    _add_sidecars(git_repo, "feature-temp")
+
+    delete_branch_meta(git_repo, "feature-temp")
+
+    assert load_tag_index(git_repo) == {}
+    assert load_state(git_repo) == {}
+    assert read_head_marker(git_repo, "feature-temp") is None
+
+
 def test_delete_branch_meta(git_repo):
     branch_key = "feature-temp"
     create_branch_meta(git_repo, branch_key, "feature/temp")
@@ -219,3 +358,210 @@ def test_get_changed_files_rename_alignment(git_repo):
 
     paren_positions = [line.index("(") for line in lines]
     assert len(set(paren_positions)) == 1
+
+
+def _commit_many_files(git_repo: str, count: int):
+    git_checkout(git_repo, "feature/many", create=True)
+    for i in range(count):
+        with open(os.path.join(git_repo, f"file_{i:03d}.py"), "w") as f:
+            f.write("a\nb\n")
+    git_add(git_repo, "file_*.py")
+    git_commit(git_repo, "add many files")
+
+
+def test_get_changed_files_max_entries(git_repo):
+    _commit_many_files(git_repo, 10)
+
+    result = _get_changed_files(git_repo, "main", Config(files_max_entries=3, files_max_bytes=0))
+    lines = result.split("\n")
+
+    assert len(lines) == 4
+    assert lines[0].startswith("A  file_000.py")
+    assert lines[-1] == "... and 7 more, +14/-0"
+
+
+def test_get_changed_files_max_bytes(git_repo):
+    _commit_many_files(git_repo, 10)
+
+    result = _get_changed_files(git_repo, "main", Config(files_max_entries=0, files_max_bytes=100))
+    lines = result.split("\n")
+
+    assert len("\n".join(lines[:-1]).encode()) <= 100
+    assert lines[-1].startswith("... and ")
+    assert len(lines) - 1 + int(lines[-1].split()[2]) == 10
+
+
+def test_get_changed_files_unlimited(git_repo):
+    _commit_many_files(git_repo, 10)
+
+    result = _get_changed_files(git_repo, "main", Config(files_max_entries=0, files_max_bytes=0))
+
+    assert len(result.split("\n")) == 10
+    assert "more" not in result
+
+
+def test_get_changed_files_invalid_base(git_repo):
+    assert _get_changed_files(git_repo, "does-not-exist") == ""
+
+
+def test_format_count():
+    assert _format_count(900) == "900"
+    assert _format_count(900_000) == "900k"
+    assert _format_count(1_234_567) == "1.2M"
+    assert _format_count(1_500) == "1.5k"
+
+
+def _commit_many(git_repo: str, count: int):
+    git_checkout(git_repo, "feature/long", create=True)
+    for i in range(count):
+        with open(os.path.join(git_repo, "counter.txt"), "w") as f:
+            f.write(str(i))
+        git_add(git_repo, "counter.txt")
+        git_commit(git_repo, f"commit {i}")
+
+
+def test_get_commits_since_base_max_entries(git_repo):
+    _commit_many(git_repo, 5)
+
+    result = _get_commits_since_base(git_repo, "main", Config(commits_max_entries=2))
+    lines = result.split("\n")
+
+    assert len(lines) == 3
+    assert "commit 4" in lines[0]
+    assert "commit 3" in lines[1]
+    assert lines[2] == "... and 3 more commits"
+
+
+def test_get_commits_since_base_exact_cap_has_no_footer(git_repo):
+    _commit_many(git_repo, 2)
+
+    result = _get_commits_since_base(git_repo, "main", Config(commits_max_entries=2))
+
+    assert len(result.split("\n")) == 2
+    assert "more" not in result
+
+
+def test_get_commits_since_base_group_by_author(git_repo):
+    _commit_many(git_repo, 3)
+
+    result = _get_commits_since_base(git_repo, "main", Config(commits_group_by="author"))
+
+    assert result == "Test User  (3 commits)"
+
+
+def test_get_commits_since_base_group_by_day(git_repo):
+    _commit_many(git_repo, 1)
+
+    result = _get_commits_since_base(git_repo, "main", Config(commits_group_by="day"))
+
+    day, count = result.split("  ")
+    assert len(day) == len("YYYY-MM-DD")
+    assert count == "(1 commit)"
+
+
+def _commit_scoped_files(git_repo: str):
+    git_checkout(git_repo, "payments/refund", create=True)
+    os.makedirs(os.path.join(git_repo, "services", "payments"))
+    os.makedirs(os.path.join(git_repo, "codegen"))
+    with open(os.path.join(git_repo, "services", "payments", "refund.py"), "w") as f:
+        f.write("refund = True")
+    git_add(git_repo, "services")
+    git_commit(git_repo, "feat: refunds")
+    with open(os.path.join(git_repo, "codegen", "client.py"), "w") as f:
+        f.write("client = True")
+    git_add(git_repo, "codegen")
+    git_commit(git_repo, "chore: regenerate client")
+
+
+def test_get_changed_files_with_pathspecs(git_repo):
+    _commit_scoped_files(git_repo)
+
+    pathspecs = Scope(include=["services/payments/**"]).to_pathspecs()
+    result = _get_changed_files(git_repo, "main", pathspecs=pathspecs)
+
+    assert "refund.py" in result
+    assert "client.py" not in result
+
+
+def test_get_commits_since_base_with_exclude_pathspec(git_repo):
+    _commit_scoped_files(git_repo)
+
+    pathspecs = Scope(exclude=["codegen/**"]).to_pathspecs()
+    result = _get_commits_since_base(git_repo, "main", pathspecs=pathspecs)
+
+    assert "feat: refunds" in result
+    assert "regenerate client" not in result
+
+
+def test_update_branch_meta_uses_branch_scope(git_repo):
+    Config(scope=Scope(include=["services/**"])).save(git_repo)
+    _commit_scoped_files(git_repo)
+
+    branch_key = sanitize_branch_name("payments/refund")
+    create_branch_meta(git_repo, branch_key, "payments/refund")
+    update_branch_meta(git_repo, branch_key, "main")
+
+    meta = get_branch_meta(git_repo, branch_key)
+    assert "refund.py" in meta["changed_files"]
+    assert "client.py" not in meta["changed_files"]
+    assert "regenerate client" not in meta["commits"]
+
+
+def _commit_partial_rename(git_repo: str):
+    with open(os.path.join(git_repo, "original.py"), "w") as f:
+        f.write("a\nb\nc\nd\ne\n")
+    git_add(git_repo, "original.py")
+    git_commit(git_repo, "add original to main")
+
+    git_checkout(git_repo, "feature/partial-rename", create=True)
+    os.rename(os.path.join(git_repo, "original.py"), os.path.join(git_repo, "renamed.py"))
+    with open(os.path.join(git_repo, "renamed.py"), "w") as f:
+        f.write("a\nb\nc\nd\nchanged\n")
+    with open(os.path.join(git_repo, "other.py"), "w") as f:
+        f.write("other")
+    git_add(git_repo, "*.py")
+    git_commit(git_repo, "rename with edits")
+
+
+def test_get_changed_files_rename_exact(git_repo):
+    _commit_partial_rename(git_repo)
+
+    result = _get_changed_files(git_repo, "main", Config(rename_detection="exact"))
+
+    assert "D  original.py" in result
+    assert "A  renamed.py" in result
+
+
+def test_get_changed_files_rename_similarity(git_repo):
+    _commit_partial_rename(git_repo)
+
+    result = _get_changed_files(git_repo, "main", Config(rename_detection="similarity"))
+
+    assert "R  renamed.py  <-  original.py" in result
+
+
+def test_get_changed_files_rename_similarity_downgrades_on_large_diff(git_repo):
+    _commit_partial_rename(git_repo)
+
+    config = Config(rename_detection="similarity", rename_max_files=2)
+    result = _get_changed_files(git_repo, "main", config)
+
+    assert "<-" not in result
+    assert "D  original.py" in result
+
+
+def test_get_changed_files_rename_off(git_repo):
+    with open(os.path.join(git_repo, "original.py"), "w") as f:
+        f.write("content")
+    git_add(git_repo, "original.py")
+    git_commit(git_repo, "add original to main")
+
+    git_checkout(git_repo, "feature/rename-off", create=True)
+    os.rename(os.path.join(git_repo, "original.py"), os.path.join(git_repo, "renamed.py"))
+    git_add(git_repo, "*.py")
+    git_commit(git_repo, "rename")
+
+    result = _get_changed_files(git_repo, "main", Config(rename_detection="off"))
+
+    assert "D  original.py" in result
+    assert "A  renamed.py" in result
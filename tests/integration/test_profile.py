@@ -0,0 +1,225 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from branchctx import cli
+from branchctx.constants import PROFILE_ENV
+from branchctx.data.config import get_branches_dir, get_config_dir, get_template_dir
+from branchctx.utils.git import git_add, git_checkout, git_commit, git_config, git_init, run_git
+from branchctx.utils.profile import (
+    finish_profile,
+    get_profile_log_path,
+    get_trace_dir,
+    is_profiling,
+    profiled,
+    resolve_sink,
+    span,
+    start_profile,
+    to_chrome_trace,
+)
+
+
+@pytest.fixture
+def git_repo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        git_init(tmpdir, "main")
+        git_config(tmpdir, "user.email", "test@test.com")
+        git_config(tmpdir, "user.name", "Test User")
+
+        with open(os.path.join(tmpdir, "README.md"), "w") as f:
+            f.write("# Test")
+        git_add(tmpdir)
+        git_commit(tmpdir, "init")
+
+        template_dir = get_template_dir(tmpdir)
+        os.makedirs(template_dir)
+        os.makedirs(get_branches_dir(tmpdir))
+
+        with open(os.path.join(get_config_dir(tmpdir), "config.json"), "w") as f:
+            json.dump({"default_base_branch": "main", "sound": False, "template_rules": []}, f)
+
+        with open(os.path.join(template_dir, "context.md"), "w") as f:
+            f.write("# Context\n<bctx:commits></bctx:commits>")
+
+        git_checkout(tmpdir, "feature", create=True)
+
+        original_cwd = os.getcwd()
+        os.chdir(tmpdir)
+        yield tmpdir
+        os.chdir(original_cwd)
+
+
+def _run_cli(argv: list[str]) -> int:
+    with patch.object(sys, "argv", ["bctx", *argv]):
+        with pytest.raises(SystemExit) as exc_info:
+            cli.main()
+    return exc_info.value.code
+
+
+def _parse_lines(text: str) -> list[dict]:
+    return [json.loads(line) for line in text.splitlines() if line.startswith("{")]
+
+
+def test_spans_are_noops_without_profile():
+    @profiled("noop")
+    def work():
+        return 42
+
+    with span("outer"):
+        assert work() == 42
+
+    assert not is_profiling()
+    assert finish_profile() == []
+
+
+@pytest.mark.parametrize(
+    "env_value, flag, expected",
+    [("", False, None), ("0", False, None), ("1", False, "stderr"), ("log", False, "log"), ("", True, "stderr")],
+)
+def test_resolve_sink(monkeypatch, env_value, flag, expected):
+    monkeypatch.setenv(PROFILE_ENV, env_value)
+
+    assert resolve_sink(flag) == expected
+
+
+def test_spans_nest_and_record_git_calls(git_repo, capsys):
+    @profiled("inner")
+    def work():
+        return run_git(["rev-parse", "HEAD"], cwd=git_repo)
+
+    start_profile("test", "stderr")
+    with span("outer"):
+        work()
+    records = finish_profile(0)
+
+    by_name = {r["name"]: r for r in records if r["type"] != "summary"}
+    assert by_name["outer"]["depth"] == 0
+    assert by_name["inner"]["depth"] == 1
+    assert by_name["rev-parse"]["type"] == "git"
+    assert by_name["rev-parse"]["argv"] == ["git", "rev-parse", "HEAD"]
+    assert by_name["rev-parse"]["rc"] == 0
+    assert records[-1]["type"] == "summary"
+    assert records[-1]["git_calls"] == 1
+    assert _parse_lines(capsys.readouterr().err) == records
+
+
+def test_failed_git_call_records_return_code(git_repo):
+    start_profile("test", "stderr")
+    with pytest.raises(subprocess.CalledProcessError):
+        run_git(["rev-parse", "missing-ref"], cwd=git_repo, check=True)
+    records = finish_profile(1)
+
+    assert records[0]["rc"] != 0
+    assert records[-1]["exit_code"] == 1
+
+
+def test_profile_flag_reports_sync_phases(git_repo, capsys):
+    assert _run_cli(["sync", "--profile"]) == 0
+
+    captured = capsys.readouterr()
+    assert "Branch:" in captured.out
+    records = _parse_lines(captured.err)
+    names = {r["name"] for r in records if r["type"] == "phase"}
+    assert {
+        "git_root",
+        "config.load",
+        "sync.sync_branch",
+        "sync.create_branch_context",
+        "sync.update_symlink",
+        "meta.update_branch_meta",
+        "meta.commits",
+        "tags.update_context_tags",
+    } <= names
+    git_records = [r for r in records if r["type"] == "git"]
+    summary = records[-1]
+    assert summary["type"] == "summary"
+    assert summary["command"] == "sync"
+    assert summary["exit_code"] == 0
+    assert summary["git_calls"] == len(git_records) > 0
+
+
+def test_profile_disabled_writes_nothing(git_repo, capsys, monkeypatch):
+    monkeypatch.delenv(PROFILE_ENV, raising=False)
+
+    assert _run_cli(["sync"]) == 0
+
+    assert capsys.readouterr().err == ""
+    assert not os.path.exists(get_profile_log_path(git_repo))
+
+
+def test_profile_env_log_appends_to_workspace_log(git_repo, capsys, monkeypatch):
+    monkeypatch.setenv(PROFILE_ENV, "log")
+
+    _run_cli(["sync"])
+    _run_cli(["sync"])
+
+    assert capsys.readouterr().err == ""
+    with open(get_profile_log_path(git_repo)) as f:
+        records = [json.loads(line) for line in f]
+    summaries = [r for r in records if r["type"] == "summary"]
+    assert len(summaries) == 2
+    assert summaries[0]["repo"] == os.path.basename(git_repo)
+
+
+def _load_trace(git_repo):
+    trace_files = os.listdir(get_trace_dir(git_repo))
+    assert len(trace_files) == 1
+    with open(os.path.join(get_trace_dir(git_repo), trace_files[0])) as f:
+        return trace_files[0], json.load(f)
+
+
+def test_trace_flag_writes_chrome_trace(git_repo, capsys):
+    assert _run_cli(["sync", "--trace"]) == 0
+
+    assert "Trace written:" in capsys.readouterr().err
+    name, trace = _load_trace(git_repo)
+    assert name.startswith("sync-")
+    spans = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    by_name = {e["name"]: e for e in spans}
+    assert {"sync.sync_branch", "meta.update_branch_meta", "tags.update_context_tags"} <= set(by_name)
+    assert any(e["cat"] == "git" and e["name"].startswith("git log") for e in spans)
+    assert {"process_name", "thread_name"} <= {e["name"] for e in trace["traceEvents"] if e["ph"] == "M"}
+
+    parent, child = by_name["refresh.refresh_branch_context"], by_name["meta.update_branch_meta"]
+    assert parent["ts"] <= child["ts"]
+    assert child["ts"] + child["dur"] <= parent["ts"] + parent["dur"]
+
+
+def test_trace_env_covers_hook_runs(git_repo, monkeypatch):
+    monkeypatch.setenv(PROFILE_ENV, "trace")
+
+    _run_cli(["on-checkout", "main", "feature"])
+
+    name, trace = _load_trace(git_repo)
+    assert name.startswith("on-checkout-")
+    assert any(e.get("cat") == "git" for e in trace["traceEvents"])
+
+
+def test_chrome_trace_keeps_concurrent_spans_on_separate_threads():
+    barrier = threading.Barrier(2)
+
+    @profiled("worker")
+    def work():
+        barrier.wait()
+
+    start_profile("test", "stderr")
+    threads = [threading.Thread(target=work) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with patch.object(sys, "stderr"):
+        trace = to_chrome_trace(finish_profile(0))
+
+    workers = [e for e in trace["traceEvents"] if e["name"] == "worker"]
+    assert len({e["tid"] for e in workers}) == 2
+    first, second = sorted(workers, key=lambda e: e["ts"])
+    assert second["ts"] < first["ts"] + first["dur"]
+    thread_names = {e["args"]["name"] for e in trace["traceEvents"] if e["name"] == "thread_name"}
+    assert len(thread_names) == 2
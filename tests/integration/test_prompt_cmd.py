@@ -0,0 +1,273 @@
+import json
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+import pytest
+
+from branchctx.commands.prompt import cmd_prompt
+from branchctx.constants import HOOK_POST_CHECKOUT, HOOK_POST_COMMIT
+from branchctx.core import prompt as prompt_module
+from branchctx.core.hooks import install_hook
+from branchctx.core.prompt import (
+    PENDING_TTL_SECONDS,
+    find_repo,
+    format_prompt,
+    get_common_dir,
+    read_head,
+    read_prompt_cache,
+    write_prompt_cache,
+)
+from branchctx.core.sync import sync_branch
+from branchctx.data.config import get_branches_dir, get_config_dir, get_template_dir
+from branchctx.utils.git import (
+    get_git_call_total,
+    git_add,
+    git_checkout,
+    git_commit,
+    git_config,
+    git_init,
+    reset_git_call_counts,
+    run_git,
+)
+
+
+def _commit_file(workspace: str, name: str):
+    with open(os.path.join(workspace, name), "w") as f:
+        f.write(name)
+    git_add(workspace, name)
+    git_commit(workspace, f"add {name}")
+
+
+@pytest.fixture
+def git_repo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        git_init(tmpdir, "main")
+        git_config(tmpdir, "user.email", "test@test.com")
+        git_config(tmpdir, "user.name", "Test User")
+        _commit_file(tmpdir, "README.md")
+
+        os.makedirs(get_template_dir(tmpdir))
+        os.makedirs(get_branches_dir(tmpdir))
+        with open(os.path.join(get_config_dir(tmpdir), "config.json"), "w") as f:
+            json.dump({"default_base_branch": "main", "sound": False, "template_rules": []}, f)
+        with open(os.path.join(get_template_dir(tmpdir), "context.md"), "w") as f:
+            f.write("# Context")
+
+        git_checkout(tmpdir, "feature/prompt", create=True)
+        _commit_file(tmpdir, "a.py")
+        _commit_file(tmpdir, "b.py")
+        sync_branch(tmpdir, "feature/prompt")
+
+        original_cwd = os.getcwd()
+        os.chdir(tmpdir)
+        with patch.object(prompt_module, "spawn_prompt_refresh") as spawn:
+            yield tmpdir, spawn
+        os.chdir(original_cwd)
+
+
+def _prompt_json(capsys, *args: str) -> dict:
+    assert cmd_prompt(["--json", *args]) == 0
+    return json.loads(capsys.readouterr().out)
+
+
+def test_find_repo_and_read_head(git_repo):
+    workspace, _ = git_repo
+    nested = os.path.join(workspace, "src", "pkg")
+    os.makedirs(nested)
+
+    root, git_dir = find_repo(nested)
+
+    assert os.path.realpath(root) == os.path.realpath(workspace)
+    assert read_head(git_dir) == "feature/prompt"
+
+
+def test_prompt_miss_returns_fast_status_and_spawns_refresh(git_repo, capsys):
+    _, spawn = git_repo
+
+    status = _prompt_json(capsys)
+
+    assert status == {
+        "branch": "feature/prompt",
+        "context": "feature-prompt",
+        "context_exists": True,
+        "symlink_ok": True,
+        "pending": True,
+    }
+    assert spawn.call_count == 1
+
+
+def test_prompt_pending_cache_does_not_respawn(git_repo, capsys):
+    _, spawn = git_repo
+
+    _prompt_json(capsys)
+    _prompt_json(capsys)
+
+    assert spawn.call_count == 1
+
+
+def test_prompt_expired_pending_respawns(git_repo, capsys):
+    workspace, spawn = git_repo
+    _prompt_json(capsys)
+    cache = read_prompt_cache(workspace)
+    write_prompt_cache(workspace, cache["key"], cache["status"], pending_at=time.time() - PENDING_TTL_SECONDS)
+
+    assert _prompt_json(capsys)["pending"] is True
+
+    assert spawn.call_count == 2
+
+
+def test_prompt_sync_ignores_pending_cache(git_repo, capsys):
+    _, spawn = git_repo
+    _prompt_json(capsys)
+
+    status = _prompt_json(capsys, "--sync")
+
+    assert status["pending"] is False
+    assert status["ahead"] == 2
+    assert spawn.call_count == 1
+
+
+def test_prompt_refresh_writes_full_status(git_repo, capsys):
+    workspace, spawn = git_repo
+
+    assert cmd_prompt(["--refresh"]) == 0
+    reset_git_call_counts()
+    status = _prompt_json(capsys)
+
+    assert spawn.call_count == 0
+    assert status["pending"] is False
+    assert status["base"] == "main"
+    assert status["ahead"] == 2
+    assert status["stale"] is False
+    assert status["hooks"] == {HOOK_POST_CHECKOUT: False, HOOK_POST_COMMIT: False}
+    assert status["issues"] == ["post-checkout hook not installed", "post-commit hook not installed"]
+    assert read_prompt_cache(workspace)["status"] == status
+
+
+def test_prompt_cache_hit_runs_no_git(git_repo, capsys):
+    cmd_prompt(["--refresh"])
+    reset_git_call_counts()
+
+    _prompt_json(capsys)
+
+    assert get_git_call_total() == 0
+
+
+def test_prompt_cache_invalidated_by_checkout(git_repo, capsys):
+    workspace, spawn = git_repo
+    cmd_prompt(["--refresh"])
+
+    git_checkout(workspace, "main")
+    status = _prompt_json(capsys)
+
+    assert status["branch"] == "main"
+    assert status["context_exists"] is False
+    assert status["pending"] is True
+    assert spawn.call_count == 1
+
+
+def test_prompt_cache_invalidated_by_commit(git_repo, capsys):
+    workspace, _ = git_repo
+    cmd_prompt(["--refresh"])
+
+    _commit_file(workspace, "c.py")
+
+    assert _prompt_json(capsys, "--sync")["ahead"] == 3
+
+
+def test_prompt_cache_invalidated_by_base_ref_update(git_repo, capsys):
+    workspace, _ = git_repo
+    cmd_prompt(["--refresh"])
+    run_git(["update-ref", "refs/heads/main", "HEAD~1"], cwd=workspace, check=True)
+    cmd_prompt(["--refresh"])
+
+    run_git(["update-ref", "refs/heads/main", "HEAD"], cwd=workspace, check=True)
+
+    assert _prompt_json(capsys)["pending"] is True
+
+
+def test_prompt_cache_invalidated_by_base_override(git_repo, capsys):
+    workspace, _ = git_repo
+    cmd_prompt(["--refresh"])
+
+    run_git(["branch", "develop", "HEAD~1"], cwd=workspace, check=True)
+    with open(os.path.join(get_branches_dir(workspace), "feature-prompt", "base_branch"), "w") as f:
+        f.write("develop\n")
+
+    status = _prompt_json(capsys, "--sync")
+    assert status["base"] == "develop"
+    assert status["ahead"] == 1
+
+
+def test_prompt_cache_in_linked_worktree(git_repo, capsys):
+    workspace, _ = git_repo
+    worktree = os.path.join(workspace, "..", os.path.basename(workspace) + "-wt")
+    run_git(["worktree", "add", "-b", "feature/wt", worktree], cwd=workspace, check=True)
+    try:
+        _, git_dir = find_repo(worktree)
+        assert os.path.realpath(get_common_dir(git_dir)) == os.path.realpath(os.path.join(workspace, ".git"))
+
+        os.chdir(worktree)
+        os.makedirs(get_branches_dir(worktree))
+        with open(os.path.join(get_config_dir(worktree), "config.json"), "w") as f:
+            json.dump({"default_base_branch": "main", "sound": False}, f)
+        assert _prompt_json(capsys, "--sync")["ahead"] == 2
+
+        _commit_file(worktree, "wt.py")
+
+        assert _prompt_json(capsys, "--sync")["ahead"] == 3
+    finally:
+        os.chdir(workspace)
+        run_git(["worktree", "remove", "--force", worktree], cwd=workspace)
+
+
+def test_prompt_sync_reports_no_issues_when_healthy(git_repo, capsys):
+    workspace, spawn = git_repo
+    install_hook(workspace, HOOK_POST_CHECKOUT)
+    install_hook(workspace, HOOK_POST_COMMIT)
+
+    status = _prompt_json(capsys, "--sync")
+
+    assert status["issues"] == []
+    assert spawn.call_count == 0
+
+
+def test_prompt_text_output(git_repo, capsys):
+    cmd_prompt(["--refresh"])
+
+    assert cmd_prompt([]) == 0
+
+    assert capsys.readouterr().out.strip() == "feature/prompt +2 !"
+
+
+def test_format_prompt():
+    assert format_prompt({"branch": "main", "context_exists": True}) == "main"
+    assert format_prompt({"branch": "x", "context_exists": False, "issues": ["a"]}) == "x (no context) !"
+    assert format_prompt({"branch": "x", "context_exists": True, "ahead": 3, "stale": True}) == "x +3 ~"
+
+
+def test_prompt_outside_repo_prints_nothing(capsys):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        original_cwd = os.getcwd()
+        os.chdir(tmpdir)
+        try:
+            assert cmd_prompt([]) == 1
+        finally:
+            os.chdir(original_cwd)
+
+    assert capsys.readouterr().out == ""
+
+
+def test_prompt_not_initialized_prints_nothing(capsys):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        git_init(tmpdir, "main")
+        original_cwd = os.getcwd()
+        os.chdir(tmpdir)
+        try:
+            assert cmd_prompt([]) == 1
+        finally:
+            os.chdir(original_cwd)
+
+    assert capsys.readouterr().out == ""
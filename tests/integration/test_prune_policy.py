@@ -0,0 +1,165 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+from branchctx.commands.prune import cmd_prune
+from branchctx.core.prune import apply_prune_plan, build_prune_plan
+from branchctx.core.sync import create_branch_context, list_archived_branches, list_branches
+from branchctx.data.config import PrunePolicy, get_branches_dir, get_config_dir, get_template_dir
+from branchctx.data.meta import load_archived_meta, load_branch_meta
+from branchctx.utils.git import (
+    git_add,
+    git_checkout,
+    git_commit,
+    git_config,
+    git_init,
+    git_list_branches,
+    run_git,
+)
+
+NOW = datetime(2025, 6, 1, 12, 0, 0)
+
+
+def _commit_file(workspace: str, name: str):
+    with open(os.path.join(workspace, name), "w") as f:
+        f.write(name)
+    git_add(workspace, name)
+    git_commit(workspace, f"add {name}")
+
+
+def _set_updated_at(workspace: str, key: str, updated_at: datetime):
+    path = os.path.join(get_branches_dir(workspace), "meta.json")
+    with open(path) as f:
+        meta = json.load(f)
+    meta[key]["updated_at"] = updated_at.isoformat()
+    with open(path, "w") as f:
+        json.dump(meta, f)
+
+
+def _write_config(workspace: str, policy: dict):
+    with open(os.path.join(get_config_dir(workspace), "config.json"), "w") as f:
+        json.dump({"default_base_branch": "main", "sound": False, "template_rules": [], "prune_policy": policy}, f)
+
+
+@pytest.fixture
+def git_repo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        git_init(tmpdir, "main")
+        git_config(tmpdir, "user.email", "test@test.com")
+        git_config(tmpdir, "user.name", "Test User")
+        _commit_file(tmpdir, "README.md")
+
+        os.makedirs(get_template_dir(tmpdir))
+        os.makedirs(get_branches_dir(tmpdir))
+        _write_config(tmpdir, {})
+        with open(os.path.join(get_template_dir(tmpdir), "context.md"), "w") as f:
+            f.write("# Context")
+
+        git_checkout(tmpdir, "feature/merged", create=True)
+        _commit_file(tmpdir, "merged.py")
+        git_checkout(tmpdir, "main")
+        run_git(["merge", "--no-ff", "-m", "merge", "feature/merged"], cwd=tmpdir, check=True)
+
+        git_checkout(tmpdir, "feature/open", create=True)
+        _commit_file(tmpdir, "open.py")
+        git_checkout(tmpdir, "main")
+
+        run_git(["branch", "feature/fresh"], cwd=tmpdir, check=True)
+
+        for branch in ("main", "feature/merged", "feature/open", "feature/fresh", "feature/gone"):
+            create_branch_context(tmpdir, branch)
+        for key in ("main", "feature-merged", "feature-open", "feature-fresh", "feature-gone"):
+            _set_updated_at(tmpdir, key, NOW - timedelta(days=1))
+
+        original_cwd = os.getcwd()
+        os.chdir(tmpdir)
+        yield tmpdir
+        os.chdir(original_cwd)
+
+
+def _actions(actions) -> list[tuple[str, str]]:
+    return [(action.branch, action.reason) for action in actions]
+
+
+def test_default_policy_archives_orphans_only(git_repo):
+    plan = build_prune_plan(git_repo, PrunePolicy(), now=NOW)
+
+    assert plan.delete_branches == []
+    assert _actions(plan.archive_contexts) == [("feature/gone", "orphan")]
+
+
+def test_policy_deletes_merged_branches(git_repo):
+    plan = build_prune_plan(git_repo, PrunePolicy(archive_orphans=False, delete_merged=True), now=NOW)
+
+    assert _actions(plan.delete_branches) == [("feature/merged", "merged")]
+    assert _actions(plan.archive_contexts) == [("feature/merged", "merged")]
+
+
+def test_policy_archives_inactive_contexts(git_repo):
+    _set_updated_at(git_repo, "feature-open", NOW - timedelta(days=45))
+    _set_updated_at(git_repo, "main", NOW - timedelta(days=45))
+
+    plan = build_prune_plan(git_repo, PrunePolicy(archive_orphans=False, archive_after_days=30), now=NOW)
+
+    assert _actions(plan.archive_contexts) == [("feature/open", "inactive")]
+
+
+def test_policy_never_touches_current_branch(git_repo):
+    git_checkout(git_repo, "feature/merged")
+
+    policy = PrunePolicy(delete_merged=True, archive_after_days=1)
+
+    plan = build_prune_plan(git_repo, policy, now=NOW + timedelta(days=5))
+
+    assert "feature/merged" not in [a.branch for a in plan.delete_branches + plan.archive_contexts]
+
+
+def test_apply_prune_plan(git_repo):
+    plan = build_prune_plan(git_repo, PrunePolicy(delete_merged=True), now=NOW)
+
+    result = apply_prune_plan(git_repo, plan)
+
+    assert result.deleted == ["feature/merged"]
+    assert sorted(result.archived) == ["feature-gone", "feature-merged"]
+    assert "feature/merged" not in git_list_branches(git_repo)
+    assert sorted(list_archived_branches(git_repo)) == ["feature-gone", "feature-merged"]
+    assert sorted(list_branches(git_repo)) == ["feature-fresh", "feature-open", "main"]
+    assert sorted(load_archived_meta(git_repo)) == ["feature-gone", "feature-merged"]
+    assert "feature-merged" not in load_branch_meta(git_repo)
+
+
+def test_cmd_prune_policy_dry_run(git_repo, capsys):
+    _write_config(git_repo, {"delete_merged": True})
+
+    assert cmd_prune(["--policy", "--dry-run"]) == 0
+
+    plan = json.loads(capsys.readouterr().out)
+    assert plan["policy"] == {"archive_orphans": True, "archive_after_days": 0, "delete_merged": True}
+    assert plan["delete_branches"] == [{"branch": "feature/merged", "context": "feature-merged", "reason": "merged"}]
+    assert [a["context"] for a in plan["archive_contexts"]] == ["feature-gone", "feature-merged"]
+    assert "feature/merged" in git_list_branches(git_repo)
+    assert list_archived_branches(git_repo) == []
+
+
+def test_cmd_prune_policy_applies(git_repo, capsys):
+    assert cmd_prune(["--policy"]) == 0
+
+    output = capsys.readouterr().out
+    assert "Archived 1 context(s)" in output
+    assert "feature/gone  (orphan)" in output
+    assert list_archived_branches(git_repo) == ["feature-gone"]
+
+
+def test_cmd_prune_policy_nothing_to_do(git_repo, capsys):
+    _write_config(git_repo, {"archive_orphans": False})
+
+    assert cmd_prune(["--policy"]) == 0
+    assert "Nothing to prune" in capsys.readouterr().out
+
+
+def test_cmd_prune_dry_run_requires_policy(git_repo, capsys):
+    assert cmd_prune(["--dry-run"]) == 1
+    assert "error: --dry-run requires --policy" in capsys.readouterr().out
@@ -0,0 +1,70 @@
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+from branchctx.utils.git import git_init
+from tests.utils import import_profile
+
+HOOK_PATH_FORBIDDEN_MODULES = {
+    "importlib.metadata",
+    "dataclasses",
+    "datetime",
+    "hashlib",
+    "pathlib",
+    "branchctx.assets",
+    "branchctx.commands.status",
+    "branchctx.core.context_tags",
+    "branchctx.core.refresh",
+    "branchctx.core.sync",
+    "branchctx.data.config",
+    "branchctx.data.meta",
+}
+
+CLI_IMPORT_FORBIDDEN_MODULES = HOOK_PATH_FORBIDDEN_MODULES | {
+    "concurrent.futures",
+    "json",
+    "subprocess",
+    "threading",
+    "branchctx.commands",
+    "branchctx.utils.git",
+}
+
+
+@pytest.fixture
+def bare_repo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        git_init(tmpdir, "main")
+        yield tmpdir
+
+
+@pytest.mark.parametrize("args", [["on-commit"], ["on-checkout", "main", "feature"], ["prompt"]])
+def test_hook_commands_skip_heavy_imports(bare_repo, args):
+    modules, _ = import_profile(bare_repo, args)
+
+    assert "branchctx.cli" in modules
+    assert modules & HOOK_PATH_FORBIDDEN_MODULES == set()
+
+
+def test_cli_import_is_minimal():
+    code = "import sys; import branchctx.cli; print('\\n'.join(sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert set(result.stdout.split()) & CLI_IMPORT_FORBIDDEN_MODULES == set()
+
+
+def test_help_skips_command_imports(bare_repo):
+    modules, _ = import_profile(bare_repo, ["--help"])
+
+    assert "branchctx.cli" in modules
+    assert modules & CLI_IMPORT_FORBIDDEN_MODULES == set()
+
+
+def test_command_exports_match_handlers():
+    import branchctx.commands as commands
+    from branchctx.cmd_registry import _HANDLERS
+
+    expected = {attr: module for module, attr in (target.split(":") for target in _HANDLERS.values())}
+    assert commands._EXPORTS == expected
+    assert all(callable(getattr(commands, name)) for name in commands.__all__)
@@ -8,7 +8,15 @@ from branchctx.constants import HOOK_POST_CHECKOUT
 from branchctx.core.hooks import install_hook
 from branchctx.core.sync import sync_branch
 from branchctx.data.config import Config, get_branches_dir, get_template_dir
-from branchctx.utils.git import git_add, git_commit, git_config, git_init
+from branchctx.utils.git import (
+    get_git_call_counts,
+    git_add,
+    git_commit,
+    git_config,
+    git_init,
+    reset_git_call_counts,
+    run_git,
+)
 
 
 @pytest.fixture
@@ -127,3 +135,38 @@ def test_status_returns_error_when_hook_missing(git_repo, capsys):
     captured = capsys.readouterr()
     assert "[!!]" in captured.out
     assert "post-checkout" in captured.out
+
+
+def test_status_health_checks_in_stable_order(git_repo, capsys):
+    install_hook(git_repo, HOOK_POST_CHECKOUT)
+    sync_branch(git_repo, "main")
+
+    cmd_status([])
+
+    health = capsys.readouterr().out.split("Health:\n", 1)[1].split("\n\n", 1)[0]
+    assert [line.split("] ", 1)[1] for line in health.splitlines()] == [
+        "post-checkout hook installed",
+        "post-commit hook not installed",
+        "templates/ exists",
+        "_default template exists",
+        "symlink valid",
+        "no orphan contexts",
+    ]
+
+
+def test_status_single_ref_snapshot_and_hooks_path_lookup(git_repo, capsys):
+    sync_branch(git_repo, "main")
+    reset_git_call_counts()
+
+    cmd_status([])
+
+    assert get_git_call_counts() == {"rev-parse": 1, "for-each-ref": 1, "config": 1}
+
+
+def test_status_detached_head(git_repo, capsys):
+    sync_branch(git_repo, "main")
+    run_git(["checkout", "--detach"], cwd=git_repo, check=True)
+
+    cmd_status([])
+
+    assert "Branch:      HEAD" in capsys.readouterr().out
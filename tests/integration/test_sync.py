@@ -1,6 +1,7 @@
 import os
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
@@ -8,6 +9,7 @@ from branchctx.assets import copy_init_templates
 from branchctx.constants import DEFAULT_SYMLINK, GIT_DIR
 from branchctx.core.sync import (
     archive_branch,
+    archive_branches,
     branch_context_exists,
     create_branch_context,
     get_branch_dir,
@@ -19,7 +21,9 @@ from branchctx.core.sync import (
     unarchive_branch,
     update_symlink,
 )
+from branchctx.data import meta as meta_module
 from branchctx.data.config import Config, TemplateRule, get_branches_dir, get_config_dir, get_templates_dir
+from branchctx.data.meta import load_archived_meta, load_branch_meta
 from tests.utils import normalize_path
 
 
@@ -83,6 +87,47 @@ def test_update_symlink_unchanged(workspace):
     assert result == "unchanged"
 
 
+def test_update_symlink_unchanged_for_absolute_target(workspace):
+    create_branch_context(workspace, "main")
+    symlink_path = os.path.join(workspace, DEFAULT_SYMLINK)
+    os.symlink(get_branch_dir(workspace, "main"), symlink_path)
+
+    result = update_symlink(workspace, "main")
+
+    assert result == "unchanged"
+    assert os.readlink(symlink_path) == get_branch_dir(workspace, "main")
+
+
+def test_update_symlink_swaps_without_removing(workspace, monkeypatch):
+    create_branch_context(workspace, "main")
+    create_branch_context(workspace, "feature")
+    symlink_path = os.path.join(workspace, DEFAULT_SYMLINK)
+    update_symlink(workspace, "main")
+
+    original_remove = os.remove
+
+    def guarded_remove(path, *args, **kwargs):
+        assert path != symlink_path
+        return original_remove(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "remove", guarded_remove)
+    monkeypatch.setattr(os, "unlink", guarded_remove)
+
+    assert update_symlink(workspace, "feature") == "updated"
+    assert normalize_path(os.readlink(symlink_path)) == get_branch_rel_path("feature")
+    assert [name for name in os.listdir(workspace) if name.endswith(".tmp")] == []
+
+
+def test_update_symlink_replaces_stale_temp_link(workspace):
+    create_branch_context(workspace, "main")
+    symlink_path = os.path.join(workspace, DEFAULT_SYMLINK)
+    os.symlink("missing", f"{symlink_path}.{os.getpid()}.tmp")
+
+    assert update_symlink(workspace, "main") == "updated"
+    assert normalize_path(os.readlink(symlink_path)) == get_branch_rel_path("main")
+    assert [name for name in os.listdir(workspace) if name.endswith(".tmp")] == []
+
+
 def test_list_branches(workspace):
     assert list_branches(workspace) == []
 
@@ -312,3 +357,25 @@ def test_sync_branch_restores_from_archive(workspace):
 
     with open(os.path.join(branch_dir, "context.md")) as f:
         assert f.read() == "RESTORE ME"
+
+
+def test_archive_branches_batches_meta_writes(workspace):
+    for branch in ("feature/a", "feature/b", "feature/c"):
+        create_branch_context(workspace, branch)
+
+    with patch.object(meta_module, "_save_meta", wraps=meta_module._save_meta) as save_meta:
+        archived = archive_branches(workspace, ["feature-a", "feature-b", "missing"])
+
+    assert archived == ["feature-a", "feature-b"]
+    assert save_meta.call_count == 2
+    assert sorted(list_archived_branches(workspace)) == ["feature-a", "feature-b"]
+    assert list(load_branch_meta(workspace)) == ["feature-c"]
+    assert sorted(load_archived_meta(workspace)) == ["feature-a", "feature-b"]
+
+
+def test_archive_branches_nothing_to_archive(workspace):
+    with patch.object(meta_module, "_save_meta", wraps=meta_module._save_meta) as save_meta:
+        assert archive_branches(workspace, ["missing"]) == []
+
+    assert save_meta.call_count == 0
+    assert list_archived_branches(workspace) == []
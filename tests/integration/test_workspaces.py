@@ -0,0 +1,170 @@
+import json
+import os
+import tempfile
+
+import pytest
+
+from branchctx.commands.status import cmd_status, summarize_repo_status
+from branchctx.commands.sync import cmd_sync
+from branchctx.constants import HOOK_POST_CHECKOUT, HOOK_POST_COMMIT
+from branchctx.core.hooks import install_hook
+from branchctx.core.workspaces import find_initialized_repos, map_repos
+from branchctx.data.config import get_branches_dir, get_config_dir, get_template_dir
+from branchctx.utils.git import git_add, git_checkout, git_commit, git_config, git_init
+
+REPOS = ["api", "web", "org/lib"]
+
+
+def _init_repo(path: str, initialized: bool = True):
+    os.makedirs(path, exist_ok=True)
+    git_init(path, "main")
+    git_config(path, "user.email", "test@test.com")
+    git_config(path, "user.name", "Test User")
+    with open(os.path.join(path, "README.md"), "w") as f:
+        f.write("# Test")
+    git_add(path)
+    git_commit(path, "init")
+    if not initialized:
+        return
+
+    os.makedirs(os.path.join(get_template_dir(path), "_default"))
+    os.makedirs(get_branches_dir(path))
+    with open(os.path.join(get_config_dir(path), "config.json"), "w") as f:
+        json.dump({"default_base_branch": "main", "sound": False, "template_rules": []}, f)
+    with open(os.path.join(get_template_dir(path), "_default", "context.md"), "w") as f:
+        f.write("# Context")
+    install_hook(path, HOOK_POST_CHECKOUT)
+    install_hook(path, HOOK_POST_COMMIT)
+
+
+def _failing(repo: str) -> dict:
+    if repo.endswith("web"):
+        raise RuntimeError("boom")
+    return {"ok": True}
+
+
+@pytest.fixture
+def code_dir():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name in REPOS:
+            _init_repo(os.path.join(tmpdir, name))
+        _init_repo(os.path.join(tmpdir, "plain"), initialized=False)
+        os.makedirs(os.path.join(tmpdir, "node_modules", "pkg", ".bctx"))
+        git_checkout(os.path.join(tmpdir, "web"), "feature/x", create=True)
+
+        original_cwd = os.getcwd()
+        os.chdir(tmpdir)
+        yield os.path.realpath(tmpdir)
+        os.chdir(original_cwd)
+
+
+def test_find_initialized_repos(code_dir):
+    repos = find_initialized_repos(code_dir)
+
+    assert [os.path.relpath(r, code_dir) for r in repos] == ["api", "org/lib", "web"]
+
+
+def test_find_initialized_repos_does_not_descend_into_repos(code_dir):
+    _init_repo(os.path.join(code_dir, "api", "vendor", "nested"))
+
+    repos = find_initialized_repos(code_dir)
+
+    assert os.path.join(code_dir, "api", "vendor", "nested") not in repos
+
+
+def test_find_initialized_repos_max_depth(code_dir):
+    assert [os.path.relpath(r, code_dir) for r in find_initialized_repos(code_dir, max_depth=1)] == ["api", "web"]
+
+
+def test_find_initialized_repos_root_is_repo(code_dir):
+    api = os.path.join(code_dir, "api")
+
+    assert find_initialized_repos(api) == [api]
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_map_repos_isolates_errors(code_dir, max_workers):
+    repos = find_initialized_repos(code_dir)
+
+    rows = map_repos(_failing, repos, max_workers=max_workers)
+
+    assert [row["repo"] for row in rows] == repos
+    assert rows[0] == {"repo": repos[0], "ok": True}
+    assert rows[2] == {"repo": repos[2], "error": "boom"}
+
+
+def test_summarize_repo_status(code_dir):
+    summary = summarize_repo_status(os.path.join(code_dir, "web"))
+
+    assert summary == {
+        "branch": "feature/x",
+        "base": "main",
+        "contexts": 1,
+        "orphans": 0,
+        "archived": 0,
+        "issues": [],
+    }
+
+
+def test_cmd_status_recursive_table(code_dir, capsys):
+    assert cmd_status(["--recursive", code_dir]) == 0
+
+    output = capsys.readouterr().out
+    lines = output.splitlines()
+    assert lines[0].split() == ["Repo", "Branch", "Contexts", "Orphans", "Result"]
+    assert lines[2].split() == ["api", "main", "0", "0", "ok"]
+    assert lines[4].split() == ["web", "feature/x", "1", "0", "ok"]
+    assert "3 repo(s)" in output
+    assert "plain" not in output
+
+
+def test_cmd_status_recursive_json_reports_issues(code_dir, capsys):
+    os.remove(os.path.join(code_dir, "org", "lib", ".git", "hooks", HOOK_POST_COMMIT))
+
+    assert cmd_status(["--recursive", "--json"]) == 1
+
+    rows = json.loads(capsys.readouterr().out)
+    assert [row["repo"] for row in rows] == ["api", "org/lib", "web"]
+    assert rows[1]["issues"] == ["post-commit hook not installed"]
+
+
+def test_cmd_status_recursive_no_repos(capsys):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        assert cmd_status(["--recursive", tmpdir]) == 0
+
+    assert "No initialized repos under" in capsys.readouterr().out
+
+
+def test_cmd_status_recursive_not_a_directory(code_dir, capsys):
+    assert cmd_status(["--recursive", os.path.join(code_dir, "missing")]) == 1
+    assert "error: not a directory" in capsys.readouterr().out
+
+
+def test_cmd_sync_recursive(code_dir, capsys):
+    assert cmd_sync(["--recursive", code_dir, "--json"]) == 0
+
+    rows = json.loads(capsys.readouterr().out)
+    assert [(row["repo"], row["branch"], row["status"]) for row in rows] == [
+        ("api", "main", "created from template"),
+        ("org/lib", "main", "created from template"),
+        ("web", "feature/x", "synced"),
+    ]
+    assert os.path.isdir(os.path.join(code_dir, "web", ".bctx", "branches", "feature-x"))
+    assert os.path.islink(os.path.join(code_dir, "api", "_branch"))
+    assert not os.path.exists(os.path.join(code_dir, "plain", ".bctx"))
+
+
+def test_cmd_sync_recursive_table(code_dir, capsys):
+    cmd_sync(["--recursive"])
+    capsys.readouterr()
+
+    assert cmd_sync(["--recursive"]) == 0
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split() == ["Repo", "Branch", "Tags", "Result"]
+    assert lines[3].split() == ["org/lib", "main", "0", "synced"]
+
+
+def test_cmd_sync_recursive_rejects_all(code_dir, capsys):
+    assert cmd_sync(["--recursive", "--all"]) == 1
+    assert "error: --recursive cannot be combined with --all or --pattern" in capsys.readouterr().out
@@ -1,2 +1,29 @@
+import subprocess
+import sys
+
+
 def normalize_path(path: str) -> str:
     return path.replace("\\", "/")
+
+
+def import_profile(cwd: str, args: list[str]) -> tuple[set[str], int]:
+    code = f"import sys; sys.argv = ['bctx', *{args!r}]; from branchctx.cli import main; main()"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=cwd, capture_output=True, text=True)
+
+    modules: set[str] = set()
+    total_us = 0
+    started = False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        module = name.strip()
+        if module == "imported package":
+            continue
+        started = started or module == "branchctx.cli"
+        if not started:
+            continue
+        modules.add(module)
+        if not name.startswith("   "):
+            total_us += int(cumulative_us)
+    return modules, total_us